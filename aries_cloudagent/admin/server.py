@@ -18,6 +18,7 @@ from marshmallow import fields, Schema
 
 from ..config.injection_context import InjectionContext
 from ..core.plugin_registry import PluginRegistry
+from ..core.retention import RecordRetention
 from ..messaging.responder import BaseResponder
 from ..transport.queue.basic import BasicMessageQueue
 from ..transport.outbound.message import OutboundMessage
@@ -335,6 +336,11 @@ class AdminServer(BaseAdminServer):
             status["timing"] = collector.results
         if self.conductor_stats:
             status["conductor"] = await self.conductor_stats()
+        retention: RecordRetention = await self.context.inject(
+            RecordRetention, required=False
+        )
+        if retention:
+            status["retention"] = retention.status
         return web.json_response(status)
 
     @docs(tags=["server"], summary="Reset statistics")
@@ -11,6 +11,7 @@ from ...config.injection_context import InjectionContext
 from ...config.provider import ClassProvider
 from ...core.plugin_registry import PluginRegistry
 from ...core.protocol_registry import ProtocolRegistry
+from ...core.retention import RecordRetention
 from ...transport.outbound.message import OutboundMessage
 
 from ..server import AdminServer, AdminSetupError
@@ -171,6 +172,14 @@ class TestAdminServerClient(AioHTTPTestCase):
         resp = await self.client.request("POST", "/status/reset")
         assert resp.status == 200
 
+    @unittest_run_loop
+    async def test_status_retention(self):
+        retention = RecordRetention(self.admin_server.context, 60.0)
+        self.admin_server.context.injector.bind_instance(RecordRetention, retention)
+        resp = await self.client.request("GET", "/status")
+        result = await resp.json()
+        assert result["retention"] == retention.status
+
     @unittest_run_loop
     async def test_websocket(self):
         async with self.client.ws_connect("/ws") as ws:
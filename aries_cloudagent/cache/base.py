@@ -57,6 +57,20 @@ class BaseCache(ABC):
     async def flush(self):
         """Remove all items from the cache."""
 
+    def set_capacity(self, prefix: Text, max_entries: int):
+        """
+        Limit the number of items retained with keys starting with a prefix.
+
+        The least recently used items are evicted first. Implementations which
+        cannot bound items by key prefix may ignore this.
+
+        Args:
+            prefix: the key prefix
+            max_entries: the maximum number of items to retain, or None for
+                no limit
+
+        """
+
     def acquire(self, key: Text):
         """Acquire a lock on a given cache key."""
         result = CacheKeyLock(self, key)
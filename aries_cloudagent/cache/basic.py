@@ -1,6 +1,7 @@
 """Basic in-memory cache implementation."""
 
 import time
+from collections import OrderedDict
 from typing import Any, Sequence, Text, Union
 
 from .base import BaseCache
@@ -12,8 +13,11 @@ class BasicCache(BaseCache):
     def __init__(self):
         """Initialize a `BasicCache` instance."""
         super().__init__()
-        # looks like { "key": { "expires": <epoch timestamp>, "value": <val> } }
-        self._cache = {}
+        # looks like { "key": { "expires": <epoch timestamp>, "value": <val> } },
+        # in least recently used order
+        self._cache = OrderedDict()
+        # looks like { "prefix": (<max entries>, OrderedDict of matching keys) }
+        self._limits = {}
 
     def _remove_expired_cache_items(self):
         """Remove all expired items from cache."""
@@ -23,7 +27,48 @@ class BasicCache(BaseCache):
                 continue
             now = time.perf_counter()
             if now >= cache_item_expiry:
-                del self._cache[key]
+                self._remove(key)
+
+    def _remove(self, key: Text):
+        """Remove an item from the cache and the capacity limits."""
+        self._cache.pop(key, None)
+        for (_, keys) in self._limits.values():
+            keys.pop(key, None)
+
+    def _touch(self, key: Text):
+        """Mark an item as most recently used, evicting items over capacity."""
+        self._cache.move_to_end(key)
+        for prefix, (max_entries, keys) in self._limits.items():
+            if key.startswith(prefix):
+                keys[key] = None
+                keys.move_to_end(key)
+                while len(keys) > max_entries:
+                    self._remove(next(iter(keys)))
+
+    def set_capacity(self, prefix: Text, max_entries: int):
+        """
+        Limit the number of items retained with keys starting with a prefix.
+
+        The least recently used items are evicted first.
+
+        Args:
+            prefix: the key prefix
+            max_entries: the maximum number of items to retain, or None for
+                no limit
+
+        """
+        if not max_entries:
+            self._limits.pop(prefix, None)
+            return
+        if prefix in self._limits:
+            keys = self._limits[prefix][1]
+        else:
+            keys = OrderedDict(
+                (key, None) for key in self._cache if key.startswith(prefix)
+            )
+        self._limits[prefix] = (max_entries, keys)
+        while len(keys) > max_entries:
+            self._remove(next(iter(keys)))
 
     async def get(self, key: Text):
         """
@@ -37,7 +82,11 @@ class BasicCache(BaseCache):
 
         """
         self._remove_expired_cache_items()
-        return self._cache.get(key)["value"] if self._cache.get(key) else None
+        item = self._cache.get(key)
+        if not item:
+            return None
+        self._touch(key)
+        return item["value"]
 
     async def set(self, keys: Union[Text, Sequence[Text]], value: Any, ttl: int = None):
         """
@@ -55,6 +104,7 @@ class BasicCache(BaseCache):
         expires_ts = time.perf_counter() + ttl if ttl else None
         for key in [keys] if isinstance(keys, Text) else keys:
             self._cache[key] = {"expires": expires_ts, "value": value}
+            self._touch(key)
 
     async def clear(self, key: Text):
         """
@@ -64,10 +114,11 @@ class BasicCache(BaseCache):
             key: the key to remove
 
         """
-        if key in self._cache:
-            del self._cache[key]
+        self._remove(key)
 
     async def flush(self):
         """Remove all items from the cache."""
 
-        self._cache = {}
+        self._cache = OrderedDict()
+        for (_, keys) in self._limits.values():
+            keys.clear()
@@ -165,3 +165,31 @@ class TestBasicCache:
     @pytest.mark.asyncio
     async def test_repr(self, cache):
         assert isinstance(repr(cache), str)
+
+    @pytest.mark.asyncio
+    async def test_capacity(self, cache):
+        for i in range(3):
+            await cache.set(f"a::{i}", i)
+        cache.set_capacity("a::", 2)
+        assert await cache.get("a::0") is None
+        assert await cache.get("a::1") == 1  # now most recently used
+        await cache.set("a::3", 3)
+        await cache.set("b::0", "other")
+        assert await cache.get("a::2") is None
+        assert await cache.get("a::1") == 1
+        assert await cache.get("a::3") == 3
+        assert await cache.get("valid key") == "value"
+
+        await cache.clear("a::3")
+        await cache.set("a::4", 4)
+        assert await cache.get("a::1") == 1
+
+        cache.set_capacity("a::", None)
+        for i in range(5, 8):
+            await cache.set(f"a::{i}", i)
+        assert await cache.get("a::1") == 1
+
+        cache.set_capacity("a::", 1)
+        await cache.flush()
+        await cache.set("a::8", 8)
+        assert await cache.get("a::8") == 8
@@ -9,6 +9,7 @@ def available_commands():
     return [
         {"name": "help", "summary": "Print available commands"},
         {"name": "provision", "summary": "Provision an agent"},
+        {"name": "reindex", "summary": "Update the storage tags of existing records"},
         {"name": "start", "summary": "Start a new agent process"},
     ]
 
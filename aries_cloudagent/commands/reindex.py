@@ -0,0 +1,104 @@
+"""Reindex command for updating the storage tags of existing records."""
+
+import asyncio
+import json
+from argparse import ArgumentParser
+from typing import Sequence, Type
+
+from ..config import argparse as arg
+from ..config.base import BaseError
+from ..config.default_context import DefaultContextBuilder
+from ..config.injection_context import InjectionContext
+from ..config.util import common_config
+from ..connections.models.connection_record import ConnectionRecord
+from ..messaging.models.base_record import BaseRecord
+from ..protocols.issue_credential.v1_0.models.credential_exchange import (
+    V10CredentialExchange,
+)
+from ..protocols.present_proof.v1_0.models.presentation_exchange import (
+    V10PresentationExchange,
+)
+from ..storage.base import BaseStorage
+
+
+REINDEX_RECORD_TYPES = (
+    ConnectionRecord,
+    V10CredentialExchange,
+    V10PresentationExchange,
+)
+
+
+class ReindexError(BaseError):
+    """Base exception for reindexing errors."""
+
+
+def init_argument_parser(parser: ArgumentParser):
+    """Initialize an argument parser with the module's arguments."""
+    return arg.load_argument_groups(
+        parser, *arg.group.get_registered(arg.CAT_PROVISION)
+    )
+
+
+async def reindex_records(
+    context: InjectionContext, record_cls: Type[BaseRecord]
+) -> Sequence[int]:
+    """
+    Update the stored tags of all records of a type to match `TAG_NAMES`.
+
+    Args:
+        context: The injection context to use
+        record_cls: The `BaseRecord` subclass to reindex
+
+    Returns:
+        A tuple of the number of records checked and the number updated
+
+    """
+    storage: BaseStorage = await context.inject(BaseStorage)
+    checked = updated = 0
+    # collect the stale records first, as updating tags during a search
+    # is not supported by every storage backend
+    stale = []
+    async for row in storage.search_records(
+        record_cls.RECORD_TYPE, None, None, {"retrieveTags": True}
+    ):
+        checked += 1
+        record = record_cls.from_storage(row.id, json.loads(row.value))
+        tags = record.tags
+        if tags != (row.tags or {}):
+            stale.append((row, tags))
+    for row, tags in stale:
+        await storage.update_record_tags(row, tags)
+        updated += 1
+    return checked, updated
+
+
+async def reindex(settings: dict):
+    """Perform reindexing."""
+    context_builder = DefaultContextBuilder(settings)
+    context = await context_builder.build()
+
+    try:
+        for record_cls in REINDEX_RECORD_TYPES:
+            checked, updated = await reindex_records(context, record_cls)
+            print(
+                f"{record_cls.RECORD_TYPE}: checked {checked}, updated {updated}"
+            )
+    except BaseError as e:
+        raise ReindexError("Error during reindexing") from e
+
+
+def execute(argv: Sequence[str] = None):
+    """Entrypoint."""
+    parser = ArgumentParser()
+    parser.prog += " reindex"
+    get_settings = init_argument_parser(parser)
+    args = parser.parse_args(argv)
+    settings = get_settings(args)
+    common_config(settings)
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(reindex(settings))
+
+
+if __name__ == "__main__":
+    execute()
@@ -6,7 +6,7 @@ import logging
 import os
 import signal
 from argparse import ArgumentParser
-from typing import Coroutine, Sequence
+from typing import Coroutine, Mapping, Sequence
 
 try:
     import uvloop
@@ -14,6 +14,7 @@ except ImportError:
     uvloop = None
 
 from ..core.conductor import Conductor
+from ..core.worker import Coordinator, WorkerConductor
 from ..config import argparse as arg
 from ..config.default_context import DefaultContextBuilder
 from ..config.util import common_config
@@ -33,6 +34,15 @@ async def shutdown_app(conductor: Conductor):
     await conductor.stop()
 
 
+def run_worker(settings: Mapping[str, object], socket_path: str):
+    """Entrypoint of an inbound worker process."""
+    common_config(settings)
+    conductor = WorkerConductor(DefaultContextBuilder(settings), socket_path)
+    if uvloop:
+        uvloop.install()
+    run_loop(start_app(conductor), shutdown_app(conductor))
+
+
 def init_argument_parser(parser: ArgumentParser):
     """Initialize an argument parser with the module's arguments."""
     return arg.load_argument_groups(parser, *arg.group.get_registered(arg.CAT_START))
@@ -57,15 +67,20 @@ def execute(argv: Sequence[str] = None):
         webhook_urls.append(webhook_url)
         settings["admin.webhook_urls"] = webhook_urls
 
-    # Create the Conductor instance
-    context_builder = DefaultContextBuilder(settings)
-    conductor = Conductor(context_builder)
-
     # Run the application
     if uvloop:
         uvloop.install()
         print("uvloop installed")
-    run_loop(start_app(conductor), shutdown_app(conductor))
+    worker_count = settings.get("transport.inbound_workers")
+    if worker_count:
+        # the coordinator is started and stopped like a conductor
+        coordinator = Coordinator(settings, worker_count, run_worker)
+        run_loop(coordinator.start(), shutdown_app(coordinator))
+    else:
+        # Create the Conductor instance
+        context_builder = DefaultContextBuilder(settings)
+        conductor = Conductor(context_builder)
+        run_loop(start_app(conductor), shutdown_app(conductor))
 
 
 def run_loop(startup: Coroutine, shutdown: Coroutine):
@@ -0,0 +1,38 @@
+from asynctest import TestCase as AsyncTestCase
+from asynctest import mock as async_mock
+
+from ...config.injection_context import InjectionContext
+from ...connections.models.connection_record import ConnectionRecord
+from ...storage.base import BaseStorage
+from ...storage.basic import BasicStorage
+
+from .. import reindex as command
+
+
+class TestReindex(AsyncTestCase):
+    def test_bad_calls(self):
+        with self.assertRaises(SystemExit):
+            command.execute(["bad"])
+
+    def test_exec_reindex(self):
+        with async_mock.patch("builtins.print") as mock_print:
+            command.execute([])
+        assert mock_print.call_count == len(command.REINDEX_RECORD_TYPES)
+
+    async def test_reindex_records(self):
+        context = InjectionContext(enforce_typing=False)
+        storage = BasicStorage()
+        context.injector.bind_instance(BaseStorage, storage)
+
+        current = ConnectionRecord(my_did="did", state="active", initiator="self")
+        await current.save(context)
+        stale = ConnectionRecord(my_did="did", state="invitation", initiator="self")
+        await stale.save(context)
+        await storage.update_record_tags(stale.storage_record, {"my_did": "did"})
+
+        assert await command.reindex_records(context, ConnectionRecord) == (2, 1)
+        found = await ConnectionRecord.query(
+            context, {"my_did": "did"}, {"state": "invitation"}
+        )
+        assert [record.connection_id for record in found] == [stale.connection_id]
+        assert await command.reindex_records(context, ConnectionRecord) == (2, 0)
@@ -31,6 +31,23 @@ class TestStart(AsyncTestCase):
             assert isinstance(shutdown_app.call_args[0][0], command.Conductor)
             run_loop.assert_called_once()
 
+    def test_exec_start_workers(self):
+        with async_mock.patch.object(
+            command, "run_loop"
+        ) as run_loop, async_mock.patch.object(
+            command, "shutdown_app", autospec=True
+        ) as shutdown_app:
+            command.execute(
+                ["-it", "http", "0.0.0.0", "80", "-ot", "http", "--inbound-workers", "2"]
+            )
+            coordinator = shutdown_app.call_args[0][0]
+            assert isinstance(coordinator, command.Coordinator)
+            assert coordinator.worker_count == 2
+            assert coordinator.run_worker is command.run_worker
+            assert coordinator.inbound_configs == [["http", "0.0.0.0", "80"]]
+            run_loop.assert_called_once()
+            run_loop.call_args[0][0].close()
+
     async def test_run_loop(self):
         startup = async_mock.CoroutineMock()
         startup_call = startup()
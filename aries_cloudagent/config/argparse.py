@@ -376,7 +376,18 @@ class GeneralGroup(ArgumentGroup):
             metavar="<storage-type>",
             help="Specifies the type of storage provider to use for the internal\
             storage engine. This storage interface is used to store internal state.\
-            Supported internal storage types are 'basic' (memory) and 'indy'.",
+            Supported internal storage types are 'basic' (memory), 'indexed'\
+            (memory, with tag indexes), 'sqlite' and 'indy'.",
+        )
+        parser.add_argument(
+            "--storage-config",
+            type=str,
+            metavar="<storage-config>",
+            help='Specifies the configuration to use for the internal storage\
+            engine, as a JSON string. This is used by the \'sqlite\' storage\
+            type, for example \'{"path":"/var/lib/aca-py/storage.db",\
+            "reader_pool_size":4}\'. An in-memory database is used if no\
+            path is given.',
         )
         parser.add_argument(
             "-e",
@@ -408,6 +419,8 @@ class GeneralGroup(ArgumentGroup):
             settings["external_plugins"] = args.external_plugins
         if args.storage_type:
             settings["storage.type"] = args.storage_type
+        if args.storage_config:
+            settings["storage.config"] = args.storage_config
         if args.endpoint:
             settings["default_endpoint"] = args.endpoint[0]
             settings["additional_endpoints"] = args.endpoint[1:]
@@ -545,6 +558,35 @@ class ProtocolGroup(ArgumentGroup):
             action="store_true",
             help="Send a webhook when a ping is sent or received.",
         )
+        parser.add_argument(
+            "--message-priority",
+            action="append",
+            metavar="<message-type>=<priority>",
+            help="Set the priority of handling a message when handlers are busy.\
+            The message type may be a full message type, a protocol URI, a\
+            protocol name such as 'trust_ping', or a protocol name and message\
+            name such as 'issue-credential/ack'. Higher priorities are handled\
+            first. Trust pings, problem reports and acks have priority 10 by\
+            default, other messages 0. Multiple instances of this parameter can\
+            be specified.",
+        )
+        parser.add_argument(
+            "--message-ordering",
+            choices=("connection", "thread"),
+            help="Handle the messages received from the same connection, or on the\
+            same thread of a connection, one at a time in the order they were\
+            received, while other messages are handled concurrently. This avoids\
+            concurrent updates to the same records when raising the number of\
+            concurrent handlers. Default: no ordering.",
+        )
+        parser.add_argument(
+            "--message-priority-aging",
+            type=float,
+            metavar="<seconds>",
+            help="Set the number of seconds a waiting message takes to gain one\
+            level of priority, so that low priority messages are not starved.\
+            Use 0 to always handle higher priorities first. Default: 1.0.",
+        )
         parser.add_argument(
             "--public-invites",
             action="store_true",
@@ -588,6 +630,36 @@ class ProtocolGroup(ArgumentGroup):
             action="store_true",
             help="Keep credential exchange records after exchange has completed.",
         )
+        parser.add_argument(
+            "--exchange-retention-age",
+            type=float,
+            metavar="<seconds>",
+            help="Remove completed credential and presentation exchange records\
+            in the background once they have not been updated for this number\
+            of seconds. Default: completed records are kept.",
+        )
+        parser.add_argument(
+            "--exchange-archive-dir",
+            type=str,
+            metavar="<directory>",
+            help="Append removed exchange records to compressed JSON lines files\
+            in this directory, one per record type and day of last update,\
+            instead of only deleting them.",
+        )
+        parser.add_argument(
+            "--exchange-retention-interval",
+            type=float,
+            metavar="<seconds>",
+            help="Specifies the number of seconds between sweeps for expired\
+            exchange records. Default: 3600.",
+        )
+        parser.add_argument(
+            "--exchange-retention-batch",
+            type=int,
+            metavar="<count>",
+            help="Specifies the maximum number of exchange records removed in a\
+            single batch. Default: 100.",
+        )
 
     def get_settings(self, args: Namespace) -> dict:
         """Get protocol settings."""
@@ -598,6 +670,24 @@ class ProtocolGroup(ArgumentGroup):
             settings["invite_base_url"] = args.invite_base_url
         if args.monitor_ping:
             settings["debug.monitor_ping"] = args.monitor_ping
+        if args.message_priority:
+            priorities = {}
+            for entry in args.message_priority:
+                message_type, _, priority = entry.rpartition("=")
+                try:
+                    priorities[message_type] = int(priority)
+                except ValueError:
+                    message_type = None
+                if not message_type:
+                    raise ArgsParseError(
+                        "Parameter --message-priority must be of the form "
+                        + "<message-type>=<priority>"
+                    )
+            settings["dispatch.priorities"] = priorities
+        if args.message_ordering:
+            settings["dispatch.ordering"] = args.message_ordering
+        if args.message_priority_aging is not None:
+            settings["dispatch.priority_aging"] = args.message_priority_aging
         if args.public_invites:
             settings["public_invites"] = True
         if args.timing:
@@ -636,6 +726,14 @@ class ProtocolGroup(ArgumentGroup):
                 raise ArgsParseError("Error writing trace event " + str(e))
         if args.preserve_exchange_records:
             settings["preserve_exchange_records"] = True
+        if args.exchange_retention_age is not None:
+            settings["retention.max_age"] = args.exchange_retention_age
+        if args.exchange_archive_dir:
+            settings["retention.archive_dir"] = args.exchange_archive_dir
+        if args.exchange_retention_interval is not None:
+            settings["retention.interval"] = args.exchange_retention_interval
+        if args.exchange_retention_batch:
+            settings["retention.batch_size"] = args.exchange_retention_batch
         return settings
 
 
@@ -674,7 +772,8 @@ class TransportGroup(ArgumentGroup):
             help="REQUIRED. Defines the outbound transport(s) on which the agent\
             will send outgoing messages to other agents. This parameter can be passed\
             multiple times to supoort multiple transport types. Supported outbound\
-            transport types are 'http' and 'ws'.",
+            transport types are 'http', 'http2' and 'ws'. The 'http2' transport\
+            requires the httpx[http2] package.",
         )
         parser.add_argument(
             "-l",
@@ -684,6 +783,15 @@ class TransportGroup(ArgumentGroup):
             help="Specifies the label for this agent. This label is publicized\
             (self-attested) to other agents as part of forming a connection.",
         )
+        parser.add_argument(
+            "--inbound-workers",
+            type=int,
+            metavar="<count>",
+            help="Run the inbound transports in this number of worker processes,\
+            which share the listening ports and the wallet. The main process runs\
+            the admin server, webhooks and the outbound queue. Requires an indy\
+            wallet. Default: inbound messages are handled in the main process.",
+        )
         parser.add_argument(
             "--max-message-size",
             default=2097152,
@@ -698,6 +806,43 @@ class TransportGroup(ArgumentGroup):
             to hold messages for delivery to agents without an endpoint. This\
             option will require additional memory to store messages in the queue.",
         )
+        parser.add_argument(
+            "--undelivered-queue-dir",
+            type=str,
+            metavar="<directory>",
+            help="Persist messages held in the undelivered queue to a log in\
+            this directory, so that they are kept when the agent restarts.\
+            Default: undelivered messages are held in memory only.",
+        )
+        parser.add_argument(
+            "--undelivered-queue-ttl",
+            type=float,
+            metavar="<seconds>",
+            help="Set the number of seconds to hold a message in the undelivered\
+            queue before it expires. Default: 604800 (one week).",
+        )
+        parser.add_argument(
+            "--undelivered-queue-key-quota",
+            type=ByteSize(min_size=1024),
+            metavar="<size>",
+            help="Set the maximum total size in bytes of the undelivered messages\
+            held for one recipient key. The oldest messages are dropped when it\
+            is exceeded. Default: no limit.",
+        )
+        parser.add_argument(
+            "--pickup-batch-size",
+            type=int,
+            metavar="<count>",
+            help="Set the maximum number of undelivered messages returned at once\
+            to a websocket session returning all replies. Default: 100.",
+        )
+        parser.add_argument(
+            "--pickup-batch-bytes",
+            type=ByteSize(min_size=1024),
+            metavar="<size>",
+            help="Set the size in bytes after which no more undelivered messages\
+            are added to a batch returned to a websocket session. Default: 1M.",
+        )
         parser.add_argument(
             "--max-outbound-retry",
             default=4,
@@ -706,6 +851,133 @@ class TransportGroup(ArgumentGroup):
             messages. Increasing this number might cause to increase the\
             accumulated messages in message queue. Default value is 4.",
         )
+        parser.add_argument(
+            "--outbound-retry-base-delay",
+            type=float,
+            metavar="<seconds>",
+            help="Set the delay before retrying a failed outbound delivery. The\
+            delay doubles with each further attempt, with random jitter.\
+            Default: 5.",
+        )
+        parser.add_argument(
+            "--outbound-retry-max-delay",
+            type=float,
+            metavar="<seconds>",
+            help="Set the maximum delay before retrying a failed outbound\
+            delivery. Default: 300.",
+        )
+        parser.add_argument(
+            "--outbound-circuit-threshold",
+            type=int,
+            metavar="<count>",
+            help="Set the number of consecutive delivery failures after which\
+            messages to an endpoint are held back until the endpoint recovers.\
+            Default: 5.",
+        )
+        parser.add_argument(
+            "--outbound-circuit-reset",
+            type=float,
+            metavar="<seconds>",
+            help="Set the number of seconds to hold back messages to a failing\
+            endpoint before a single message is sent to probe it. Default: 60.",
+        )
+        parser.add_argument(
+            "--max-outbound-active",
+            type=int,
+            metavar="<count>",
+            help="Set the maximum number of outbound deliveries in progress at\
+            once across all endpoints. Default: 200.",
+        )
+        parser.add_argument(
+            "--max-endpoint-active",
+            type=int,
+            metavar="<count>",
+            help="Set the maximum number of outbound deliveries in progress at\
+            once to a single endpoint. Endpoints with messages waiting are\
+            served in turn. Default: 50.",
+        )
+        parser.add_argument(
+            "--outbound-http-limit",
+            type=int,
+            metavar="<count>",
+            help="Set the maximum number of open outbound HTTP connections.\
+            Default: 200.",
+        )
+        parser.add_argument(
+            "--outbound-http-limit-per-host",
+            type=int,
+            metavar="<count>",
+            help="Set the maximum number of open outbound HTTP connections to\
+            a single host. Default: 50.",
+        )
+        parser.add_argument(
+            "--outbound-http-keepalive",
+            type=float,
+            metavar="<seconds>",
+            help="Set the number of seconds to keep idle outbound HTTP\
+            connections open for reuse. Use 0 to close each connection after\
+            its request. Default: 15.",
+        )
+        parser.add_argument(
+            "--outbound-http-dns-ttl",
+            type=float,
+            metavar="<seconds>",
+            help="Set the number of seconds to cache resolved host names for\
+            outbound HTTP connections. Use 0 to disable the cache. Default: 10.",
+        )
+        parser.add_argument(
+            "--outbound-http-connect-timeout",
+            type=float,
+            metavar="<seconds>",
+            help="Set the timeout for opening an outbound HTTP connection.\
+            Default: no timeout beyond the overall request limit of 300 seconds.",
+        )
+        parser.add_argument(
+            "--outbound-http-read-timeout",
+            type=float,
+            metavar="<seconds>",
+            help="Set the timeout for reading from an outbound HTTP connection.\
+            Default: no timeout beyond the overall request limit of 300 seconds.",
+        )
+        parser.add_argument(
+            "--outbound-ws-idle-timeout",
+            type=float,
+            metavar="<seconds>",
+            help="Set the number of seconds to keep an idle outbound websocket\
+            connection open for further messages. Use 0 to keep connections\
+            open until they are closed by the other side. Default: 30.",
+        )
+        parser.add_argument(
+            "--outbound-ws-heartbeat",
+            type=float,
+            metavar="<seconds>",
+            help="Set the interval between pings on open outbound websocket\
+            connections. A connection is closed when a ping is not answered.\
+            Use 0 to disable pings. Default: 15.",
+        )
+        parser.add_argument(
+            "--outbound-ws-return-route",
+            action="store_true",
+            help="Process messages received on open outbound websocket\
+            connections as inbound messages, and send responses to them on the\
+            same connection. Default: received messages are discarded.",
+        )
+        parser.add_argument(
+            "--outbound-encode-batch",
+            type=int,
+            metavar="<count>",
+            help="Set the maximum number of outbound messages for the same\
+            recipients which are packed together in one pass. Default: 100.",
+        )
+        parser.add_argument(
+            "--outbound-queue-dir",
+            type=str,
+            metavar="<directory>",
+            help="Persist outbound messages pending delivery to a log in this\
+            directory, so that they are delivered after the agent restarts.\
+            Messages are stored once they are encrypted for their recipients.\
+            Default: outbound messages are held in memory only.",
+        )
 
     def get_settings(self, args: Namespace):
         """Extract transport settings."""
@@ -714,12 +986,69 @@ class TransportGroup(ArgumentGroup):
         settings["transport.outbound_configs"] = args.outbound_transports
         settings["transport.enable_undelivered_queue"] = args.enable_undelivered_queue
 
+        if args.pickup_batch_size:
+            settings["transport.pickup_batch_size"] = args.pickup_batch_size
+        if args.pickup_batch_bytes:
+            settings["transport.pickup_batch_bytes"] = args.pickup_batch_bytes
+        if args.undelivered_queue_dir:
+            settings["transport.undelivered_queue_dir"] = args.undelivered_queue_dir
+        if args.undelivered_queue_ttl:
+            settings["transport.undelivered_queue_ttl"] = args.undelivered_queue_ttl
+        if args.undelivered_queue_key_quota:
+            settings[
+                "transport.undelivered_queue_key_quota"
+            ] = args.undelivered_queue_key_quota
+        if args.inbound_workers:
+            if args.enable_undelivered_queue:
+                raise ArgsParseError(
+                    "Parameter --inbound-workers cannot be used with "
+                    + "--enable-undelivered-queue"
+                )
+            settings["transport.inbound_workers"] = args.inbound_workers
         if args.label:
             settings["default_label"] = args.label
         if args.max_message_size:
             settings["transport.max_message_size"] = args.max_message_size
         if args.max_outbound_retry:
             settings["transport.max_outbound_retry"] = args.max_outbound_retry
+        if args.outbound_retry_base_delay is not None:
+            settings["transport.retry_base_delay"] = args.outbound_retry_base_delay
+        if args.outbound_retry_max_delay is not None:
+            settings["transport.retry_max_delay"] = args.outbound_retry_max_delay
+        if args.outbound_circuit_threshold:
+            settings[
+                "transport.circuit_failure_threshold"
+            ] = args.outbound_circuit_threshold
+        if args.outbound_circuit_reset is not None:
+            settings["transport.circuit_reset_timeout"] = args.outbound_circuit_reset
+        if args.max_outbound_active:
+            settings["transport.max_outbound_active"] = args.max_outbound_active
+        if args.max_endpoint_active:
+            settings["transport.max_endpoint_active"] = args.max_endpoint_active
+        if args.outbound_http_limit:
+            settings["transport.http_limit"] = args.outbound_http_limit
+        if args.outbound_http_limit_per_host:
+            settings["transport.http_limit_per_host"] = args.outbound_http_limit_per_host
+        if args.outbound_http_keepalive is not None:
+            settings["transport.http_keepalive_timeout"] = args.outbound_http_keepalive
+        if args.outbound_http_dns_ttl is not None:
+            settings["transport.http_dns_cache_ttl"] = args.outbound_http_dns_ttl
+        if args.outbound_http_connect_timeout:
+            settings[
+                "transport.http_connect_timeout"
+            ] = args.outbound_http_connect_timeout
+        if args.outbound_http_read_timeout:
+            settings["transport.http_read_timeout"] = args.outbound_http_read_timeout
+        if args.outbound_ws_idle_timeout is not None:
+            settings["transport.ws_idle_timeout"] = args.outbound_ws_idle_timeout
+        if args.outbound_ws_heartbeat is not None:
+            settings["transport.ws_heartbeat"] = args.outbound_ws_heartbeat
+        if args.outbound_ws_return_route:
+            settings["transport.ws_return_route"] = True
+        if args.outbound_encode_batch:
+            settings["transport.encode_batch_size"] = args.outbound_encode_batch
+        if args.outbound_queue_dir:
+            settings["transport.outbound_queue_dir"] = args.outbound_queue_dir
 
         return settings
 
@@ -814,6 +1143,20 @@ class WalletGroup(ArgumentGroup):
             and the '--seed' parameter specifies a new DID, the agent will use\
             the new DID in place of the existing DID. Default: false.",
         )
+        parser.add_argument(
+            "--crypto-workers",
+            type=int,
+            metavar="<count>",
+            help="Pack and unpack messages for a 'basic' wallet on a dedicated pool\
+            of <count> workers. Default: the shared executor.",
+        )
+        parser.add_argument(
+            "--crypto-processes",
+            action="store_true",
+            help="Run the '--crypto-workers' pool in separate processes rather than\
+            threads, so that the JSON and encoding work of packing also runs in\
+            parallel. Default: false.",
+        )
 
     def get_settings(self, args: Namespace) -> dict:
         """Extract wallet settings."""
@@ -838,4 +1181,8 @@ class WalletGroup(ArgumentGroup):
             settings["wallet.storage_creds"] = args.wallet_storage_creds
         if args.replace_public_did:
             settings["wallet.replace_public_did"] = True
+        if args.crypto_workers:
+            settings["wallet.crypto_workers"] = args.crypto_workers
+        if args.crypto_processes:
+            settings["wallet.crypto_processes"] = True
         return settings
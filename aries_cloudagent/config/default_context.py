@@ -21,6 +21,8 @@ from ..protocols.introduction.v0_1.demo_service import DemoIntroductionService
 
 from ..storage.base import BaseStorage
 from ..storage.provider import StorageProvider
+from ..transport.queue.base import BasePersistentQueue
+from ..transport.queue.segment_log import SegmentLogQueue
 from ..transport.wire_format import BaseWireFormat
 from ..utils.stats import Collector
 from ..wallet.base import BaseWallet
@@ -40,8 +42,10 @@ class DefaultContextBuilder(ContextBuilder):
             collector = Collector(log_path=timing_log)
             context.injector.bind_instance(Collector, collector)
 
-        # Shared in-memory cache
-        context.injector.bind_instance(BaseCache, BasicCache())
+        # Shared in-memory cache, which is not shared by inbound worker processes
+        # and would return stale records after an update in another process
+        if not context.settings.get("transport.inbound_workers"):
+            context.injector.bind_instance(BaseCache, BasicCache())
 
         # Global protocol registry
         context.injector.bind_instance(ProtocolRegistry, ProtocolRegistry())
@@ -135,6 +139,13 @@ class DefaultContextBuilder(ContextBuilder):
             ),
         )
 
+        # Persist pending outbound messages, if configured
+        outbound_queue_dir = context.settings.get("transport.outbound_queue_dir")
+        if outbound_queue_dir:
+            context.injector.bind_instance(
+                BasePersistentQueue, SegmentLogQueue(outbound_queue_dir)
+            )
+
         # Allow action menu to be provided by driver
         context.injector.bind_instance(BaseMenuService, DriverMenuService(context))
         context.injector.bind_instance(
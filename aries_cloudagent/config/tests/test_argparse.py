@@ -54,6 +54,46 @@ class TestArgParse(AsyncTestCase):
         assert settings.get("transport.outbound_configs") == ["http"]
         assert result.max_outbound_retry == 5
 
+        args = ["-it", "http", "0.0.0.0", "80", "-ot", "http", "--inbound-workers", "4"]
+        settings = group.get_settings(parser.parse_args(args))
+        assert settings.get("transport.inbound_workers") == 4
+        with self.assertRaises(argparse.ArgsParseError):
+            group.get_settings(
+                parser.parse_args(args + ["--enable-undelivered-queue"])
+            )
+
+    async def test_message_priority_settings(self):
+        parser = ArgumentParser()
+        group = argparse.ProtocolGroup()
+        group.add_arguments(parser)
+        # the protocol settings fall back to the label of the transport group
+        parser.add_argument("--label")
+
+        settings = group.get_settings(
+            parser.parse_args(
+                [
+                    "--message-priority",
+                    "issue-credential=-5",
+                    "--message-priority",
+                    "https://didcomm.org/trust_ping/1.0/ping=20",
+                    "--message-priority-aging",
+                    "0",
+                    "--message-ordering",
+                    "thread",
+                ]
+            )
+        )
+        assert settings["dispatch.priorities"] == {
+            "issue-credential": -5,
+            "https://didcomm.org/trust_ping/1.0/ping": 20,
+        }
+        assert settings["dispatch.priority_aging"] == 0
+        assert settings["dispatch.ordering"] == "thread"
+
+        for entry in ("trust_ping", "=5", "trust_ping=high"):
+            with self.assertRaises(argparse.ArgsParseError):
+                group.get_settings(parser.parse_args(["--message-priority", entry]))
+
     def test_bytesize(self):
         bs = ByteSize()
         with self.assertRaises(ArgumentTypeError):
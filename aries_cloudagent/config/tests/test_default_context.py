@@ -1,5 +1,6 @@
 from asynctest import TestCase as AsyncTestCase
 
+from ...cache.base import BaseCache
 from ...core.protocol_registry import ProtocolRegistry
 from ...storage.base import BaseStorage
 from ...transport.wire_format import BaseWireFormat
@@ -24,3 +25,12 @@ class TestDefaultContext(AsyncTestCase):
             BaseStorage,
         ):
             assert isinstance(await result.inject(cls), cls)
+
+    async def test_build_context_workers(self):
+        builder = DefaultContextBuilder()
+        result = await builder.build()
+        assert await result.inject(BaseCache, required=False)
+
+        builder = DefaultContextBuilder(settings={"transport.inbound_workers": 2})
+        result = await builder.build()
+        assert not await result.inject(BaseCache, required=False)
@@ -26,7 +26,15 @@ class ConnectionRecord(BaseRecord):  # lgtm[py/missing-equals]
     WEBHOOK_TOPIC = "connections"
     LOG_STATE_FLAG = "debug.connections"
     CACHE_ENABLED = True
-    TAG_NAMES = {"my_did", "their_did", "request_id", "invitation_key"}
+    CACHE_MAX_ENTRIES = 1000
+    TAG_NAMES = {
+        "my_did",
+        "their_did",
+        "request_id",
+        "invitation_key",
+        "initiator",
+        "state",
+    }
 
     RECORD_TYPE = "connection"
     RECORD_TYPE_INVITATION = "connection_invitation"
@@ -11,6 +11,8 @@ wallet.
 import hashlib
 import logging
 
+from typing import Coroutine
+
 from ..admin.base_server import BaseAdminServer
 from ..admin.server import AdminServer
 from ..config.default_context import ContextBuilder
@@ -26,13 +28,14 @@ from ..protocols.connections.v1_0.manager import (
 from ..transport.inbound.manager import InboundTransportManager
 from ..transport.inbound.message import InboundMessage
 from ..transport.outbound.base import OutboundDeliveryError
-from ..transport.outbound.manager import OutboundTransportManager, QueuedOutboundMessage
+from ..transport.outbound.manager import OutboundTransportManager
 from ..transport.outbound.message import OutboundMessage
 from ..transport.wire_format import BaseWireFormat
 from ..utils.task_queue import CompletedTask, TaskQueue
 from ..utils.stats import Collector
 
 from .dispatcher import Dispatcher
+from .retention import RecordRetention
 
 LOGGER = logging.getLogger(__name__)
 
@@ -61,6 +64,7 @@ class Conductor:
         self.dispatcher: Dispatcher = None
         self.inbound_transport_manager: InboundTransportManager = None
         self.outbound_transport_manager: OutboundTransportManager = None
+        self.retention: RecordRetention = None
 
     async def setup(self):
         """Initialize the global request context."""
@@ -82,10 +86,17 @@ class Conductor:
 
         # Register all outbound transports
         self.outbound_transport_manager = OutboundTransportManager(
-            context, self.handle_not_delivered
+            context,
+            self.handle_not_delivered,
+            self.inbound_transport_manager.create_session,
         )
         await self.outbound_transport_manager.setup()
 
+        # Background removal of completed exchange records
+        self.retention = RecordRetention.from_settings(context)
+        if self.retention:
+            context.injector.bind_instance(RecordRetention, self.retention)
+
         # Admin API
         if context.settings.get("admin.enabled"):
             try:
@@ -170,6 +181,9 @@ class Conductor:
             # for example
             context.injector.bind_instance(BaseResponder, self.admin_server.responder)
 
+        if self.retention:
+            self.retention.start()
+
         # Get agent label
         default_label = context.settings.get("default_label")
 
@@ -227,8 +241,15 @@ class Conductor:
             shutdown.run(self.inbound_transport_manager.stop())
         if self.outbound_transport_manager:
             shutdown.run(self.outbound_transport_manager.stop())
+        if self.retention:
+            shutdown.run(self.retention.stop())
         await shutdown.complete(timeout)
 
+    @property
+    def webhook_sender(self) -> Coroutine:
+        """Accessor for the function used to dispatch webhooks, if any."""
+        return self.admin_server and self.admin_server.send_webhook
+
     def inbound_message_router(
         self, message: InboundMessage, can_respond: bool = False
     ):
@@ -253,7 +274,7 @@ class Conductor:
         self.dispatcher.queue_message(
             message,
             self.outbound_message_router,
-            self.admin_server and self.admin_server.send_webhook,
+            self.webhook_sender,
             lambda completed: self.dispatch_complete(message, completed),
         )
 
@@ -269,18 +290,16 @@ class Conductor:
         """Get the current stats tracked by the conductor."""
         stats = {
             "in_sessions": len(self.inbound_transport_manager.sessions),
-            "out_encode": 0,
-            "out_deliver": 0,
+            "out_encode": len(self.outbound_transport_manager.outbound_encode),
+            "out_deliver": len(self.outbound_transport_manager.outbound_deliver),
+            "out_depth": self.outbound_transport_manager.depth_stats(),
             "task_active": self.dispatcher.task_queue.current_active,
             "task_done": self.dispatcher.task_queue.total_done,
             "task_failed": self.dispatcher.task_queue.total_failed,
             "task_pending": self.dispatcher.task_queue.current_pending,
         }
-        for m in self.outbound_transport_manager.outbound_buffer:
-            if m.state == QueuedOutboundMessage.STATE_ENCODE:
-                stats["out_encode"] += 1
-            if m.state == QueuedOutboundMessage.STATE_DELIVER:
-                stats["out_deliver"] += 1
+        if self.dispatcher.task_queue.timed:
+            stats["task_wait"] = self.dispatcher.task_queue.wait_stats()
         return stats
 
     async def outbound_message_router(
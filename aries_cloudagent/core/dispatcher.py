@@ -8,7 +8,7 @@ lifecycle hook callbacks storing state for message threads, etc.
 import asyncio
 import logging
 import os
-from typing import Callable, Coroutine, Union
+from typing import Callable, Coroutine, Hashable, Mapping, Union
 
 from aiohttp.web import HTTPException
 
@@ -23,6 +23,8 @@ from ..messaging.util import datetime_now
 from .error import ProtocolMinorVersionNotSupported
 from ..protocols.connections.v1_0.manager import ConnectionManager
 from ..protocols.problem_report.v1_0.message import ProblemReport
+from ..storage.base import BaseStorage
+from ..storage.unit_of_work import StorageUnitOfWork
 
 from ..transport.inbound.message import InboundMessage
 from ..transport.outbound.message import OutboundMessage
@@ -33,6 +35,16 @@ from ..utils.tracing import trace_event, get_timer
 
 LOGGER = logging.getLogger(__name__)
 
+# the keys are message types, protocol URIs, protocol names
+# or protocol names with a message name
+DEFAULT_PRIORITIES = {
+    "trust_ping": 10,
+    "notification": 10,
+    "issue-credential/ack": 10,
+    "present-proof/ack": 10,
+}
+DEFAULT_PRIORITY_AGING = 1.0
+
 
 class Dispatcher:
     """
@@ -46,21 +58,89 @@ class Dispatcher:
         """Initialize an instance of Dispatcher."""
         self.context = context
         self.collector: Collector = None
+        self.ordering: str = None
+        self.priorities: Mapping[str, int] = {}
         self.task_queue: TaskQueue = None
 
     async def setup(self):
         """Perform async instance setup."""
         self.collector = await self.context.inject(Collector, required=False)
         max_active = int(os.getenv("DISPATCHER_MAX_ACTIVE", 50))
+        self.priorities = dict(
+            DEFAULT_PRIORITIES, **(self.context.settings.get("dispatch.priorities") or {})
+        )
+        aging = self.context.settings.get("dispatch.priority_aging")
+        self.ordering = self.context.settings.get("dispatch.ordering")
         self.task_queue = TaskQueue(
-            max_active=max_active, timed=bool(self.collector), trace_fn=self.log_task
+            max_active=max_active,
+            timed=bool(self.collector),
+            trace_fn=self.log_task,
+            aging=DEFAULT_PRIORITY_AGING if aging is None else aging,
         )
 
     def put_task(
-        self, coro: Coroutine, complete: Callable = None, ident: str = None
+        self,
+        coro: Coroutine,
+        complete: Callable = None,
+        ident: str = None,
+        priority: int = 0,
+        key: Hashable = None,
     ) -> PendingTask:
         """Run a task in the task queue, potentially blocking other handlers."""
-        return self.task_queue.put(coro, complete, ident)
+        return self.task_queue.put(coro, complete, ident, priority, key)
+
+    def message_priority(self, message_type: str) -> int:
+        """
+        Look up the priority of handling a message.
+
+        The most specific configured priority applies: the message type, then the
+        protocol URI, then the protocol name with the message name, then the
+        protocol name.
+
+        Args:
+            message_type: The message type URI
+
+        Returns:
+            The configured priority, or zero
+
+        """
+        if not self.priorities or not isinstance(message_type, str):
+            return 0
+        priority = self.priorities.get(message_type)
+        if priority is None:
+            protocol_uri, _, name = message_type.rpartition("/")
+            family = protocol_uri.rpartition("/")[0].rpartition("/")[2]
+            for key in (protocol_uri, f"{family}/{name}", family):
+                priority = self.priorities.get(key)
+                if priority is not None:
+                    break
+        return priority or 0
+
+    def message_key(self, inbound_message: InboundMessage) -> Hashable:
+        """
+        Determine the key of the messages which must be handled in order.
+
+        With connection ordering, the messages from the same sender to the same
+        recipient key are handled one at a time, in the order received. With
+        thread ordering, the messages of the same thread from the same sender
+        are. Messages are handled concurrently when no ordering is configured,
+        or the sender is anonymous under connection ordering.
+
+        Args:
+            inbound_message: The inbound message instance
+
+        Returns:
+            The ordering key of the message, if any
+
+        """
+        receipt = inbound_message.receipt
+        if self.ordering == "connection":
+            if receipt.sender_verkey:
+                return (receipt.sender_verkey, receipt.recipient_verkey)
+        elif self.ordering == "thread":
+            if receipt.thread_id:
+                return (receipt.sender_verkey, receipt.thread_id)
+        return None
 
     def run_task(
         self, coro: Coroutine, complete: Callable = None, ident: str = None
@@ -104,8 +184,14 @@ class Dispatcher:
             A pending task instance resolving to the handler task
 
         """
+        payload = inbound_message.payload
         return self.put_task(
-            self.handle_message(inbound_message, send_outbound, send_webhook), complete
+            self.handle_message(inbound_message, send_outbound, send_webhook),
+            complete,
+            priority=self.message_priority(
+                isinstance(payload, dict) and payload.get("@type")
+            ),
+            key=self.message_key(inbound_message),
         )
 
     async def handle_message(
@@ -175,7 +261,16 @@ class Dispatcher:
         handler = handler_cls().handle
         if self.collector:
             handler = self.collector.wrap_coro(handler, [handler.__qualname__])
-        await handler(context, responder)
+
+        # record writes made by the handler are committed together when it
+        # completes, or discarded if it fails
+        storage: BaseStorage = await context.inject(BaseStorage, required=False)
+        if storage:
+            async with storage.unit_of_work() as uow:
+                context.injector.bind_instance(StorageUnitOfWork, uow)
+                await handler(context, responder)
+        else:
+            await handler(context, responder)
 
         trace_event(
             self.context.settings,
@@ -287,15 +382,26 @@ class DispatcherResponder(BaseResponder):
         Args:
             message: The `OutboundMessage` to be sent
         """
+        uow = await self._context.inject(StorageUnitOfWork, required=False)
+        if uow:
+            # commit record updates before any reply can arrive
+            await uow.commit()
         await self._send(self._context, message, self._inbound_message)
 
     async def send_webhook(self, topic: str, payload: dict):
         """
         Dispatch a webhook.
 
+        Webhooks sent while record writes are pending are held back until the
+        writes have been committed.
+
         Args:
             topic: the webhook topic identifier
             payload: the webhook payload value
         """
         if self._webhook:
-            await self._webhook(topic, payload)
+            uow = await self._context.inject(StorageUnitOfWork, required=False)
+            if uow and uow.pending:
+                uow.after_commit(self._webhook, topic, payload)
+            else:
+                await self._webhook(topic, payload)
@@ -0,0 +1,288 @@
+"""Retention of completed exchange records."""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+
+from typing import Mapping, Sequence, Type
+
+from ..config.injection_context import InjectionContext
+from ..messaging.models.base_record import BaseRecord
+from ..messaging.util import str_to_epoch
+from ..protocols.issue_credential.v1_0.models.credential_exchange import (
+    V10CredentialExchange,
+)
+from ..protocols.present_proof.v1_0.models.presentation_exchange import (
+    V10PresentationExchange,
+)
+from ..storage.base import BaseStorage
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_INTERVAL = 3600.0
+
+# record classes subject to retention, with their terminal states
+RETENTION_RECORD_STATES = {
+    V10CredentialExchange: (V10CredentialExchange.STATE_ACKED,),
+    V10PresentationExchange: (
+        V10PresentationExchange.STATE_VERIFIED,
+        V10PresentationExchange.STATE_PRESENTATION_ACKED,
+    ),
+}
+
+
+class RecordRetention:
+    """
+    Background sweeper for completed exchange records.
+
+    Records in a terminal state which have not been updated within the
+    configured age are removed from storage in bounded batches. When an
+    archive directory is configured they are first appended to a compressed
+    JSON lines file per record type and day of last update, otherwise they
+    are simply deleted.
+    """
+
+    def __init__(
+        self,
+        context: InjectionContext,
+        max_age: float,
+        archive_dir: str = None,
+        batch_size: int = None,
+        interval: float = None,
+        record_states: Mapping[Type[BaseRecord], Sequence[str]] = None,
+    ):
+        """
+        Initialize a `RecordRetention` instance.
+
+        Args:
+            context: The injection context to use
+            max_age: The number of seconds after the last update to keep records
+            archive_dir: The directory for archive files, if records are archived
+            batch_size: The maximum number of records removed in one batch
+            interval: The number of seconds between sweeps
+            record_states: The terminal states for each record class
+
+        """
+        self.context = context
+        self.max_age = max_age
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size or DEFAULT_BATCH_SIZE
+        self.interval = DEFAULT_INTERVAL if interval is None else interval
+        self.record_states = (
+            RETENTION_RECORD_STATES if record_states is None else record_states
+        )
+        self.running = False
+        self.last_sweep_start: float = None
+        self.last_sweep_end: float = None
+        self.total_sweeps = 0
+        self.total_checked = 0
+        self.total_archived = 0
+        self.total_deleted = 0
+        self.total_failed = 0
+        self.record_counts = {
+            record_cls.RECORD_TYPE: 0 for record_cls in self.record_states
+        }
+        self._sweep_task: asyncio.Task = None
+
+    @classmethod
+    def from_settings(cls, context: InjectionContext) -> "RecordRetention":
+        """
+        Create a `RecordRetention` instance from the context settings.
+
+        Returns:
+            The new instance, or None if record retention is not enabled
+
+        """
+        settings = context.settings
+        max_age = settings.get("retention.max_age")
+        if max_age is None:
+            return None
+        return cls(
+            context,
+            max_age,
+            archive_dir=settings.get("retention.archive_dir"),
+            batch_size=settings.get("retention.batch_size"),
+            interval=settings.get("retention.interval"),
+        )
+
+    @property
+    def status(self) -> dict:
+        """Accessor for the progress and counters of the sweeper."""
+        return {
+            "running": self.running,
+            "mode": "archive" if self.archive_dir else "delete",
+            "max_age": self.max_age,
+            "sweeps": self.total_sweeps,
+            "last_sweep_start": self.last_sweep_start,
+            "last_sweep_end": self.last_sweep_end,
+            "checked": self.total_checked,
+            "archived": self.total_archived,
+            "deleted": self.total_deleted,
+            "failed": self.total_failed,
+            "records": dict(self.record_counts),
+        }
+
+    def start(self):
+        """Start sweeping records in the background."""
+        if not self._sweep_task or self._sweep_task.done():
+            self._sweep_task = asyncio.get_event_loop().create_task(
+                self._sweep_loop()
+            )
+
+    async def stop(self):
+        """Stop the background sweeps."""
+        task = self._sweep_task
+        self._sweep_task = None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _sweep_loop(self):
+        """Run sweeps at the configured interval."""
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                LOGGER.exception("Error sweeping exchange records")
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self, now: float = None) -> int:
+        """
+        Remove the expired records of each record class.
+
+        Args:
+            now: The current time as a timestamp, for testing
+
+        Returns:
+            The number of records removed
+
+        """
+        cutoff = (time.time() if now is None else now) - self.max_age
+        removed = 0
+        self.running = True
+        self.last_sweep_start = time.time()
+        try:
+            for record_cls, states in self.record_states.items():
+                removed += await self.sweep_records(record_cls, states, cutoff)
+        finally:
+            self.running = False
+            self.last_sweep_end = time.time()
+            self.total_sweeps += 1
+        return removed
+
+    async def sweep_records(
+        self, record_cls: Type[BaseRecord], states: Sequence[str], cutoff: float
+    ) -> int:
+        """
+        Remove the records of one class in terminal states last updated before cutoff.
+
+        Args:
+            record_cls: The record class to sweep
+            states: The terminal states of the record class
+            cutoff: The timestamp before which records are expired
+
+        Returns:
+            The number of records removed
+
+        """
+        tag_filter = {"state": {"$in": list(states)}}
+        removed = 0
+        # number of matching records kept so far, which precede any remaining
+        # expired records in the storage order
+        kept = 0
+        while True:
+            batch = []
+            records = record_cls.iter_query(self.context, tag_filter, offset=kept)
+            try:
+                async for (_, record) in records:
+                    self.total_checked += 1
+                    if str_to_epoch(record.updated_at) >= cutoff:
+                        kept += 1
+                        continue
+                    batch.append(record)
+                    if len(batch) >= self.batch_size:
+                        break
+            finally:
+                await records.aclose()
+            if not batch:
+                break
+            try:
+                await self.remove_records(record_cls, batch)
+            except Exception:
+                self.total_failed += len(batch)
+                raise
+            removed += len(batch)
+            if len(batch) < self.batch_size:
+                break
+            # let other tasks run between batches
+            await asyncio.sleep(0)
+        return removed
+
+    async def remove_records(
+        self, record_cls: Type[BaseRecord], records: Sequence[BaseRecord]
+    ):
+        """
+        Archive, if configured, and delete a batch of records.
+
+        Args:
+            record_cls: The record class
+            records: The records to remove
+
+        """
+        if self.archive_dir:
+            await asyncio.get_event_loop().run_in_executor(
+                None, self.write_archive, record_cls.RECORD_TYPE, records
+            )
+            self.total_archived += len(records)
+        storage: BaseStorage = await self.context.inject(BaseStorage)
+        await storage.delete_records([record.storage_record for record in records])
+        for record in records:
+            await record.clear_cached(self.context)
+        self.total_deleted += len(records)
+        self.record_counts[record_cls.RECORD_TYPE] = self.record_counts.get(
+            record_cls.RECORD_TYPE, 0
+        ) + len(records)
+
+    def archive_path(self, record_type: str, updated_at: str) -> str:
+        """
+        Get the archive file path for a record.
+
+        Args:
+            record_type: The record type
+            updated_at: The time of the last update to the record
+
+        Returns:
+            The path of the compressed JSON lines file for the record type and day
+
+        """
+        day = time.strftime("%Y-%m-%d", time.gmtime(str_to_epoch(updated_at)))
+        return os.path.join(self.archive_dir, f"{record_type}-{day}.jsonl.gz")
+
+    def write_archive(self, record_type: str, records: Sequence[BaseRecord]):
+        """
+        Append records to their archive files.
+
+        Args:
+            record_type: The record type
+            records: The records to archive
+
+        """
+        lines = {}
+        for record in records:
+            path = self.archive_path(record_type, record.updated_at)
+            line = json.dumps(
+                {"type": record_type, "record": record.serialize(trusted=True)}
+            )
+            lines.setdefault(path, []).append(line + "\n")
+        os.makedirs(self.archive_dir, exist_ok=True)
+        for path, path_lines in lines.items():
+            # each append adds a gzip member, which readers treat as one stream
+            with gzip.open(path, "at", encoding="utf-8") as archive:
+                archive.writelines(path_lines)
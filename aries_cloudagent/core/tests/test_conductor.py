@@ -134,10 +134,16 @@ class TestConductor(AsyncTestCase, Config, TestDIDs):
         ) as mock_logger:
 
             mock_inbound_mgr.return_value.sessions = ["dummy"]
-            mock_outbound_mgr.return_value.outbound_buffer = [
-                async_mock.MagicMock(state=QueuedOutboundMessage.STATE_ENCODE),
-                async_mock.MagicMock(state=QueuedOutboundMessage.STATE_DELIVER),
-            ]
+            mock_outbound_mgr.return_value.outbound_encode = {
+                async_mock.MagicMock(state=QueuedOutboundMessage.STATE_ENCODE)
+            }
+            mock_outbound_mgr.return_value.outbound_deliver = {
+                async_mock.MagicMock(state=QueuedOutboundMessage.STATE_DELIVER)
+            }
+            mock_outbound_mgr.return_value.depth_stats.return_value = {
+                "all": {"count": 0},
+                "endpoints": {},
+            }
 
             await conductor.setup()
 
@@ -148,12 +154,16 @@ class TestConductor(AsyncTestCase, Config, TestDIDs):
                     "in_sessions",
                     "out_encode",
                     "out_deliver",
+                    "out_depth",
                     "task_active",
                     "task_done",
                     "task_failed",
                     "task_pending",
                 ]
             )
+            assert stats["out_encode"] == 1
+            assert stats["out_deliver"] == 1
+            assert stats["out_depth"]["endpoints"] == {}
 
     async def test_setup_x(self):
         builder: ContextBuilder = StubContextBuilder(self.test_settings)
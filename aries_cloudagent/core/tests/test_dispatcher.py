@@ -10,6 +10,8 @@ from ...messaging.agent_message import AgentMessage, AgentMessageSchema
 from ...messaging.util import datetime_now
 
 from ...protocols.problem_report.v1_0.message import ProblemReport
+from ...storage.base import BaseStorage
+from ...storage.basic import BasicStorage
 
 from ...transport.inbound.message import InboundMessage
 from ...transport.inbound.receipt import MessageReceipt
@@ -110,6 +112,78 @@ class TestDispatcher(AsyncTestCase):
                 handler_mock.call_args[0][2], test_module.DispatcherResponder
             )
 
+    async def test_message_priority(self):
+        context = make_context()
+        context.update_settings(
+            {
+                "dispatch.priorities": {
+                    "proto-name/1.1": 3,
+                    "proto-name/other": 4,
+                    "https://didcomm.org/trust_ping/1.0/ping": 20,
+                },
+                "dispatch.priority_aging": 0,
+            }
+        )
+        dispatcher = test_module.Dispatcher(context)
+        await dispatcher.setup()
+        assert not dispatcher.task_queue.aging
+        assert dispatcher.message_priority("proto-name/1.1/message-type") == 3
+        assert dispatcher.message_priority("proto-name/1.2/other") == 4
+        assert dispatcher.message_priority("proto-name/1.2/message-type") == 0
+        assert dispatcher.message_priority("https://didcomm.org/trust_ping/1.0/ping") == 20
+        assert (
+            dispatcher.message_priority(
+                "did:sov:BzCbsNYhMrjHiqZDTUASHg;spec/trust_ping/1.0/ping_response"
+            )
+            == 10
+        )
+        assert (
+            dispatcher.message_priority("https://didcomm.org/issue-credential/1.0/ack")
+            == 10
+        )
+        assert dispatcher.message_priority(None) == 0
+
+        with async_mock.patch.object(
+            dispatcher, "put_task", async_mock.MagicMock()
+        ) as put_task, async_mock.patch.object(
+            dispatcher, "handle_message", async_mock.MagicMock()
+        ):
+            dispatcher.queue_message(
+                make_inbound({"@type": "proto-name/1.1/message-type"}), None
+            )
+            assert put_task.call_args[1]["priority"] == 3
+            dispatcher.queue_message(make_inbound("not parsed"), None)
+            assert put_task.call_args[1]["priority"] == 0
+            assert put_task.call_args[1]["key"] is None
+
+    async def test_message_key(self):
+        context = make_context()
+        dispatcher = test_module.Dispatcher(context)
+        await dispatcher.setup()
+        inbound = make_inbound({})
+        inbound.receipt.sender_verkey = "sender"
+        inbound.receipt.recipient_verkey = "recipient"
+        assert dispatcher.message_key(inbound) is None
+
+        dispatcher.ordering = "connection"
+        assert dispatcher.message_key(inbound) == ("sender", "recipient")
+        dispatcher.ordering = "thread"
+        assert dispatcher.message_key(inbound) == ("sender", "dummy-thread")
+
+        inbound.receipt.sender_verkey = None
+        assert dispatcher.message_key(inbound) == (None, "dummy-thread")
+        dispatcher.ordering = "connection"
+        assert dispatcher.message_key(inbound) is None
+
+        with async_mock.patch.object(
+            dispatcher, "put_task", async_mock.MagicMock()
+        ) as put_task, async_mock.patch.object(
+            dispatcher, "handle_message", async_mock.MagicMock()
+        ):
+            inbound.receipt.sender_verkey = "sender"
+            dispatcher.queue_message(inbound, None)
+            assert put_task.call_args[1]["key"] == ("sender", "recipient")
+
     async def test_dispatch_versioned_message(self):
         context = make_context()
         context.enforce_typing = False
@@ -301,3 +375,51 @@ class TestDispatcher(AsyncTestCase):
         result = await responder.create_outbound(message)
         assert json.loads(result.payload)["@type"] == StubAgentMessage.Meta.message_type
         await responder.send_webhook("topic", "payload")
+
+    async def test_dispatch_unit_of_work(self):
+        context = make_context()
+        context.enforce_typing = False
+        storage = BasicStorage()
+        context.injector.bind_instance(BaseStorage, storage)
+        registry = await context.inject(ProtocolRegistry)
+        registry.register_message_types(
+            {StubAgentMessage.Meta.message_type: StubAgentMessage}
+        )
+        dispatcher = test_module.Dispatcher(context)
+        await dispatcher.setup()
+        rcv = Receiver()
+        webhook = async_mock.CoroutineMock()
+        message = {"@type": StubAgentMessage.Meta.message_type}
+
+        async def handle(_, handler_context, responder):
+            uow = await handler_context.inject(test_module.StorageUnitOfWork)
+            record = ConnectionRecord(state="request")
+            await record.save(handler_context, webhook=False)
+            await responder.send_webhook("topic", "payload")
+            webhook.assert_not_called()
+            assert not await storage.search_records(record.RECORD_TYPE).fetch_all()
+            await responder.send(StubAgentMessage(), connection_id="dummy")
+            webhook.assert_awaited_once_with("topic", "payload")
+            assert not uow.pending
+            record.state = "response"
+            await record.save(handler_context, webhook=False)
+            assert uow.pending
+
+        with async_mock.patch.object(
+            StubAgentMessageHandler, "handle", autospec=True
+        ) as handler_mock, async_mock.patch.object(
+            test_module, "ConnectionManager", autospec=True
+        ) as conn_mgr_mock:
+            handler_mock.side_effect = handle
+            conn_mgr_mock.return_value = async_mock.MagicMock(
+                find_inbound_connection=async_mock.CoroutineMock(return_value=None)
+            )
+            await dispatcher.queue_message(make_inbound(message), rcv.send, webhook)
+            await dispatcher.task_queue
+            handler_mock.assert_awaited_once()
+
+        assert len(rcv.messages) == 1
+        (row,) = await storage.search_records(
+            ConnectionRecord.RECORD_TYPE
+        ).fetch_all()
+        assert row.tags["state"] == "response"
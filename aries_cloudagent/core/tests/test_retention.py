@@ -0,0 +1,142 @@
+import asyncio
+import gzip
+import json
+
+from tempfile import TemporaryDirectory
+
+from asynctest import TestCase as AsyncTestCase
+
+from ...config.injection_context import InjectionContext
+from ...messaging.util import epoch_to_str
+from ...protocols.issue_credential.v1_0.models.credential_exchange import (
+    V10CredentialExchange,
+)
+from ...protocols.present_proof.v1_0.models.presentation_exchange import (
+    V10PresentationExchange,
+)
+from ...storage.base import BaseStorage
+from ...storage.basic import BasicStorage
+
+from ..retention import RecordRetention
+
+DAY = 86400
+NOW = 1600000000
+
+
+class TestRecordRetention(AsyncTestCase):
+    async def setUp(self):
+        self.context = InjectionContext(enforce_typing=False)
+        self.storage = BasicStorage()
+        self.context.injector.bind_instance(BaseStorage, self.storage)
+
+    async def add_exchange(
+        self, record_id, state, age, record_cls=V10CredentialExchange
+    ):
+        record = record_cls(
+            state=state,
+            connection_id="conn-id",
+            created_at=epoch_to_str(NOW - age),
+            updated_at=epoch_to_str(NOW - age),
+        )
+        record._id = record_id
+        await self.storage.add_record(record.storage_record)
+        return record
+
+    async def remaining(self, record_cls=V10CredentialExchange):
+        return sorted(record._id for record in await record_cls.query(self.context))
+
+    def test_from_settings(self):
+        assert RecordRetention.from_settings(InjectionContext()) is None
+        retention = RecordRetention.from_settings(
+            InjectionContext(
+                settings={
+                    "retention.max_age": 30.0,
+                    "retention.archive_dir": "/tmp/archive",
+                    "retention.batch_size": 5,
+                }
+            )
+        )
+        assert retention.max_age == 30.0
+        assert retention.archive_dir == "/tmp/archive"
+        assert retention.batch_size == 5
+        assert retention.status["mode"] == "archive"
+
+    async def test_sweep_delete(self):
+        acked = V10CredentialExchange.STATE_ACKED
+        for i in range(7):
+            # expired, alternating with a recent completed record
+            await self.add_exchange(f"old-{i}", acked, 2 * DAY)
+            await self.add_exchange(f"new-{i}", acked, 60)
+        await self.add_exchange(
+            "active", V10CredentialExchange.STATE_OFFER_SENT, 2 * DAY
+        )
+        await self.add_exchange(
+            "verified",
+            V10PresentationExchange.STATE_VERIFIED,
+            2 * DAY,
+            V10PresentationExchange,
+        )
+
+        retention = RecordRetention(self.context, DAY, batch_size=3)
+        assert await retention.sweep(now=NOW) == 8
+        assert await self.remaining() == ["active"] + [f"new-{i}" for i in range(7)]
+        assert await self.remaining(V10PresentationExchange) == []
+
+        status = retention.status
+        assert status["mode"] == "delete"
+        assert status["sweeps"] == 1
+        assert status["deleted"] == 8
+        assert status["archived"] == 0
+        assert status["failed"] == 0
+        assert status["records"] == {
+            V10CredentialExchange.RECORD_TYPE: 7,
+            V10PresentationExchange.RECORD_TYPE: 1,
+        }
+        assert not status["running"]
+
+        assert await retention.sweep(now=NOW) == 0
+        assert await retention.sweep(now=NOW + DAY) == 7
+        assert await self.remaining() == ["active"]
+
+    async def test_sweep_archive(self):
+        acked = V10CredentialExchange.STATE_ACKED
+        with TemporaryDirectory() as archive_dir:
+            old = await self.add_exchange("old", acked, 3 * DAY)
+            older = await self.add_exchange("older", acked, 4 * DAY)
+            retention = RecordRetention(self.context, DAY, archive_dir=archive_dir)
+            assert await retention.sweep(now=NOW) == 2
+            await self.add_exchange("again", acked, 3 * DAY)
+            assert await retention.sweep(now=NOW) == 1
+            assert retention.status["archived"] == 3
+
+            path = retention.archive_path(
+                V10CredentialExchange.RECORD_TYPE, old.updated_at
+            )
+            with gzip.open(path, "rt") as archive:
+                lines = [json.loads(line) for line in archive]
+            assert [line["record"]["credential_exchange_id"] for line in lines] == [
+                "old",
+                "again",
+            ]
+            assert lines[0] == {
+                "type": V10CredentialExchange.RECORD_TYPE,
+                "record": old.serialize(),
+            }
+            path = retention.archive_path(
+                V10CredentialExchange.RECORD_TYPE, older.updated_at
+            )
+            with gzip.open(path, "rt") as archive:
+                assert len(archive.readlines()) == 1
+        assert await self.remaining() == []
+
+    async def test_start_stop(self):
+        await self.add_exchange("old", V10CredentialExchange.STATE_ACKED, 2 * DAY)
+        retention = RecordRetention(self.context, DAY, interval=0.01)
+        retention.start()
+        for _ in range(100):
+            if retention.status["sweeps"]:
+                break
+            await asyncio.sleep(0.01)
+        await retention.stop()
+        assert retention.status["sweeps"] >= 1
+        assert await self.remaining() == []
@@ -0,0 +1,149 @@
+import asyncio
+
+from tempfile import TemporaryDirectory
+
+from asynctest import TestCase as AsyncTestCase
+from asynctest import mock as async_mock
+
+from ...config.base import ConfigError
+from ...config.injection_context import InjectionContext
+from ...connections.models.connection_target import ConnectionTarget
+from ...storage.base import BaseStorage
+from ...storage.basic import BasicStorage
+from ...storage.sqlite import SqliteStorage
+from ...transport.outbound.message import OutboundMessage
+from ...wallet.base import BaseWallet
+
+from .. import worker as test_module
+from ..worker import (
+    Coordinator,
+    WorkerConductor,
+    is_shared_storage,
+    worker_settings,
+)
+
+from .test_conductor import StubContextBuilder
+
+
+class TestWorker(AsyncTestCase):
+    def test_worker_settings(self):
+        settings = worker_settings(
+            {
+                "admin.enabled": True,
+                "transport.inbound_configs": [["http", "0.0.0.0", "80"]],
+                "transport.outbound_configs": ["http"],
+                "transport.outbound_queue_dir": "/tmp/queue",
+            }
+        )
+        assert settings["transport.inbound_configs"] == [["http", "0.0.0.0", "80"]]
+        assert settings["transport.inbound_reuse_port"]
+        assert not settings["admin.enabled"]
+        assert not settings["transport.outbound_configs"]
+        assert not settings["transport.outbound_queue_dir"]
+
+    async def test_forward_to_coordinator(self):
+        coordinator = Coordinator({}, 1, None)
+        coordinator.conductor = async_mock.MagicMock(
+            admin_server=async_mock.MagicMock(send_webhook=async_mock.CoroutineMock()),
+            queue_outbound=async_mock.CoroutineMock(),
+        )
+        coordinator.conductor.dispatcher.run_task = asyncio.ensure_future
+
+        with TemporaryDirectory() as socket_dir:
+            coordinator.socket_dir = socket_dir
+            server = await asyncio.start_unix_server(
+                coordinator.handle_worker, coordinator.socket_path
+            )
+            worker = WorkerConductor(None, coordinator.socket_path)
+            assert worker.webhook_sender == worker.send_webhook
+            _, worker.coordinator = await asyncio.open_unix_connection(
+                coordinator.socket_path
+            )
+
+            outbound = OutboundMessage(
+                connection_id="conn-id",
+                payload="{}",
+                enc_payload=b"packed",
+                target=ConnectionTarget(
+                    endpoint="http://localhost", recipient_keys=["verkey"]
+                ),
+            )
+            await worker.queue_outbound(None, outbound)
+            await worker.send_webhook("topic", {"state": "active"})
+            await worker.stop()
+
+            for _ in range(50):
+                if coordinator.conductor.admin_server.send_webhook.await_count:
+                    break
+                await asyncio.sleep(0.01)
+            server.close()
+            await server.wait_closed()
+
+        coordinator.conductor.admin_server.send_webhook.assert_awaited_once_with(
+            "topic", {"state": "active"}
+        )
+        coordinator.conductor.queue_outbound.assert_awaited_once()
+        received = coordinator.conductor.queue_outbound.call_args[0][1]
+        assert received.connection_id == "conn-id"
+        assert received.payload == "{}"
+        assert received.enc_payload == b"packed"
+        assert received.target.endpoint == "http://localhost"
+        assert received.target.recipient_keys == ["verkey"]
+
+    async def test_coordinator_requires_shared_wallet(self):
+        coordinator = Coordinator({}, 1, None)
+        coordinator.conductor = test_module.Conductor(StubContextBuilder({}))
+        with self.assertRaises(ConfigError):
+            await coordinator.start()
+        assert not coordinator.workers
+
+    async def test_coordinator_requires_shared_storage(self):
+        coordinator = Coordinator({}, 1, None)
+        context = InjectionContext(enforce_typing=False)
+        context.injector.bind_instance(
+            BaseWallet, async_mock.MagicMock(WALLET_TYPE="indy")
+        )
+        context.injector.bind_instance(BaseStorage, BasicStorage())
+        coordinator.conductor = async_mock.MagicMock(
+            setup=async_mock.CoroutineMock(),
+            start=async_mock.CoroutineMock(),
+            context=context,
+        )
+        with self.assertRaises(ConfigError):
+            await coordinator.start()
+        coordinator.conductor.start.assert_not_awaited()
+        assert not coordinator.workers
+
+    async def test_is_shared_storage(self):
+        assert not is_shared_storage(BasicStorage())
+        storage = SqliteStorage()
+        assert not is_shared_storage(storage)
+        await storage.close()
+        with TemporaryDirectory() as storage_dir:
+            storage = SqliteStorage(config={"path": f"{storage_dir}/storage.db"})
+            assert is_shared_storage(storage)
+            await storage.close()
+
+    async def test_supervise(self):
+        coordinator = Coordinator({}, 2, None)
+        alive = async_mock.MagicMock(is_alive=async_mock.MagicMock(return_value=True))
+        exited = async_mock.MagicMock(is_alive=async_mock.MagicMock(return_value=False))
+        replacement = async_mock.MagicMock()
+        coordinator.workers = [alive, exited]
+        with async_mock.patch.object(
+            test_module, "SUPERVISE_INTERVAL", 0.01
+        ), async_mock.patch.object(
+            coordinator, "start_worker", return_value=replacement
+        ) as start_worker:
+            supervisor = asyncio.ensure_future(coordinator.supervise())
+            await asyncio.sleep(0.05)
+            supervisor.cancel()
+        start_worker.assert_called_once_with()
+        assert coordinator.workers == [alive, replacement]
+
+        coordinator.conductor = async_mock.MagicMock(stop=async_mock.CoroutineMock())
+        await coordinator.stop()
+        alive.terminate.assert_called_once_with()
+        replacement.join.assert_called_once_with(1.0)
+        assert not coordinator.workers
+        coordinator.conductor.stop.assert_awaited_once_with(1.0)
@@ -0,0 +1,306 @@
+"""
+Inbound worker processes.
+
+In worker mode a coordinator process runs the admin server, webhooks, record
+retention and the outbound queue, while several worker processes listen on the
+inbound transports with SO_REUSEPORT and dispatch the messages they receive.
+All processes share the wallet and storage. Workers hand their outbound
+messages and webhooks to the coordinator over a Unix socket.
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from typing import Callable, Coroutine, Mapping
+
+from ..admin.server import AdminResponder
+from ..config.base import ConfigError
+from ..config.default_context import ContextBuilder, DefaultContextBuilder
+from ..config.injection_context import InjectionContext
+from ..messaging.responder import BaseResponder
+from ..storage.base import BaseStorage
+from ..storage.sqlite import SqliteStorage
+from ..transport.inbound.message import InboundMessage
+from ..transport.outbound.message import OutboundMessage
+from ..wallet.base import BaseWallet
+
+from .conductor import Conductor
+
+LOGGER = logging.getLogger(__name__)
+
+SOCKET_NAME = "coordinator.sock"
+SUPERVISE_INTERVAL = 1.0
+
+
+def worker_settings(settings: Mapping[str, object]) -> dict:
+    """
+    Derive the settings of an inbound worker from the agent settings.
+
+    Args:
+        settings: The agent settings, including the inbound transports
+
+    Returns:
+        The worker settings, with the services owned by the coordinator disabled
+
+    """
+    settings = dict(settings)
+    settings.update(
+        {
+            "admin.enabled": False,
+            "debug.print_invitation": False,
+            "debug.test_suite_endpoint": None,
+            "retention.max_age": None,
+            "transport.enable_undelivered_queue": False,
+            "transport.inbound_reuse_port": True,
+            "transport.outbound_configs": [],
+            "transport.outbound_queue_dir": None,
+        }
+    )
+    return settings
+
+
+def is_shared_storage(storage: BaseStorage) -> bool:
+    """
+    Check whether a storage instance is shared by all of the agent processes.
+
+    Args:
+        storage: The storage instance
+
+    Returns:
+        True for indy storage, or sqlite storage held in a file
+
+    """
+    if isinstance(storage, SqliteStorage):
+        return not storage.in_memory
+    try:
+        # indy storage requires the optional indy module
+        from ..storage.indy import IndyStorage
+    except ImportError:
+        return False
+    return isinstance(storage, IndyStorage)
+
+
+class WorkerConductor(Conductor):
+    """
+    Conductor of an inbound worker process.
+
+    Only the inbound transports are started. Responses are returned to the
+    inbound sessions of this worker when possible, and otherwise passed to the
+    coordinator along with any webhooks.
+    """
+
+    def __init__(self, context_builder: ContextBuilder, socket_path: str) -> None:
+        """
+        Initialize an instance of WorkerConductor.
+
+        Args:
+            context_builder: The context builder for the worker settings
+            socket_path: The path of the coordinator socket
+
+        """
+        super().__init__(context_builder)
+        self.coordinator: asyncio.StreamWriter = None
+        self.socket_path = socket_path
+
+    @property
+    def webhook_sender(self) -> Coroutine:
+        """Accessor for the function used to dispatch webhooks."""
+        return self.send_webhook
+
+    async def start(self) -> None:
+        """Connect to the coordinator and start the inbound transports."""
+        _, self.coordinator = await asyncio.open_unix_connection(self.socket_path)
+        self.context.injector.bind_instance(
+            BaseResponder,
+            AdminResponder(
+                self.context, self.outbound_message_router, self.send_webhook
+            ),
+        )
+        try:
+            await self.inbound_transport_manager.start()
+        except Exception:
+            LOGGER.exception("Unable to start inbound transports")
+            raise
+        LOGGER.info("Inbound worker %d started", os.getpid())
+
+    async def stop(self, timeout=1.0):
+        """Stop the worker."""
+        await super().stop(timeout)
+        if self.coordinator:
+            self.coordinator.close()
+            self.coordinator = None
+
+    async def send_coordinator(self, record: dict):
+        """Send a record to the coordinator."""
+        if not self.coordinator:
+            LOGGER.warning("Not connected to coordinator, dropping %s", record["type"])
+            return
+        self.coordinator.write(json.dumps(record).encode("utf-8") + b"\n")
+        await self.coordinator.drain()
+
+    async def queue_outbound(
+        self,
+        context: InjectionContext,
+        outbound: OutboundMessage,
+        inbound: InboundMessage = None,
+    ):
+        """
+        Pass an outbound message to the coordinator for delivery.
+
+        Args:
+            context: The request context
+            outbound: An outbound message to be sent
+            inbound: The inbound message that produced this response, if available
+
+        """
+        await self.send_coordinator({"type": "outbound", "message": outbound.serialize()})
+
+    async def send_webhook(self, topic: str, payload: dict):
+        """
+        Pass a webhook to the coordinator.
+
+        Args:
+            topic: the webhook topic identifier
+            payload: the webhook payload value
+
+        """
+        await self.send_coordinator(
+            {"type": "webhook", "topic": topic, "payload": payload}
+        )
+
+
+class Coordinator:
+    """
+    Coordinator of the inbound worker processes.
+
+    The coordinator runs a conductor without inbound transports, starts the
+    workers once it is ready and replaces any worker which exits.
+    """
+
+    def __init__(
+        self, settings: Mapping[str, object], worker_count: int, run_worker: Callable
+    ):
+        """
+        Initialize an instance of Coordinator.
+
+        Args:
+            settings: The agent settings
+            worker_count: The number of worker processes
+            run_worker: The entrypoint of a worker process, called with the
+                worker settings and the coordinator socket path
+
+        """
+        self.inbound_configs = settings.get("transport.inbound_configs") or []
+        self.conductor = Conductor(
+            DefaultContextBuilder(dict(settings, **{"transport.inbound_configs": []}))
+        )
+        self.run_worker = run_worker
+        self.server: asyncio.AbstractServer = None
+        self.socket_dir: str = None
+        self.worker_count = worker_count
+        self.workers = []
+        self._supervisor: asyncio.Task = None
+
+    @property
+    def socket_path(self) -> str:
+        """Accessor for the path of the coordinator socket."""
+        return os.path.join(self.socket_dir, SOCKET_NAME)
+
+    async def start(self):
+        """Start the conductor, then the worker processes."""
+        await self.conductor.setup()
+        wallet: BaseWallet = await self.conductor.context.inject(BaseWallet)
+        if wallet.WALLET_TYPE != "indy":
+            raise ConfigError("Inbound workers require a shared wallet, such as indy")
+        storage: BaseStorage = await self.conductor.context.inject(BaseStorage)
+        if not is_shared_storage(storage):
+            raise ConfigError(
+                "Inbound workers require a shared storage, "
+                "either indy or sqlite with a file path"
+            )
+        await self.conductor.start()
+
+        # the socket directory is only accessible to this user
+        self.socket_dir = tempfile.mkdtemp(prefix="aca-py-")
+        self.server = await asyncio.start_unix_server(
+            self.handle_worker, self.socket_path
+        )
+        for _ in range(self.worker_count):
+            self.workers.append(self.start_worker())
+        self._supervisor = asyncio.get_event_loop().create_task(self.supervise())
+
+    def start_worker(self) -> multiprocessing.Process:
+        """Start a worker process."""
+        # the settings include any genesis transactions fetched at startup
+        settings = dict(
+            self.conductor.context.settings,
+            **{"transport.inbound_configs": self.inbound_configs},
+        )
+        process = multiprocessing.get_context("spawn").Process(
+            target=self.run_worker,
+            args=(worker_settings(settings), self.socket_path),
+            daemon=True,
+        )
+        process.start()
+        LOGGER.info("Started inbound worker %d", process.pid)
+        return process
+
+    async def supervise(self):
+        """Replace worker processes which have exited."""
+        while True:
+            await asyncio.sleep(SUPERVISE_INTERVAL)
+            for idx, process in enumerate(self.workers):
+                if not process.is_alive():
+                    LOGGER.warning(
+                        "Inbound worker %d exited with code %s, restarting",
+                        process.pid,
+                        process.exitcode,
+                    )
+                    self.workers[idx] = self.start_worker()
+
+    async def handle_worker(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """Process the records sent by a worker until it disconnects."""
+        conductor = self.conductor
+        try:
+            async for line in reader:
+                record = json.loads(line)
+                if record["type"] == "outbound":
+                    outbound = OutboundMessage.deserialize(record["message"])
+                    conductor.dispatcher.run_task(
+                        conductor.queue_outbound(conductor.context, outbound)
+                    )
+                elif record["type"] == "webhook" and conductor.admin_server:
+                    await conductor.admin_server.send_webhook(
+                        record["topic"], record["payload"]
+                    )
+        except (ConnectionError, ValueError):
+            LOGGER.exception("Error receiving from inbound worker")
+        finally:
+            writer.close()
+
+    async def stop(self, timeout=1.0):
+        """Stop the worker processes and the conductor."""
+        if self._supervisor:
+            self._supervisor.cancel()
+            self._supervisor = None
+        for process in self.workers:
+            process.terminate()
+        loop = asyncio.get_event_loop()
+        for process in self.workers:
+            await loop.run_in_executor(None, process.join, timeout)
+        self.workers = []
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.socket_dir:
+            shutil.rmtree(self.socket_dir, ignore_errors=True)
+            self.socket_dir = None
+        await self.conductor.stop(timeout)
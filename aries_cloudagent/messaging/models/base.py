@@ -2,15 +2,27 @@
 import logging
 from abc import ABC
 import json
-from typing import Union
-
-from marshmallow import Schema, post_dump, pre_load, post_load, ValidationError, EXCLUDE
+from typing import Any, Callable, Mapping, Union
+
+from marshmallow import (
+    EXCLUDE,
+    Schema,
+    ValidationError,
+    fields,
+    missing,
+    post_dump,
+    post_load,
+    pre_load,
+)
 
 from ...core.error import BaseError
 from ...utils.classloader import ClassLoader
 
 LOGGER = logging.getLogger(__name__)
 
+# compiled serializers by schema class, or None where compilation is not supported
+COMPILED_SCHEMAS = {}
+
 
 def resolve_class(the_cls, relative_cls: type = None):
     """
@@ -111,36 +123,47 @@ class BaseModel(ABC):
         return self._get_schema_class()
 
     @classmethod
-    def deserialize(cls, obj):
+    def deserialize(cls, obj, trusted: bool = False):
         """
         Convert from JSON representation to a model instance.
 
         Args:
             obj: The dict to load into a model instance
+            trusted: Skip validation, for data previously serialized by this agent
 
         Returns:
             A model instance for this data
 
         """
-        schema = cls._get_schema_class()(unknown=EXCLUDE)
+        schema_cls = cls._get_schema_class()
+        compiled = trusted and schema_cls.compiled()
+        if compiled:
+            return compiled.load(json.loads(obj) if isinstance(obj, str) else obj)
+        schema = schema_cls(unknown=EXCLUDE)
         try:
             return schema.loads(obj) if isinstance(obj, str) else schema.load(obj)
         except ValidationError as e:
             LOGGER.exception(f"{cls.__name__} message validation error:")
             raise BaseModelError(f"{cls.__name__} schema validation failed") from e
 
-    def serialize(self, as_string=False) -> dict:
+    def serialize(self, as_string=False, trusted: bool = False) -> dict:
         """
         Create a JSON-compatible dict representation of the model instance.
 
         Args:
             as_string: Return a string of JSON instead of a dict
+            trusted: Use the compiled serializer for the schema, if available
 
         Returns:
             A dict representation of this model, or a JSON string if as_string is True
 
         """
-        schema = self.Schema()
+        schema_cls = self.Schema
+        compiled = trusted and schema_cls.compiled()
+        if compiled:
+            ret = compiled.dump(self)
+            return json.dumps(ret) if as_string else ret
+        schema = schema_cls()
         try:
             return schema.dumps(self) if as_string else schema.dump(self)
         except ValidationError as e:
@@ -232,6 +255,26 @@ class BaseModelSchema(Schema):
         """
         return resolve_class(cls.Meta.model_class, cls)
 
+    @classmethod
+    def compiled(cls) -> "CompiledSchema":
+        """
+        Get the compiled serializer for this schema.
+
+        Returns:
+            The cached `CompiledSchema` instance, or None if the schema defines
+            hooks or field attributes which cannot be compiled
+
+        """
+        if cls not in COMPILED_SCHEMAS:
+            hooks = {name for names in cls._hooks.values() for name in names}
+            compiled = None
+            if hooks <= CompiledSchema.BASE_HOOKS:
+                compiled = CompiledSchema(cls())
+                if not compiled.supported:
+                    compiled = None
+            COMPILED_SCHEMAS[cls] = compiled
+        return COMPILED_SCHEMAS[cls]
+
     @property
     def Model(self) -> type:
         """
@@ -288,3 +331,146 @@ class BaseModelSchema(Schema):
         """
         skip_vals = resolve_meta_property(self, "skip_values", [])
         return {key: value for key, value in data.items() if value not in skip_vals}
+
+
+def _passthrough_types(field: fields.Field):
+    """
+    Determine the value types which a field serializes unchanged.
+
+    Returns:
+        A tuple of types, True if all values are unchanged, or None
+
+    """
+    field_type = type(field)
+    if field_type is fields.String:
+        return (str,)
+    if field_type is fields.Boolean:
+        return (bool,)
+    if field_type is fields.Integer and not field.as_string:
+        return (int,)
+    if field_type is fields.Float and not field.as_string:
+        return (float,)
+    if field_type is fields.Raw:
+        return True
+    if field_type is fields.Dict and not (field.key_field or field.value_field):
+        return True
+    return None
+
+
+class CompiledSchema:
+    """
+    Serializer for trusted round trips of a `BaseModelSchema`.
+
+    The field getters and converters for the schema are resolved once, so that
+    dumping and loading avoid the marshmallow machinery. Dumping produces the
+    same result as the schema. Loading performs no validation, and is only
+    suitable for data previously serialized by this agent: untrusted input
+    such as inbound messages and admin requests must use the schema itself.
+    """
+
+    # hooks defined by `BaseModelSchema` which are replicated here
+    BASE_HOOKS = {"skip_dump_only", "make_model", "remove_skipped_values"}
+
+    def __init__(self, schema: BaseModelSchema):
+        """
+        Initialize a `CompiledSchema` instance.
+
+        Args:
+            schema: An instance of the schema to compile
+
+        """
+        self._model_class = schema.Model
+        self._skip_values = resolve_meta_property(schema, "skip_values", [])
+        self._supported = not any(
+            "." in (field.attribute or name) for name, field in schema.fields.items()
+        )
+        self._dumpers = [
+            (field.data_key or name, self._compile_dump(name, field))
+            for name, field in schema.dump_fields.items()
+        ]
+        self._loaders = [
+            self._compile_load(name, field)
+            for name, field in schema.load_fields.items()
+        ]
+
+    @property
+    def supported(self) -> bool:
+        """Accessor for whether the schema can be compiled."""
+        return self._supported
+
+    @staticmethod
+    def _compile_dump(name: str, field: fields.Field) -> Callable[[Any], Any]:
+        """Generate the getter for a serialized field value."""
+        attr = field.attribute or name
+        if not field._CHECK_ATTRIBUTE:
+            return lambda obj: field.serialize(attr, obj)
+        default = field.default
+        passthrough = _passthrough_types(field)
+
+        def dump(obj):
+            value = getattr(obj, attr, missing)
+            if value is missing:
+                if default is missing:
+                    return missing
+                value = default() if callable(default) else default
+            if passthrough and (
+                value is None or passthrough is True or type(value) in passthrough
+            ):
+                return value
+            return field._serialize(value, attr, obj)
+
+        return dump
+
+    @staticmethod
+    def _compile_load(name: str, field: fields.Field) -> tuple:
+        """Resolve the input key, model attribute and converter for a field."""
+        key = field.data_key or name
+        convert = None
+        if type(field) is fields.List:
+            if not _passthrough_types(field.inner):
+                convert = field.deserialize
+        elif not _passthrough_types(field):
+            convert = field.deserialize
+        return (key, field.attribute or name, convert, field.missing)
+
+    def dump(self, obj) -> dict:
+        """
+        Serialize a model instance.
+
+        Args:
+            obj: The model instance
+
+        Returns:
+            The serialized dict, as returned by the schema
+
+        """
+        skip_values = self._skip_values
+        ret = {}
+        for key, dump in self._dumpers:
+            value = dump(obj)
+            if value is not missing and value not in skip_values:
+                ret[key] = value
+        return ret
+
+    def load(self, data: Mapping):
+        """
+        Load a model instance without validation.
+
+        Args:
+            data: The serialized dict
+
+        Returns:
+            The model instance
+
+        """
+        params = {}
+        for key, attr, convert, default in self._loaders:
+            value = data.get(key, missing)
+            if value is missing:
+                if default is missing:
+                    continue
+                value = default() if callable(default) else default
+            elif convert:
+                value = convert(value, key, data)
+            params[attr] = value
+        return self._model_class(**params)
@@ -1,24 +1,53 @@
 """Classes for BaseStorage-based record management."""
 
+import base64
+import binascii
+import inspect
 import json
+import logging
 import sys
 import uuid
 
 from datetime import datetime
-from typing import Any, Mapping, Sequence, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from marshmallow import fields
 
 from ...cache.base import BaseCache
 from ...config.injection_context import InjectionContext
-from ...storage.base import BaseStorage, StorageDuplicateError, StorageNotFoundError
+from ...storage.base import (
+    DEFAULT_PAGE_SIZE,
+    BaseStorage,
+    StorageDuplicateError,
+    StorageNotFoundError,
+)
+from ...storage.error import StorageSearchError
 from ...storage.record import StorageRecord
+from ...storage.unit_of_work import StorageUnitOfWork
 
 from .base import BaseModel, BaseModelSchema
 from ..responder import BaseResponder
 from ..util import datetime_to_str, time_now
 from ..valid import INDY_ISO8601_DATETIME
 
+LOGGER = logging.getLogger(__name__)
+
+# listeners called with (context, record, reason, params) when a record is saved
+RecordStateListener = Callable[
+    [InjectionContext, "BaseRecord", str, Mapping[str, Any]], Union[Awaitable, None]
+]
+STATE_LISTENERS = {}
+
 
 def match_post_filter(record: dict, post_filter: dict, positive: bool = True) -> bool:
     """Determine if a record value matches the post-filter.
@@ -37,6 +66,47 @@ def match_post_filter(record: dict, post_filter: dict, positive: bool = True) ->
     return positive
 
 
+def encode_query_cursor(offset: int, record_id: str = None) -> str:
+    """Encode a position in a record query as an opaque cursor.
+
+    Args:
+        offset: the number of stored records already consumed by the query
+        record_id: the identifier of the last record returned, if any
+
+    """
+    position = {"o": offset}
+    if record_id:
+        position["id"] = record_id
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_query_cursor(cursor: str) -> Tuple[int, Optional[str]]:
+    """Decode an opaque query cursor into a position in a record query.
+
+    Args:
+        cursor: the cursor value, as returned by `encode_query_cursor`
+
+    Returns:
+        A tuple of the offset and the identifier of the last record returned
+
+    """
+    if not cursor:
+        return 0, None
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        offset = position["o"]
+        record_id = position.get("id")
+    except (binascii.Error, KeyError, TypeError, UnicodeDecodeError, ValueError):
+        offset = record_id = None
+    if (
+        not isinstance(offset, int)
+        or offset < 0
+        or not isinstance(record_id, (str, type(None)))
+    ):
+        raise StorageSearchError(f"Invalid query cursor: {cursor}")
+    return offset, record_id
+
+
 class BaseRecord(BaseModel):
     """Represents a single storage record."""
 
@@ -49,6 +119,7 @@ class BaseRecord(BaseModel):
     LOG_STATE_FLAG = None
     CACHE_TTL = 60
     CACHE_ENABLED = False
+    CACHE_MAX_ENTRIES = None
     TAG_NAMES = {"state"}
 
     def __init__(
@@ -140,6 +211,26 @@ class BaseRecord(BaseModel):
         if record_id:
             return f"{record_type}::{record_id}"
 
+    @classmethod
+    def tag_filter_cache_key(cls, tag_filter: dict, post_filter: dict = None):
+        """Assemble a cache key for a record lookup by tag filter.
+
+        Args:
+            tag_filter: The normalized tag filter
+            post_filter: The remaining value filters
+
+        Returns:
+            The cache key, or None if the lookup cannot be cached
+
+        """
+        if not tag_filter or not all(
+            isinstance(v, str) and not k.startswith("$") for k, v in tag_filter.items()
+        ):
+            return None
+        return cls.cache_key(
+            "filter::" + json.dumps([tag_filter, post_filter], sort_keys=True)
+        )
+
     @classmethod
     async def get_cached_key(cls, context: InjectionContext, cache_key: str):
         """Shortcut method to fetch a cached key value.
@@ -170,6 +261,8 @@ class BaseRecord(BaseModel):
             return
         cache: BaseCache = await context.inject(BaseCache, required=False)
         if cache:
+            if cls.CACHE_MAX_ENTRIES:
+                cache.set_capacity(f"{cls.RECORD_TYPE}::", cls.CACHE_MAX_ENTRIES)
             await cache.set(cache_key, value, ttl or cls.CACHE_TTL)
 
     @classmethod
@@ -187,8 +280,53 @@ class BaseRecord(BaseModel):
             await cache.clear(cache_key)
 
     async def clear_cached(self, context: InjectionContext):
-        """Clear the cached value of this record, if any."""
-        await self.clear_cached_key(context, self.cache_key(self._id))
+        """Clear the cached value of this record, if any.
+
+        When the write is pending in a unit of work the cache may be filled from
+        the previously stored record until it is committed, so the value is
+        cleared again after the commit.
+
+        Args:
+            context: The injection context to use
+
+        """
+        cache_key = self.cache_key(self._id)
+        if not cache_key:
+            return
+        await self.clear_cached_key(context, cache_key)
+        storage = await context.inject(BaseStorage, required=False)
+        uow = await self.get_unit_of_work(context, storage) if storage else None
+        if uow:
+            uow.after_commit(self.clear_cached_key, context, cache_key)
+
+    @classmethod
+    async def get_unit_of_work(
+        cls, context: InjectionContext, storage: BaseStorage
+    ) -> StorageUnitOfWork:
+        """Fetch the unit of work bound to the context for this storage, if any.
+
+        Args:
+            context: The injection context to use
+            storage: The storage instance in use
+
+        """
+        uow = await context.inject(StorageUnitOfWork, required=False)
+        if uow is not None and uow.storage is storage:
+            return uow
+        return None
+
+    @classmethod
+    async def flush_unit_of_work(cls, context: InjectionContext, storage: BaseStorage):
+        """Commit pending writes in the bound unit of work before a search.
+
+        Args:
+            context: The injection context to use
+            storage: The storage instance in use
+
+        """
+        uow = await cls.get_unit_of_work(context, storage)
+        if uow and uow.pending:
+            await uow.commit()
 
     @classmethod
     async def retrieve_by_id(
@@ -209,15 +347,61 @@ class BaseRecord(BaseModel):
 
         if not vals:
             storage: BaseStorage = await context.inject(BaseStorage)
-            result = await storage.get_record(
-                cls.RECORD_TYPE, record_id, {"retrieveTags": False}
-            )
-            vals = json.loads(result.value)
-            if cls.CACHE_ENABLED:
-                await cls.set_cached_key(context, cache_key, vals)
+            uow = await cls.get_unit_of_work(context, storage)
+            result = uow.get_record(cls.RECORD_TYPE, record_id) if uow else None
+            if result:
+                vals = json.loads(result.value)
+            else:
+                result = await storage.get_record(
+                    cls.RECORD_TYPE, record_id, {"retrieveTags": False}
+                )
+                vals = json.loads(result.value)
+                if cls.CACHE_ENABLED:
+                    await cls.set_cached_key(context, cache_key, vals)
 
         return cls.from_storage(record_id, vals)
 
+    @classmethod
+    def promote_post_filter(
+        cls,
+        tag_filter: dict,
+        post_filter_positive: dict = None,
+        post_filter_negative: dict = None,
+    ) -> Tuple[dict, dict, dict]:
+        """Move post-filter clauses on tagged fields into the tag filter.
+
+        Value fields listed in `TAG_NAMES` are stored as tags, so filtering
+        on them can be left to the storage backend instead of decoding each
+        record value.
+
+        Args:
+            tag_filter: The tag filter to extend
+            post_filter_positive: Value filters to apply matching positively
+            post_filter_negative: Value filters to apply matching negatively
+
+        Returns:
+            A tuple of the tag filter and the remaining positive and negative
+            post-filters
+
+        """
+        tag_map = cls.get_tag_map()
+        tag_filter = dict(tag_filter or {})
+        positive = {}
+        for k, v in (post_filter_positive or {}).items():
+            if k in tag_map and isinstance(v, str) and k not in tag_filter:
+                tag_filter[k] = v
+            else:
+                positive[k] = v
+        negative = post_filter_negative
+        if (
+            negative
+            and "$not" not in tag_filter
+            and all(k in tag_map and isinstance(v, str) for k, v in negative.items())
+        ):
+            tag_filter["$not"] = dict(negative)
+            negative = None
+        return tag_filter or None, positive or None, negative or None
+
     @classmethod
     async def retrieve_by_tag_filter(
         cls, context: InjectionContext, tag_filter: dict, post_filter: dict = None
@@ -229,17 +413,40 @@ class BaseRecord(BaseModel):
             tag_filter: The filter dictionary to apply
             post_filter: Additional value filters to apply after retrieval
         """
+        query_filter, query_post_filter, _ = cls.promote_post_filter(
+            tag_filter, post_filter
+        )
+        cache_key = cls.CACHE_ENABLED and cls.tag_filter_cache_key(
+            query_filter, query_post_filter
+        )
+        if cache_key:
+            record_id = await cls.get_cached_key(context, cache_key)
+            if record_id:
+                try:
+                    found = await cls.retrieve_by_id(context, record_id)
+                except StorageNotFoundError:
+                    found = None
+                # the record may have changed since the lookup was cached
+                if (
+                    found
+                    and match_post_filter(found.value, query_filter)
+                    and match_post_filter(found.value, query_post_filter)
+                ):
+                    return found
+                await cls.clear_cached_key(context, cache_key)
+
         storage: BaseStorage = await context.inject(BaseStorage)
+        await cls.flush_unit_of_work(context, storage)
         query = storage.search_records(
             cls.RECORD_TYPE,
-            cls.prefix_tag_filter(tag_filter),
+            cls.prefix_tag_filter(query_filter),
             None,
             {"retrieveTags": False},
         )
         found = None
         async for record in query:
             vals = json.loads(record.value)
-            if match_post_filter(vals, post_filter):
+            if match_post_filter(vals, query_post_filter):
                 if found:
                     raise StorageDuplicateError(
                         "Multiple {} records located for {}{}".format(
@@ -255,8 +462,89 @@ class BaseRecord(BaseModel):
                     cls.__name__, tag_filter, f", {post_filter}" if post_filter else ""
                 )
             )
+        if cache_key:
+            await cls.set_cached_key(context, cache_key, found._id)
         return found
 
+    @classmethod
+    async def iter_query(
+        cls,
+        context: InjectionContext,
+        tag_filter: dict = None,
+        post_filter_positive: dict = None,
+        post_filter_negative: dict = None,
+        *,
+        offset: int = 0,
+        after_id: str = None,
+    ) -> AsyncIterator[Tuple[int, "BaseRecord"]]:
+        """Iterate over stored records matching a query.
+
+        Records are read from storage one page at a time, so memory use does not
+        depend on the size of the result set.
+
+        The query resumes after the record `after_id` when the storage backend
+        supports it, which is stable under concurrent inserts and deletes.
+        Otherwise, or when that record no longer exists, `offset` stored records
+        are skipped instead: this reads every skipped record, and records may be
+        repeated or missed if earlier records were added or removed meanwhile.
+
+        Args:
+            context: The injection context to use
+            tag_filter: An optional dictionary of tag filter clauses
+            post_filter_positive: Additional value filters to apply matching positively
+            post_filter_negative: Additional value filters to apply matching negatively
+            offset: The number of stored records to skip before matching
+            after_id: The identifier of the record to resume the query after
+
+        Returns:
+            An async iterator of tuples (position, record), where position is the
+            offset at which to resume the query after this record
+
+        """
+        storage: BaseStorage = await context.inject(BaseStorage)
+        await cls.flush_unit_of_work(context, storage)
+        (
+            tag_filter,
+            post_filter_positive,
+            post_filter_negative,
+        ) = cls.promote_post_filter(
+            tag_filter, post_filter_positive, post_filter_negative
+        )
+        tag_filter = cls.prefix_tag_filter(tag_filter)
+        options = {"retrieveTags": False}
+        query = storage.search_records(cls.RECORD_TYPE, tag_filter, None, options)
+        position = 0
+        try:
+            if after_id and query.SUPPORTS_AFTER_ID:
+                resumed = storage.search_records(
+                    cls.RECORD_TYPE, tag_filter, None, {**options, "afterId": after_id}
+                )
+                try:
+                    await resumed.open()
+                    query = resumed
+                    position = offset
+                except StorageNotFoundError:
+                    pass
+            if position < offset:
+                await query.open()
+                while position < offset:
+                    skipped = await query.fetch(min(query.page_size, offset - position))
+                    if not skipped:
+                        break
+                    position += len(skipped)
+            async for record in query:
+                position += 1
+                vals = json.loads(record.value)
+                if match_post_filter(
+                    vals, post_filter_positive, True
+                ) and match_post_filter(vals, post_filter_negative, False):
+                    yield position, cls.from_storage(record.id, vals)
+        except GeneratorExit:
+            # iteration stopped early: release the search
+            if query.opened:
+                await query.close()
+            raise
+
     @classmethod
     async def query(
         cls,
@@ -273,21 +561,62 @@ class BaseRecord(BaseModel):
             post_filter_positive: Additional value filters to apply matching positively
             post_filter_negative: Additional value filters to apply matching negatively
         """
-        storage: BaseStorage = await context.inject(BaseStorage)
-        query = storage.search_records(
-            cls.RECORD_TYPE,
-            cls.prefix_tag_filter(tag_filter),
-            None,
-            {"retrieveTags": False},
-        )
+        return [
+            record
+            async for (_, record) in cls.iter_query(
+                context, tag_filter, post_filter_positive, post_filter_negative
+            )
+        ]
+
+    @classmethod
+    async def query_page(
+        cls,
+        context: InjectionContext,
+        tag_filter: dict = None,
+        post_filter_positive: dict = None,
+        post_filter_negative: dict = None,
+        *,
+        limit: int = None,
+        cursor: str = None,
+    ) -> Tuple[Sequence["BaseRecord"], str]:
+        """Query one page of stored records.
+
+        Args:
+            context: The injection context to use
+            tag_filter: An optional dictionary of tag filter clauses
+            post_filter_positive: Additional value filters to apply matching positively
+            post_filter_negative: Additional value filters to apply matching negatively
+            limit: The maximum number of records to return
+            cursor: The cursor returned with the previous page, if any
+
+        Returns:
+            A tuple of the matching records and the cursor for the next page,
+            which is None when there are no more results
+
+        """
+        limit = limit or DEFAULT_PAGE_SIZE
         result = []
-        async for record in query:
-            vals = json.loads(record.value)
-            if match_post_filter(
-                vals, post_filter_positive, True
-            ) and match_post_filter(vals, post_filter_negative, False):
-                result.append(cls.from_storage(record.id, vals))
-        return result
+        last_position = None
+        next_cursor = None
+        offset, after_id = decode_query_cursor(cursor)
+        records = cls.iter_query(
+            context,
+            tag_filter,
+            post_filter_positive,
+            post_filter_negative,
+            offset=offset,
+            after_id=after_id,
+        )
+        try:
+            async for (position, record) in records:
+                if len(result) == limit:
+                    next_cursor = encode_query_cursor(last_position, result[-1]._id)
+                    break
+                result.append(record)
+                last_position = position
+        finally:
+            await records.aclose()
+        return result, next_cursor
 
     async def save(
         self,
@@ -311,23 +640,35 @@ class BaseRecord(BaseModel):
         try:
             self.updated_at = time_now()
             storage: BaseStorage = await context.inject(BaseStorage)
+            uow = await self.get_unit_of_work(context, storage)
             if not self._id:
                 self._id = str(uuid.uuid4())
                 self.created_at = self.updated_at
-                await storage.add_record(self.storage_record)
+                if uow:
+                    uow.add_record(self.storage_record)
+                else:
+                    await storage.add_record(self.storage_record)
                 new_record = True
             else:
                 record = self.storage_record
-                await storage.update_record_value(record, record.value)
-                await storage.update_record_tags(record, record.tags)
+                if uow:
+                    uow.update_record(record, record.value, record.tags)
+                else:
+                    await storage.update_record_value(record, record.value)
+                    await storage.update_record_tags(record, record.tags)
                 new_record = False
         finally:
-            params = {self.RECORD_TYPE: self.serialize()}
-            if log_params:
-                params.update(log_params)
             if new_record is None:
                 log_reason = f"FAILED: {log_reason}"
-            self.log_state(context, log_reason, params, override=log_override)
+
+            def state_params():
+                params = {self.RECORD_TYPE: self.serialize(trusted=True)}
+                if log_params:
+                    params.update(log_params)
+                return params
+
+            self.log_state(context, log_reason, state_params, override=log_override)
+            await self.notify_state_listeners(context, log_reason, log_params)
 
         await self.post_save(context, new_record, self._last_state, webhook)
         self._last_state = self.state
@@ -367,13 +708,18 @@ class BaseRecord(BaseModel):
         """
         if self._id:
             storage: BaseStorage = await context.inject(BaseStorage)
-            await storage.delete_record(self.storage_record)
+            uow = await self.get_unit_of_work(context, storage)
+            if uow:
+                uow.delete_record(self.storage_record)
+            else:
+                await storage.delete_record(self.storage_record)
+            await self.clear_cached(context)
         # FIXME - update state and send webhook?
 
     @property
     def webhook_payload(self):
         """Return a JSON-serialized version of the record for the webhook."""
-        return self.serialize()
+        return self.serialize(trusted=True)
 
     @property
     def webhook_topic(self):
@@ -405,19 +751,90 @@ class BaseRecord(BaseModel):
         cls,
         context: InjectionContext,
         msg: str,
-        params: dict = None,
+        params: Union[dict, Callable[[], dict]] = None,
         override: bool = False,
     ):
-        """Print a message with increased visibility (for testing)."""
+        """Print a message with increased visibility (for testing).
+
+        Args:
+            context: The injection context to use
+            msg: The message to print
+            params: Parameters to print, or a function returning them which is
+                only called when the message is printed
+            override: Print the message regardless of LOG_STATE_FLAG
+
+        """
         if override or (
             cls.LOG_STATE_FLAG and context.settings.get(cls.LOG_STATE_FLAG)
         ):
+            if callable(params):
+                params = params()
             out = msg + "\n"
             if params:
                 for k, v in params.items():
                     out += f"    {k}: {v}\n"
             print(out, file=sys.stderr)
 
+    @classmethod
+    def add_state_listener(cls, listener: RecordStateListener):
+        """Register a listener to be called when records of this class are saved.
+
+        The listener is called with the injection context, the record, the
+        reason for the update and any additional log parameters. It may be a
+        coroutine function.
+
+        Args:
+            listener: The listener to register
+
+        """
+        STATE_LISTENERS.setdefault(cls, []).append(listener)
+
+    @classmethod
+    def remove_state_listener(cls, listener: RecordStateListener):
+        """Remove a registered state listener.
+
+        Args:
+            listener: The listener to remove
+
+        """
+        listeners = STATE_LISTENERS.get(cls)
+        if listeners and listener in listeners:
+            listeners.remove(listener)
+            if not listeners:
+                del STATE_LISTENERS[cls]
+
+    @classmethod
+    def get_state_listeners(cls) -> Sequence[RecordStateListener]:
+        """Accessor for the listeners registered for this class and its parents."""
+        return [
+            listener
+            for parent in reversed(cls.__mro__)
+            for listener in STATE_LISTENERS.get(parent, ())
+        ]
+
+    async def notify_state_listeners(
+        self, context: InjectionContext, reason: str, params: Mapping[str, Any] = None
+    ):
+        """Call the registered state listeners for this record.
+
+        Errors raised by a listener are logged and do not affect the update.
+
+        Args:
+            context: The injection context to use
+            reason: The reason for the update
+            params: Additional parameters describing the update
+
+        """
+        for listener in self.get_state_listeners():
+            try:
+                result = listener(context, self, reason, params or {})
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                LOGGER.exception(
+                    "Error in state listener for %s record", self.RECORD_TYPE
+                )
+
     @classmethod
     def strip_tag_prefix(cls, tags: dict):
         """Strip tilde from unencrypted tag names."""
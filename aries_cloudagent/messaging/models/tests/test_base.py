@@ -0,0 +1,178 @@
+import pytest
+import time
+
+from unittest import TestCase
+
+from marshmallow import fields, post_dump
+
+from ....connections.models.connection_record import ConnectionRecord
+from ....protocols.issue_credential.v1_0.models.credential_exchange import (
+    V10CredentialExchange,
+)
+from ....protocols.present_proof.v1_0.models.presentation_exchange import (
+    V10PresentationExchange,
+)
+
+from ...util import time_now
+
+from ..base import BaseModel, BaseModelSchema
+
+
+class ModelImpl(BaseModel):
+    class Meta:
+        schema_class = "ModelImplSchema"
+
+    def __init__(self, *, attr: str = None, count: int = None, flag: bool = None):
+        self.attr = attr
+        self.count = count
+        self.flag = flag
+
+
+class ModelImplSchema(BaseModelSchema):
+    class Meta:
+        model_class = ModelImpl
+
+    attr = fields.Str(data_key="Attr")
+    count = fields.Int()
+    flag = fields.Bool(default=False)
+
+
+class HookedModelImpl(BaseModel):
+    class Meta:
+        schema_class = "HookedModelImplSchema"
+
+    def __init__(self, *, attr: str = None):
+        self.attr = attr
+
+
+class HookedModelImplSchema(BaseModelSchema):
+    class Meta:
+        model_class = HookedModelImpl
+
+    attr = fields.Str()
+
+    @post_dump
+    def add_marker(self, data, **kwargs):
+        data["marker"] = True
+        return data
+
+
+def make_connection():
+    return ConnectionRecord(
+        connection_id="conn-id",
+        my_did="55GkHamhTU1ZbTbV2ab9DE",
+        their_did="4RXD7tjXpHJLJLuKBWkvuW",
+        their_label="Bob",
+        their_role="inviter",
+        initiator=ConnectionRecord.INITIATOR_SELF,
+        invitation_key="3Dn1SJNPaCXcvvJvSbsFWP2xaCjMom3can8CQNhWrTRx",
+        request_id="request-id",
+        state=ConnectionRecord.STATE_ACTIVE,
+        routing_state=ConnectionRecord.ROUTING_STATE_NONE,
+        accept=ConnectionRecord.ACCEPT_AUTO,
+        invitation_mode=ConnectionRecord.INVITATION_MODE_ONCE,
+        alias="Bob's agent",
+        created_at=time_now(),
+        updated_at=time_now(),
+    )
+
+
+def make_credential_exchange():
+    return V10CredentialExchange(
+        credential_exchange_id="cred-ex-id",
+        connection_id="conn-id",
+        thread_id="thread-id",
+        initiator=V10CredentialExchange.INITIATOR_SELF,
+        role=V10CredentialExchange.ROLE_ISSUER,
+        state=V10CredentialExchange.STATE_OFFER_SENT,
+        credential_definition_id="55GkHamhTU1ZbTbV2ab9DE:3:CL:15:tag",
+        schema_id="55GkHamhTU1ZbTbV2ab9DE:2:schema_name:1.0",
+        credential_proposal_dict={"credential_proposal": {"attributes": []}},
+        credential_offer={
+            "nonce": "1234567890",
+            "key_correctness_proof": {"c": "1", "xz_cap": "2", "xr_cap": []},
+        },
+        auto_offer=False,
+        auto_issue=True,
+        auto_remove=False,
+        trace=False,
+        created_at=time_now(),
+        updated_at=time_now(),
+    )
+
+
+def make_presentation_exchange():
+    return V10PresentationExchange(
+        presentation_exchange_id="pres-ex-id",
+        connection_id="conn-id",
+        thread_id="thread-id",
+        initiator=V10PresentationExchange.INITIATOR_SELF,
+        role=V10PresentationExchange.ROLE_VERIFIER,
+        state=V10PresentationExchange.STATE_REQUEST_SENT,
+        presentation_request={"name": "proof", "requested_attributes": {}},
+        verified="true",
+        auto_present=True,
+        created_at=time_now(),
+        updated_at=time_now(),
+    )
+
+
+class TestCompiledSchema(TestCase):
+    def test_dump_matches_schema(self):
+        for record in (
+            make_connection(),
+            make_credential_exchange(),
+            make_presentation_exchange(),
+            ModelImpl(attr="a", count=1, flag=True),
+            ModelImpl(count=True),
+            ModelImpl(),
+        ):
+            assert record.Schema.compiled()
+            assert record.serialize(trusted=True) == record.serialize()
+            assert record.serialize(as_string=True, trusted=True) == record.serialize(
+                as_string=True
+            )
+
+    def test_round_trip(self):
+        for record in (
+            make_connection(),
+            make_credential_exchange(),
+            make_presentation_exchange(),
+        ):
+            loaded = type(record).deserialize(record.serialize(), trusted=True)
+            assert loaded == record
+            assert loaded.serialize() == record.serialize()
+            assert type(record).deserialize(
+                record.serialize(as_string=True), trusted=True
+            ) == type(record).deserialize(record.serialize())
+
+    def test_load_no_validation(self):
+        loaded = ModelImpl.deserialize(
+            {"Attr": 1, "count": "one", "unknown": "x"}, trusted=True
+        )
+        assert loaded.attr == 1 and loaded.count == "one"
+
+    def test_hooks_not_compiled(self):
+        assert HookedModelImplSchema.compiled() is None
+        record = HookedModelImpl(attr="a")
+        assert record.serialize(trusted=True) == {"attr": "a", "marker": True}
+
+    @pytest.mark.benchmark
+    def test_benchmark_vs_schema(self):
+        rounds = 500
+        for make_record in (make_connection, make_credential_exchange):
+            record = make_record()
+            record_cls = type(record)
+            record.Schema.compiled()
+
+            timings = {}
+            for name, trusted in (("schema", False), ("compiled", True)):
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    record_cls.deserialize(record.serialize(trusted=trusted), trusted)
+                timings[name] = time.perf_counter() - start
+            print(
+                "{} round trip x{}: schema {:.4f}s, compiled {:.4f}s".format(
+                    record_cls.__name__, rounds, timings["schema"], timings["compiled"]
+                )
+            )
@@ -1,15 +1,25 @@
+import base64
 import json
 
 from asynctest import TestCase as AsyncTestCase, mock as async_mock
 
 from ....cache.base import BaseCache
+from ....cache.basic import BasicCache
 from ....config.injection_context import InjectionContext
 from ....storage.base import BaseStorage, StorageRecord
+from ....storage.basic import BasicStorage
+from ....storage.error import StorageNotFoundError, StorageSearchError
+from ....storage.unit_of_work import StorageUnitOfWork
 
 from ...responder import BaseResponder, MockResponder
 from ...util import time_now
 
-from ..base_record import BaseRecord, BaseRecordSchema
+from ..base_record import (
+    BaseRecord,
+    BaseRecordSchema,
+    decode_query_cursor,
+    encode_query_cursor,
+)
 
 
 class BaseRecordImpl(BaseRecord):
@@ -89,6 +99,61 @@ class TestBaseRecord(AsyncTestCase):
         await record.clear_cached_key(context, cache_key)
         mock_cache.clear.assert_awaited_once_with(cache_key)
 
+    async def test_cache_capacity(self):
+        context = InjectionContext(enforce_typing=False)
+        cache = BasicCache()
+        context.injector.bind_instance(BaseCache, cache)
+        with async_mock.patch.object(BaseRecordImpl, "CACHE_MAX_ENTRIES", 2):
+            for i in range(3):
+                await BaseRecordImpl.set_cached_key(
+                    context, BaseRecordImpl.cache_key(str(i)), i
+                )
+        assert await BaseRecordImpl.get_cached_key(
+            context, BaseRecordImpl.cache_key("0")
+        ) is None
+        assert await BaseRecordImpl.get_cached_key(
+            context, BaseRecordImpl.cache_key("2")
+        ) == 2
+
+    async def test_retrieve_by_tag_filter_cached(self):
+        context = InjectionContext(enforce_typing=False)
+        storage = BasicStorage()
+        context.injector.bind_instance(BaseStorage, storage)
+        context.injector.bind_instance(BaseCache, BasicCache())
+        record = BaseRecordImpl(state="active")
+        await record.save(context)
+        assert BaseRecordImpl.tag_filter_cache_key(
+            {"state": "active"}
+        ) == BaseRecordImpl.tag_filter_cache_key(
+            *BaseRecordImpl.promote_post_filter({}, {"state": "active"})[:2]
+        )
+        assert BaseRecordImpl.tag_filter_cache_key({"state": {"$neq": "a"}}) is None
+
+        found = await BaseRecordImpl.retrieve_by_tag_filter(context, {"state": "active"})
+        assert found._id == record._id
+        with async_mock.patch.object(
+            storage, "search_records", autospec=True
+        ) as search_records:
+            found = await BaseRecordImpl.retrieve_by_tag_filter(
+                context, {}, {"state": "active"}
+            )
+            search_records.assert_not_called()
+        assert found._id == record._id
+
+        # cached lookups are checked against the current record
+        record.state = "done"
+        await record.save(context)
+        with self.assertRaises(StorageNotFoundError):
+            await BaseRecordImpl.retrieve_by_tag_filter(context, {"state": "active"})
+        found = await BaseRecordImpl.retrieve_by_tag_filter(context, {"state": "done"})
+        assert found._id == record._id
+
+        await record.delete_record(context)
+        with self.assertRaises(StorageNotFoundError):
+            await BaseRecordImpl.retrieve_by_id(context, record._id)
+        with self.assertRaises(StorageNotFoundError):
+            await BaseRecordImpl.retrieve_by_tag_filter(context, {"state": "done"})
+
     async def test_retrieve_cached_id(self):
         context = InjectionContext(enforce_typing=False)
         mock_storage = async_mock.MagicMock(BaseStorage, autospec=True)
@@ -155,6 +220,85 @@ class TestBaseRecord(AsyncTestCase):
         assert result[0]._id == record_id
         assert result[0].value == record_value
 
+    async def test_query_page(self):
+        context = InjectionContext(enforce_typing=False)
+        context.injector.bind_instance(BaseStorage, BasicStorage())
+        for i in range(7):
+            record = BaseRecordImpl(state="odd" if i % 2 else "even")
+            await record.save(context)
+
+        records, cursor = await BaseRecordImpl.query_page(context, limit=3)
+        assert len(records) == 3 and cursor
+        page = await BaseRecordImpl.query_page(context, limit=3, cursor=cursor)
+        assert len(page[0]) == 3 and page[1]
+        last = await BaseRecordImpl.query_page(context, limit=3, cursor=page[1])
+        assert len(last[0]) == 1 and last[1] is None
+        all_ids = [r._id for r in await BaseRecordImpl.query(context)]
+        assert [r._id for r in records + page[0] + last[0]] == all_ids
+
+        odd, cursor = await BaseRecordImpl.query_page(
+            context, None, {"state": "odd"}, limit=2
+        )
+        assert [r.state for r in odd] == ["odd", "odd"]
+        odd_rest, cursor = await BaseRecordImpl.query_page(
+            context, None, {"state": "odd"}, limit=2, cursor=cursor
+        )
+        assert [r.state for r in odd_rest] == ["odd"]
+        assert cursor is None
+
+        with self.assertRaises(StorageSearchError):
+            await BaseRecordImpl.query_page(context, cursor="garbage")
+
+    async def test_query_page_resume(self):
+        context = InjectionContext(enforce_typing=False)
+        context.injector.bind_instance(BaseStorage, BasicStorage())
+        saved = []
+        for i in range(6):
+            record = BaseRecordImpl(state="odd" if i % 2 else "even")
+            await record.save(context)
+            saved.append(record)
+
+        records, cursor = await BaseRecordImpl.query_page(context, limit=3)
+        assert records[-1]._id == saved[2]._id
+
+        # removing earlier records does not shift the next page
+        await saved[0].delete_record(context)
+        await saved[1].delete_record(context)
+        page, _ = await BaseRecordImpl.query_page(context, limit=3, cursor=cursor)
+        assert [r._id for r in page] == [r._id for r in saved[3:]]
+
+        # without the last record the offset is used instead
+        await saved[2].delete_record(context)
+        page, _ = await BaseRecordImpl.query_page(context, limit=3, cursor=cursor)
+        assert page == []
+
+        mock_storage = async_mock.MagicMock(BaseStorage, autospec=True)
+        mock_search = mock_storage.search_records.return_value
+        mock_search.SUPPORTS_AFTER_ID = False
+        mock_search.page_size = 100
+        mock_search.open = async_mock.CoroutineMock()
+        mock_search.fetch = async_mock.CoroutineMock(return_value=[])
+        mock_search.__aiter__.return_value = []
+        context.injector.bind_instance(BaseStorage, mock_storage)
+        await BaseRecordImpl.query_page(context, limit=3, cursor=cursor)
+        mock_storage.search_records.assert_called_once_with(
+            BaseRecordImpl.RECORD_TYPE, None, None, {"retrieveTags": False}
+        )
+        mock_search.fetch.assert_awaited_once_with(3)
+
+    def test_query_cursor(self):
+        assert decode_query_cursor(None) == (0, None)
+        assert decode_query_cursor(encode_query_cursor(42)) == (42, None)
+        assert decode_query_cursor(encode_query_cursor(3, "abc")) == (3, "abc")
+        for cursor in (
+            "garbage",
+            encode_query_cursor(-1),
+            "e30=",
+            base64.urlsafe_b64encode(b'{"o": 1, "id": 2}').decode(),
+        ):
+            with self.assertRaises(StorageSearchError):
+                decode_query_cursor(cursor)
+
     @async_mock.patch("builtins.print")
     def test_log_state(self, mock_print):
         test_param = "test.log"
@@ -173,6 +317,61 @@ class TestBaseRecord(AsyncTestCase):
         record.log_state(context, "state")
         mock_print.assert_not_called()
 
+    @async_mock.patch("builtins.print")
+    def test_log_state_lazy(self, mock_print):
+        params = async_mock.MagicMock(return_value={"a": "b"})
+        record = BaseRecordImpl()
+        record.log_state(InjectionContext(), "state", params)
+        params.assert_not_called()
+        record.log_state(InjectionContext(), "state", params, override=True)
+        params.assert_called_once_with()
+        assert "a: b" in mock_print.call_args[0][0]
+
+    async def test_save_no_serialize(self):
+        context = InjectionContext(enforce_typing=False)
+        context.injector.bind_instance(BaseStorage, BasicStorage())
+        record = BaseRecordImpl()
+        with async_mock.patch.object(record, "serialize") as mock_serialize:
+            await record.save(context)
+            mock_serialize.assert_not_called()
+
+    async def test_state_listeners(self):
+        context = InjectionContext(enforce_typing=False)
+        context.injector.bind_instance(BaseStorage, BasicStorage())
+        calls = []
+
+        def listener(ctx, record, reason, params):
+            calls.append((ctx, record, reason, params))
+
+        async def async_listener(ctx, record, reason, params):
+            calls.append((ctx, record, reason, params))
+
+        def failing_listener(ctx, record, reason, params):
+            raise ValueError("listener error")
+
+        BaseRecord.add_state_listener(listener)
+        BaseRecordImpl.add_state_listener(failing_listener)
+        BaseRecordImpl.add_state_listener(async_listener)
+        UnencTestImpl.add_state_listener(listener)
+        try:
+            assert BaseRecordImpl.get_state_listeners() == [
+                listener,
+                failing_listener,
+                async_listener,
+            ]
+            record = BaseRecordImpl(state="init")
+            await record.save(context, reason="created", log_params={"a": "b"})
+            assert calls == [
+                (context, record, "created", {"a": "b"}),
+                (context, record, "created", {"a": "b"}),
+            ]
+        finally:
+            BaseRecord.remove_state_listener(listener)
+            BaseRecordImpl.remove_state_listener(failing_listener)
+            BaseRecordImpl.remove_state_listener(async_listener)
+            UnencTestImpl.remove_state_listener(listener)
+        assert BaseRecordImpl.get_state_listeners() == []
+
     async def test_webhook(self):
         context = InjectionContext()
         mock_responder = MockResponder()
@@ -194,3 +393,73 @@ class TestBaseRecord(AsyncTestCase):
         assert UnencTestImpl.prefix_tag_filter(tags) == {
             "$or": [{"~a": "x"}, {"c": "z"}]
         }
+
+    def test_promote_post_filter(self):
+        assert UnencTestImpl.promote_post_filter(None) == (None, None, None)
+        assert UnencTestImpl.promote_post_filter(
+            {"a": "x"}, {"b": "y", "d": "w", "c": ["z"]}, {"c": "z"}
+        ) == ({"a": "x", "b": "y", "$not": {"c": "z"}}, {"d": "w", "c": ["z"]}, None)
+        assert UnencTestImpl.promote_post_filter(
+            {"a": "x"}, {"a": "y"}, {"d": "w"}
+        ) == ({"a": "x"}, {"a": "y"}, {"d": "w"})
+
+    async def test_query_promoted_post_filter(self):
+        context = InjectionContext(enforce_typing=False)
+        mock_storage = async_mock.MagicMock(BaseStorage, autospec=True)
+        context.injector.bind_instance(BaseStorage, mock_storage)
+        mock_storage.search_records.return_value.__aiter__.return_value = []
+        await BaseRecordImpl.query(context, {"tag": "filter"}, {"state": "done"})
+        mock_storage.search_records.assert_called_once_with(
+            BaseRecordImpl.RECORD_TYPE,
+            {"tag": "filter", "state": "done"},
+            None,
+            {"retrieveTags": False},
+        )
+
+    async def test_save_unit_of_work(self):
+        context = InjectionContext(enforce_typing=False)
+        storage = BasicStorage()
+        context.injector.bind_instance(BaseStorage, storage)
+        uow = storage.unit_of_work()
+        context.injector.bind_instance(StorageUnitOfWork, uow)
+
+        record = BaseRecordImpl(state="initial")
+        record_id = await record.save(context)
+        record.state = "updated"
+        await record.save(context)
+        assert len(uow.pending) == 1
+        with self.assertRaises(StorageNotFoundError):
+            await storage.get_record(BaseRecordImpl.RECORD_TYPE, record_id)
+        result = await BaseRecordImpl.retrieve_by_id(context, record_id)
+        assert result.state == "updated"
+
+        # searches see pending writes
+        found = await BaseRecordImpl.query(context, {"state": "updated"})
+        assert [r._id for r in found] == [record_id]
+        assert not uow.pending
+
+        await result.delete_record(context)
+        with self.assertRaises(StorageNotFoundError):
+            await BaseRecordImpl.retrieve_by_id(context, record_id)
+        await uow.commit()
+        with self.assertRaises(StorageNotFoundError):
+            await storage.get_record(BaseRecordImpl.RECORD_TYPE, record_id)
+
+    async def test_save_unit_of_work_clears_cache(self):
+        context = InjectionContext(enforce_typing=False)
+        storage = BasicStorage()
+        cache = BasicCache()
+        context.injector.bind_instance(BaseStorage, storage)
+        context.injector.bind_instance(BaseCache, cache)
+        record = BaseRecordImpl(state="initial")
+        await record.save(context)
+
+        uow = storage.unit_of_work()
+        context.injector.bind_instance(StorageUnitOfWork, uow)
+        record.state = "updated"
+        await record.save(context)
+        # filled from the stored record before the write is committed
+        cache_key = BaseRecordImpl.cache_key(record._id)
+        await cache.set(cache_key, {"state": "initial"})
+        await uow.commit()
+        assert await cache.get(cache_key) is None
@@ -912,9 +912,14 @@ class ConnectionManager:
         else:
             await storage.update_record_value(record, did_doc.to_json())
         await self.remove_keys_for_did(did_doc.did)
-        for key in did_doc.pubkey.values():
-            if key.controller == did_doc.did:
-                await self.add_key_for_did(did_doc.did, key.value)
+        await self.add_keys_for_did(
+            did_doc.did,
+            [
+                key.value
+                for key in did_doc.pubkey.values()
+                if key.controller == did_doc.did
+            ],
+        )
 
     async def add_key_for_did(self, did: str, key: str):
         """Store a verkey for lookup against a DID.
@@ -923,9 +928,24 @@ class ConnectionManager:
             did: The DID to associate with this key
             key: The verkey to be added
         """
-        record = StorageRecord(self.RECORD_TYPE_DID_KEY, key, {"did": did, "key": key})
-        storage: BaseStorage = await self.context.inject(BaseStorage)
-        await storage.add_record(record)
+        await self.add_keys_for_did(did, [key])
+
+    async def add_keys_for_did(self, did: str, keys: Sequence[str]):
+        """Store several verkeys for lookup against a DID.
+
+        Args:
+            did: The DID to associate with these keys
+            keys: The verkeys to be added
+
+        """
+        if keys:
+            storage: BaseStorage = await self.context.inject(BaseStorage)
+            await storage.add_records(
+                [
+                    StorageRecord(self.RECORD_TYPE_DID_KEY, key, {"did": did, "key": key})
+                    for key in keys
+                ]
+            )
 
     async def find_did_for_key(self, key: str) -> str:
         """Find the DID previously associated with a key.
@@ -949,8 +969,8 @@ class ConnectionManager:
         keys = await storage.search_records(
             self.RECORD_TYPE_DID_KEY, {"did": did}
         ).fetch_all()
-        for record in keys:
-            await storage.delete_record(record)
+        if keys:
+            await storage.delete_records(keys)
 
     async def get_connection_targets(
         self, *, connection_id: str = None, connection: ConnectionRecord = None
@@ -25,6 +25,11 @@ from ....messaging.valid import (
     UUIDFour,
 )
 from ....storage.error import StorageError, StorageNotFoundError
+from ....utils.paging import (
+    PaginatedQueryStringSchema,
+    PaginatedResultSchema,
+    record_list_response,
+)
 from ....wallet.error import WalletError
 
 from .manager import ConnectionManager, ConnectionManagerError
@@ -35,7 +40,7 @@ from .messages.connection_invitation import (
 )
 
 
-class ConnectionListSchema(Schema):
+class ConnectionListSchema(PaginatedResultSchema):
     """Result schema for connection list."""
 
     results = fields.List(
@@ -104,7 +109,7 @@ class ConnectionStaticResultSchema(Schema):
     record = fields.Nested(ConnectionRecordSchema, required=True)
 
 
-class ConnectionsListQueryStringSchema(Schema):
+class ConnectionsListQueryStringSchema(PaginatedQueryStringSchema):
     """Parameters and validators for connections list request query string."""
 
     alias = fields.Str(description="Alias", required=False, example="Barry",)
@@ -226,7 +231,6 @@ async def connections_list(request: web.BaseRequest):
         The connection list response
 
     """
-    context = request.app["request_context"]
     tag_filter = {}
     for param_name in (
         "invitation_id",
@@ -245,13 +249,9 @@ async def connections_list(request: web.BaseRequest):
     ):
         if param_name in request.query and request.query[param_name] != "":
             post_filter[param_name] = request.query[param_name]
-    try:
-        records = await ConnectionRecord.query(context, tag_filter, post_filter)
-        results = [record.serialize() for record in records]
-        results.sort(key=connection_sort_key)
-    except (StorageError, BaseModelError) as err:
-        raise web.HTTPBadRequest(reason=err.roll_up) from err
-    return web.json_response({"results": results})
+    return await record_list_response(
+        request, ConnectionRecord, tag_filter, post_filter, connection_sort_key
+    )
 
 
 @docs(tags=["connection"], summary="Fetch a single connection record")
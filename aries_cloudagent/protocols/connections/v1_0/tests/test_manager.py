@@ -947,6 +947,16 @@ class TestConnectionManager(AsyncTestCase, TestConfig):
         assert did == self.test_target_did
         await self.manager.remove_keys_for_did(self.test_target_did)
 
+    async def test_did_keys_bulk_storage(self):
+        keys = [f"{self.test_target_verkey}{i}" for i in range(3)]
+        await self.manager.add_keys_for_did(did=self.test_target_did, keys=keys)
+        for key in keys:
+            assert await self.manager.find_did_for_key(key) == self.test_target_did
+
+        await self.manager.remove_keys_for_did(self.test_target_did)
+        with self.assertRaises(StorageNotFoundError):
+            await self.manager.find_did_for_key(keys[0])
+
     async def test_get_connection_targets_invitation_no_did(self):
         wallet: BaseWallet = await self.context.inject(BaseWallet)
         await wallet.create_local_did(
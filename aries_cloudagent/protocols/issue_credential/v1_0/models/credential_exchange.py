@@ -20,7 +20,9 @@ class V10CredentialExchange(BaseExchangeRecord):
     RECORD_TYPE = "credential_exchange_v10"
     RECORD_ID_NAME = "credential_exchange_id"
     WEBHOOK_TOPIC = "issue_credential"
-    TAG_NAMES = {"thread_id"}
+    TAG_NAMES = {"thread_id", "connection_id", "initiator", "role", "state"}
+    CACHE_ENABLED = True
+    CACHE_MAX_ENTRIES = 1000
 
     INITIATOR_SELF = "self"
     INITIATOR_EXTERNAL = "external"
@@ -131,18 +133,11 @@ class V10CredentialExchange(BaseExchangeRecord):
         cls, context: InjectionContext, connection_id: str, thread_id: str
     ) -> "V10CredentialExchange":
         """Retrieve a credential exchange record by connection and thread ID."""
-        cache_key = f"credential_exchange_ctidx::{connection_id}::{thread_id}"
-        record_id = await cls.get_cached_key(context, cache_key)
-        if record_id:
-            record = await cls.retrieve_by_id(context, record_id)
-        else:
-            record = await cls.retrieve_by_tag_filter(
-                context,
-                {"thread_id": thread_id},
-                {"connection_id": connection_id} if connection_id else None,
-            )
-            await cls.set_cached_key(context, cache_key, record.credential_exchange_id)
-        return record
+        return await cls.retrieve_by_tag_filter(
+            context,
+            {"thread_id": thread_id},
+            {"connection_id": connection_id} if connection_id else None,
+        )
 
     def __eq__(self, other: Any) -> bool:
         """Comparison between records."""
@@ -49,10 +49,15 @@ from .models.credential_exchange import (
     V10CredentialExchangeSchema,
 )
 
+from ....utils.paging import (
+    PaginatedQueryStringSchema,
+    PaginatedResultSchema,
+    record_list_response,
+)
 from ....utils.tracing import trace_event, get_timer, AdminAPIMessageTracingSchema
 
 
-class V10CredentialExchangeListQueryStringSchema(Schema):
+class V10CredentialExchangeListQueryStringSchema(PaginatedQueryStringSchema):
     """Parameters and validators for credential exchange list query."""
 
     connection_id = fields.UUID(
@@ -89,7 +94,7 @@ class V10CredentialExchangeListQueryStringSchema(Schema):
     )
 
 
-class V10CredentialExchangeListResultSchema(Schema):
+class V10CredentialExchangeListResultSchema(PaginatedResultSchema):
     """Result schema for Aries#0036 v1.0 credential exchange query."""
 
     results = fields.List(
@@ -269,7 +274,6 @@ async def credential_exchange_list(request: web.BaseRequest):
         The connection list response
 
     """
-    context = request.app["request_context"]
     tag_filter = {}
     if "thread_id" in request.query and request.query["thread_id"] != "":
         tag_filter["thread_id"] = request.query["thread_id"]
@@ -279,13 +283,9 @@ async def credential_exchange_list(request: web.BaseRequest):
         if request.query.get(k, "") != ""
     }
 
-    try:
-        records = await V10CredentialExchange.query(context, tag_filter, post_filter)
-        results = [record.serialize() for record in records]
-    except (StorageError, BaseModelError) as err:
-        raise web.HTTPBadRequest(reason=err.roll_up) from err
-
-    return web.json_response({"results": results})
+    return await record_list_response(
+        request, V10CredentialExchange, tag_filter, post_filter
+    )
 
 
 @docs(tags=["issue-credential"], summary="Fetch a single credential exchange record")
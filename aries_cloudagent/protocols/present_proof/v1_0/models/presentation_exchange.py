@@ -19,7 +19,9 @@ class V10PresentationExchange(BaseExchangeRecord):
     RECORD_TYPE = "presentation_exchange_v10"
     RECORD_ID_NAME = "presentation_exchange_id"
     WEBHOOK_TOPIC = "present_proof"
-    TAG_NAMES = {"thread_id"}
+    TAG_NAMES = {"thread_id", "connection_id", "initiator", "role", "state"}
+    CACHE_ENABLED = True
+    CACHE_MAX_ENTRIES = 1000
 
     INITIATOR_SELF = "self"
     INITIATOR_EXTERNAL = "external"
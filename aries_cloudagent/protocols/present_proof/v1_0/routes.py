@@ -49,10 +49,15 @@ from .models.presentation_exchange import (
 
 from .message_types import ATTACH_DECO_IDS, PRESENTATION_REQUEST
 
+from ....utils.paging import (
+    PaginatedQueryStringSchema,
+    PaginatedResultSchema,
+    record_list_response,
+)
 from ....utils.tracing import trace_event, get_timer, AdminAPIMessageTracingSchema
 
 
-class V10PresentationExchangeListQueryStringSchema(Schema):
+class V10PresentationExchangeListQueryStringSchema(PaginatedQueryStringSchema):
     """Parameters and validators for presentation exchange list query."""
 
     connection_id = fields.UUID(
@@ -89,7 +94,7 @@ class V10PresentationExchangeListQueryStringSchema(Schema):
     )
 
 
-class V10PresentationExchangeListSchema(Schema):
+class V10PresentationExchangeListSchema(PaginatedResultSchema):
     """Result schema for an Aries#0037 v1.0 presentation exchange query."""
 
     results = fields.List(
@@ -384,7 +389,6 @@ async def presentation_exchange_list(request: web.BaseRequest):
         The presentation exchange list response
 
     """
-    context = request.app["request_context"]
     tag_filter = {}
     if "thread_id" in request.query and request.query["thread_id"] != "":
         tag_filter["thread_id"] = request.query["thread_id"]
@@ -394,13 +398,9 @@ async def presentation_exchange_list(request: web.BaseRequest):
         if request.query.get(k, "") != ""
     }
 
-    try:
-        records = await V10PresentationExchange.query(context, tag_filter, post_filter)
-        results = [record.serialize() for record in records]
-    except (StorageError, BaseModelError) as err:
-        raise web.HTTPBadRequest(reason=err.roll_up) from err
-
-    return web.json_response({"results": results})
+    return await record_list_response(
+        request, V10PresentationExchange, tag_filter, post_filter
+    )
 
 
 @docs(tags=["present-proof"], summary="Fetch a single presentation exchange record")
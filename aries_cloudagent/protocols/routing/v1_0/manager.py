@@ -121,7 +121,7 @@ class RoutingManager:
         async for record in storage.search_records(RoutingManager.RECORD_TYPE, filters):
             value = json.loads(record.value)
             value.update(record.tags)
-            results.append(RouteRecord(**value))
+            results.append(RouteRecord(record_id=record.id, **value))
         return results
 
     async def create_route_record(
@@ -137,35 +137,68 @@ class RoutingManager:
         Returns:
             The new routing record
 
+        """
+        if not recipient_key:
+            raise RoutingManagerError("Missing recipient_key")
+        (result,) = await self.create_route_records(
+            client_connection_id, [recipient_key]
+        )
+        return result
+
+    async def create_route_records(
+        self, client_connection_id: str, recipient_keys: Sequence[str]
+    ) -> Sequence[RouteRecord]:
+        """
+        Create and store several new RouteRecords for one connection.
+
+        Args:
+            client_connection_id: The ID of the connection record
+            recipient_keys: The recipient verkeys of the routes
+
+        Returns:
+            The new routing records
+
         """
         if not client_connection_id:
             raise RoutingManagerError("Missing client_connection_id")
-        if not recipient_key:
+        if not all(recipient_keys):
             raise RoutingManagerError("Missing recipient_key")
         value = {"created_at": time_now(), "updated_at": time_now()}
-        record = StorageRecord(
-            RoutingManager.RECORD_TYPE,
-            json.dumps(value),
-            {"connection_id": client_connection_id, "recipient_key": recipient_key},
-        )
+        records = [
+            StorageRecord(
+                RoutingManager.RECORD_TYPE,
+                json.dumps(value),
+                {"connection_id": client_connection_id, "recipient_key": recip_key},
+            )
+            for recip_key in recipient_keys
+        ]
         storage: BaseStorage = await self._context.inject(BaseStorage)
-        await storage.add_record(record)
-        result = RouteRecord(
-            record_id=record.id,
-            connection_id=client_connection_id,
-            recipient_key=recipient_key,
-            created_at=value["created_at"],
-            updated_at=value["updated_at"],
-        )
-        return result
+        await storage.add_records(records)
+        return [
+            RouteRecord(
+                record_id=record.id,
+                connection_id=client_connection_id,
+                recipient_key=record.tags["recipient_key"],
+                created_at=value["created_at"],
+                updated_at=value["updated_at"],
+            )
+            for record in records
+        ]
 
     async def delete_route_record(self, route: RouteRecord):
         """Remove an existing route record."""
-        if route and route.record_id:
+        await self.delete_route_records([route])
+
+    async def delete_route_records(self, routes: Sequence[RouteRecord]):
+        """Remove several existing route records."""
+        records = [
+            StorageRecord(RoutingManager.RECORD_TYPE, None, None, route.record_id)
+            for route in routes
+            if route and route.record_id
+        ]
+        if records:
             storage: BaseStorage = await self._context.inject(BaseStorage)
-            await storage.delete_record(
-                StorageRecord(None, None, None, route.record_id)
-            )
+            await storage.delete_records(records)
 
     async def update_routes(
         self, client_connection_id: str, updates: Sequence[RouteUpdate]
@@ -184,6 +217,8 @@ class RoutingManager:
             exist[route.recipient_key] = route
 
         updated = []
+        creates = {}
+        deletes = {}
         for update in updates:
             result = RouteUpdated(
                 recipient_key=update.recipient_key, action=update.action
@@ -192,28 +227,38 @@ class RoutingManager:
             if not recip_key:
                 result.result = RouteUpdated.RESULT_CLIENT_ERROR
             elif update.action == RouteUpdate.ACTION_CREATE:
-                if recip_key in exist:
+                if recip_key in exist or recip_key in creates:
                     result.result = RouteUpdated.RESULT_NO_CHANGE
                 else:
-                    try:
-                        await self.create_route_record(client_connection_id, recip_key)
-                    except RoutingManagerError:
-                        result.result = RouteUpdated.RESULT_SERVER_ERROR
-                    else:
-                        result.result = RouteUpdated.RESULT_SUCCESS
+                    creates[recip_key] = result
             elif update.action == RouteUpdate.ACTION_DELETE:
-                if recip_key in exist:
-                    try:
-                        await self.delete_route_record(exist[recip_key])
-                    except StorageError:
-                        result.result = RouteUpdated.RESULT_SERVER_ERROR
-                    else:
-                        result.result = RouteUpdated.RESULT_SUCCESS
+                if recip_key in exist and recip_key not in deletes:
+                    deletes[recip_key] = result
                 else:
                     result.result = RouteUpdated.RESULT_NO_CHANGE
             else:
                 result.result = RouteUpdated.RESULT_CLIENT_ERROR
             updated.append(result)
+
+        # apply the changes as one bulk storage operation of each kind
+        if deletes:
+            try:
+                await self.delete_route_records([exist[key] for key in deletes])
+            except StorageError:
+                outcome = RouteUpdated.RESULT_SERVER_ERROR
+            else:
+                outcome = RouteUpdated.RESULT_SUCCESS
+            for result in deletes.values():
+                result.result = outcome
+        if creates:
+            try:
+                await self.create_route_records(client_connection_id, list(creates))
+            except (RoutingManagerError, StorageError):
+                outcome = RouteUpdated.RESULT_SERVER_ERROR
+            else:
+                outcome = RouteUpdated.RESULT_SUCCESS
+            for result in creates.values():
+                result.result = outcome
         return updated
 
     async def send_create_route(
@@ -219,9 +219,9 @@ class TestRoutingManager(AsyncTestCase):
 
     async def test_update_routes_create_server_error(self):
         with async_mock.patch.object(
-            self.manager, "create_route_record", async_mock.CoroutineMock()
-        ) as mock_mgr_create_route_record:
-            mock_mgr_create_route_record.side_effect = RoutingManagerError()
+            self.manager, "create_route_records", async_mock.CoroutineMock()
+        ) as mock_mgr_create_route_records:
+            mock_mgr_create_route_records.side_effect = RoutingManagerError()
             results = await self.manager.update_routes(
                 client_connection_id=TEST_CONN_ID,
                 updates=[
@@ -253,9 +253,9 @@ class TestRoutingManager(AsyncTestCase):
     async def test_update_routes_delete_server_error(self):
         record = await self.manager.create_route_record(TEST_CONN_ID, TEST_ROUTE_VERKEY)
         with async_mock.patch.object(
-            self.manager, "delete_route_record", async_mock.CoroutineMock()
-        ) as mock_mgr_delete_route_record:
-            mock_mgr_delete_route_record.side_effect = StorageError()
+            self.manager, "delete_route_records", async_mock.CoroutineMock()
+        ) as mock_mgr_delete_route_records:
+            mock_mgr_delete_route_records.side_effect = StorageError()
             results = await self.manager.update_routes(
                 client_connection_id=TEST_CONN_ID,
                 updates=[
@@ -270,6 +270,38 @@ class TestRoutingManager(AsyncTestCase):
             assert results[0].action == RouteUpdate.ACTION_DELETE
             assert results[0].result == RouteUpdated.RESULT_SERVER_ERROR
 
+    async def test_update_routes_bulk(self):
+        keys = [f"{TEST_ROUTE_VERKEY}{i}" for i in range(4)]
+        await self.manager.create_route_records(TEST_CONN_ID, keys[:2])
+        with async_mock.patch.object(
+            self.manager, "create_route_record", async_mock.CoroutineMock()
+        ) as mock_create, async_mock.patch.object(
+            self.manager, "delete_route_record", async_mock.CoroutineMock()
+        ) as mock_delete:
+            results = await self.manager.update_routes(
+                client_connection_id=TEST_CONN_ID,
+                updates=[
+                    RouteUpdate(recipient_key=keys[0], action=RouteUpdate.ACTION_DELETE),
+                    RouteUpdate(recipient_key=keys[0], action=RouteUpdate.ACTION_DELETE),
+                    RouteUpdate(recipient_key=keys[1], action=RouteUpdate.ACTION_CREATE),
+                    RouteUpdate(recipient_key=keys[2], action=RouteUpdate.ACTION_CREATE),
+                    RouteUpdate(recipient_key=keys[3], action=RouteUpdate.ACTION_CREATE),
+                    RouteUpdate(recipient_key=keys[3], action=RouteUpdate.ACTION_CREATE),
+                ],
+            )
+            mock_create.assert_not_called()
+            mock_delete.assert_not_called()
+        assert [result.result for result in results] == [
+            RouteUpdated.RESULT_SUCCESS,
+            RouteUpdated.RESULT_NO_CHANGE,
+            RouteUpdated.RESULT_NO_CHANGE,
+            RouteUpdated.RESULT_SUCCESS,
+            RouteUpdated.RESULT_SUCCESS,
+            RouteUpdated.RESULT_NO_CHANGE,
+        ]
+        routes = await self.manager.get_routes(TEST_CONN_ID)
+        assert sorted(route.recipient_key for route in routes) == keys[1:]
+
     async def test_send_create_route(self):
         mock_outbound_handler = async_mock.CoroutineMock()
         await self.manager.send_create_route(
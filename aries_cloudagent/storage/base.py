@@ -5,6 +5,7 @@ from typing import Mapping, Sequence
 
 from .error import StorageDuplicateError, StorageNotFoundError
 from .record import StorageRecord
+from .unit_of_work import OP_ADD, OP_DELETE, StorageOperation, StorageUnitOfWork
 
 
 DEFAULT_PAGE_SIZE = 100
@@ -107,6 +108,75 @@ class BaseStorage(ABC):
 
         """
 
+    async def add_records(self, records: Sequence[StorageRecord]):
+        """
+        Add several new records to the store.
+
+        Args:
+            records: The `StorageRecord` instances to be stored
+
+        """
+        await self.commit_operations(
+            [StorageOperation(OP_ADD, record) for record in records]
+        )
+
+    async def get_records(
+        self, record_type: str, record_ids: Sequence[str], options: Mapping = None
+    ) -> Sequence[StorageRecord]:
+        """
+        Fetch several records of the same type from the store by ID.
+
+        Args:
+            record_type: The record type
+            record_ids: The record ids
+            options: A dictionary of backend-specific options
+
+        Returns:
+            A list of `StorageRecord` instances, in the order of `record_ids`
+
+        """
+        return [
+            await self.get_record(record_type, record_id, options)
+            for record_id in record_ids
+        ]
+
+    async def delete_records(self, records: Sequence[StorageRecord]):
+        """
+        Delete several existing records.
+
+        Args:
+            records: The `StorageRecord` instances to delete
+
+        """
+        await self.commit_operations(
+            [StorageOperation(OP_DELETE, record) for record in records]
+        )
+
+    def unit_of_work(self) -> StorageUnitOfWork:
+        """
+        Create a new unit of work for batching writes to this storage.
+
+        Returns:
+            An instance of `StorageUnitOfWork`
+
+        """
+        return StorageUnitOfWork(self)
+
+    async def commit_operations(self, operations: Sequence[StorageOperation]):
+        """
+        Apply a batch of write operations.
+
+        The default implementation applies each operation in turn. Backends
+        supporting transactions should override this method to apply the
+        batch atomically.
+
+        Args:
+            operations: The `StorageOperation` instances to apply, in order
+
+        """
+        for operation in operations:
+            await operation.apply(self)
+
     def __repr__(self) -> str:
         """Human readable representation of a `BaseStorage` implementation."""
         return "<{}>".format(self.__class__.__name__)
@@ -115,6 +185,10 @@ class BaseStorage(ABC):
 class BaseStorageRecordSearch(ABC):
     """Represent an active stored records search."""
 
+    # whether the search accepts the `afterId` option, resuming the search after
+    # the given record in the storage order of the backend
+    SUPPORTS_AFTER_ID = False
+
     def __init__(
         self,
         store: BaseStorage,
@@ -11,6 +11,7 @@ from .error import (
     StorageSearchError,
 )
 from .record import StorageRecord
+from .unit_of_work import OP_ADD, OP_DELETE, StorageOperation
 from ..wallet.base import BaseWallet
 
 
@@ -144,6 +145,60 @@ class BasicStorage(BaseStorage):
             raise StorageNotFoundError("Record not found: {}".format(record.id))
         del self._records[record.id]
 
+    async def get_records(
+        self, record_type: str, record_ids: Sequence[str], options: Mapping = None
+    ) -> Sequence[StorageRecord]:
+        """
+        Fetch several records of the same type from the store by ID.
+
+        Args:
+            record_type: The record type
+            record_ids: The record ids
+            options: A dictionary of backend-specific options
+
+        Returns:
+            A list of `StorageRecord` instances, in the order of `record_ids`
+
+        Raises:
+            StorageNotFoundError: If a record is not found
+
+        """
+        results = []
+        for record_id in record_ids:
+            row = self._records.get(record_id)
+            if not row or row.type != record_type:
+                raise StorageNotFoundError("Record not found: {}".format(record_id))
+            results.append(row)
+        return results
+
+    async def commit_operations(self, operations: Sequence[StorageOperation]):
+        """
+        Apply a batch of write operations atomically.
+
+        All operations are checked against the stored records before any are
+        applied, so a failing batch leaves the store unchanged.
+
+        Args:
+            operations: The `StorageOperation` instances to apply, in order
+
+        Raises:
+            StorageDuplicateError: If an added record ID is already in use
+            StorageNotFoundError: If an updated or deleted record is not found
+
+        """
+        present = {}
+        for operation in operations:
+            record_id = operation.record.id
+            exists = present.get(record_id, record_id in self._records)
+            if operation.kind == OP_ADD:
+                if exists:
+                    raise StorageDuplicateError("Duplicate record")
+            elif not exists:
+                raise StorageNotFoundError("Record not found: {}".format(record_id))
+            present[record_id] = operation.kind != OP_DELETE
+        for operation in operations:
+            await operation.apply(self)
+
     def search_records(
         self,
         type_filter: str,
@@ -241,6 +296,8 @@ def basic_tag_query_match(tags: dict, tag_query: dict) -> bool:
 class BasicStorageRecordSearch(BaseStorageRecordSearch):
     """Represent an active stored records search."""
 
+    SUPPORTS_AFTER_ID = True
+
     def __init__(
         self,
         store: BasicStorage,
@@ -310,9 +367,24 @@ class BasicStorageRecordSearch(BaseStorageRecordSearch):
         return ret
 
     async def open(self):
-        """Start the search query."""
-        self._cache = self._store._records.copy()
-        self._iter = iter(self._cache)
+        """
+        Start the search query.
+
+        Raises:
+            StorageNotFoundError: If the record given by the `afterId` option
+                does not exist
+
+        """
+        cache = self._store._records.copy()
+        self._iter = iter(cache)
+        after_id = self.option("afterId")
+        if after_id:
+            if after_id not in cache:
+                raise StorageNotFoundError(f"Record not found: {after_id}")
+            for record_id in self._iter:
+                if record_id == after_id:
+                    break
+        self._cache = cache
 
     async def close(self):
         """Dispose of the search query."""
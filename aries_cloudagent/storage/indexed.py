@@ -0,0 +1,364 @@
+"""Indexed in-memory storage implementation (non-wallet)."""
+
+from bisect import bisect_left, bisect_right
+from typing import Mapping, Sequence
+
+from .base import BaseStorageRecordSearch
+from .basic import BasicStorage, basic_tag_query_match
+from .error import StorageNotFoundError, StorageSearchError
+from .record import StorageRecord
+from ..wallet.base import BaseWallet
+
+
+def _numeric(value: str):
+    """Convert a tag value to a float for range indexing, if possible."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class IndexedStorage(BasicStorage):
+    """
+    In-memory storage class with inverted tag indexes.
+
+    Records are indexed by type and by (type, tag name, tag value), and numeric
+    tag values are kept in sorted secondary indexes per (type, tag name). Tag
+    queries are resolved against the indexes to find candidate records, which
+    are then checked with `basic_tag_query_match` so that results always agree
+    with `BasicStorage`.
+    """
+
+    def __init__(self, _wallet: BaseWallet = None):
+        """
+        Initialize an `IndexedStorage` instance.
+
+        Args:
+            _wallet: The wallet implementation to use
+
+        """
+        super(IndexedStorage, self).__init__(_wallet)
+        self._seq = {}
+        self._next_seq = 0
+        self._type_index = {}
+        self._tag_index = {}
+        self._range_index = {}
+
+    def _index_tags(self, record: StorageRecord):
+        """Add the tags of a record to the tag indexes."""
+        for name, value in (record.tags or {}).items():
+            self._tag_index.setdefault((record.type, name, value), set()).add(
+                record.id
+            )
+            num = _numeric(value)
+            if num is not None:
+                keys, ids = self._range_index.setdefault(
+                    (record.type, name), ([], [])
+                )
+                pos = bisect_right(keys, num)
+                keys.insert(pos, num)
+                ids.insert(pos, record.id)
+
+    def _unindex_tags(self, record: StorageRecord):
+        """Remove the tags of a record from the tag indexes."""
+        for name, value in (record.tags or {}).items():
+            key = (record.type, name, value)
+            ids = self._tag_index.get(key)
+            if ids is not None:
+                ids.discard(record.id)
+                if not ids:
+                    del self._tag_index[key]
+            num = _numeric(value)
+            if num is not None and (record.type, name) in self._range_index:
+                keys, ids = self._range_index[(record.type, name)]
+                for pos in range(bisect_left(keys, num), bisect_right(keys, num)):
+                    if ids[pos] == record.id:
+                        del keys[pos]
+                        del ids[pos]
+                        break
+                if not keys:
+                    del self._range_index[(record.type, name)]
+
+    async def add_record(self, record: StorageRecord):
+        """
+        Add a new record to the store.
+
+        Args:
+            record: `StorageRecord` to be stored
+
+        Raises:
+            StorageError: If no record is provided
+            StorageError: If the record has no ID
+
+        """
+        await super(IndexedStorage, self).add_record(record)
+        self._seq[record.id] = self._next_seq
+        self._next_seq += 1
+        self._type_index.setdefault(record.type, {})[record.id] = None
+        self._index_tags(record)
+
+    async def update_record_tags(self, record: StorageRecord, tags: Mapping):
+        """
+        Update an existing stored record's tags.
+
+        Args:
+            record: `StorageRecord` to update
+            tags: New tags
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        oldrec = self._records.get(record.id)
+        if not oldrec:
+            raise StorageNotFoundError("Record not found: {}".format(record.id))
+        self._unindex_tags(oldrec)
+        await super(IndexedStorage, self).update_record_tags(record, tags)
+        self._index_tags(self._records[record.id])
+
+    async def delete_record_tags(
+        self, record: StorageRecord, tags: (Sequence, Mapping)
+    ):
+        """
+        Update an existing stored record's tags.
+
+        Args:
+            record: `StorageRecord` to delete
+            tags: Tags
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        oldrec = self._records.get(record.id)
+        if not oldrec:
+            raise StorageNotFoundError("Record not found: {}".format(record.id))
+        self._unindex_tags(oldrec)
+        await super(IndexedStorage, self).delete_record_tags(record, tags)
+        self._index_tags(self._records[record.id])
+
+    async def delete_record(self, record: StorageRecord):
+        """
+        Delete a record.
+
+        Args:
+            record: `StorageRecord` to delete
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        oldrec = self._records.get(record.id)
+        if not oldrec:
+            raise StorageNotFoundError("Record not found: {}".format(record.id))
+        await super(IndexedStorage, self).delete_record(record)
+        self._unindex_tags(oldrec)
+        del self._seq[record.id]
+        type_ids = self._type_index.get(oldrec.type)
+        if type_ids is not None:
+            type_ids.pop(record.id, None)
+            if not type_ids:
+                del self._type_index[oldrec.type]
+
+    def _range_candidates(self, type_filter: str, name: str, op: str, cmp_val):
+        """Resolve a numeric range operator against the sorted index."""
+        num = _numeric(cmp_val)
+        if num is None:
+            raise StorageSearchError("Expected numeric value for {}".format(op))
+        keys, ids = self._range_index.get((type_filter, name), ([], []))
+        if op == "$gt":
+            return set(ids[bisect_right(keys, num):])
+        elif op == "$gte":
+            return set(ids[bisect_left(keys, num):])
+        elif op == "$lt":
+            return set(ids[:bisect_left(keys, num)])
+        return set(ids[:bisect_right(keys, num)])
+
+    def _candidates(self, type_filter: str, tag_query: Mapping):
+        """
+        Find the candidate record IDs for a tag query using the indexes.
+
+        Returns:
+            A set of record IDs which is a superset of the matching records,
+            or None if the query cannot be narrowed by the indexes
+
+        """
+        result = None
+        for k, v in (tag_query or {}).items():
+            cands = None
+            if k == "$or":
+                if not isinstance(v, list):
+                    raise StorageSearchError("Expected list for $or filter value")
+                cands = set()
+                for opt in v:
+                    opt_cands = self._candidates(type_filter, opt)
+                    if opt_cands is None:
+                        cands = None
+                        break
+                    cands.update(opt_cands)
+            elif k[0] == "$":
+                # $not and unknown operators are handled by the final match
+                continue
+            elif isinstance(v, str):
+                cands = self._tag_index.get((type_filter, k, v), set())
+            elif isinstance(v, dict) and len(v) == 1:
+                op, cmp_val = list(v.items())[0]
+                if op == "$in" and isinstance(cmp_val, list):
+                    cands = set()
+                    for opt in cmp_val:
+                        cands.update(self._tag_index.get((type_filter, k, opt), ()))
+                elif op in ("$gt", "$gte", "$lt", "$lte") and isinstance(
+                    cmp_val, str
+                ):
+                    cands = self._range_candidates(type_filter, k, op, cmp_val)
+            if cands is not None:
+                result = set(cands) if result is None else result & cands
+                if not result:
+                    break
+        return result
+
+    def find_records(self, type_filter: str, tag_query: Mapping = None):
+        """
+        Find all records of a type matching a tag query.
+
+        Args:
+            type_filter: Filter string
+            tag_query: Tags to query
+
+        Returns:
+            A list of `StorageRecord`, in insertion order
+
+        """
+        type_ids = self._type_index.get(type_filter)
+        if not type_ids:
+            return []
+        cands = self._candidates(type_filter, tag_query)
+        if cands is None:
+            ids = list(type_ids)
+        else:
+            ids = sorted(cands, key=self._seq.__getitem__)
+        records = self._records
+        return [
+            records[record_id]
+            for record_id in ids
+            if basic_tag_query_match(records[record_id].tags, tag_query)
+        ]
+
+    def search_records(
+        self,
+        type_filter: str,
+        tag_query: Mapping = None,
+        page_size: int = None,
+        options: Mapping = None,
+    ) -> "IndexedStorageRecordSearch":
+        """
+        Search stored records.
+
+        Args:
+            type_filter: Filter string
+            tag_query: Tags to query
+            page_size: Page size
+            options: Dictionary of backend-specific options
+
+        Returns:
+            An instance of `IndexedStorageRecordSearch`
+
+        """
+        return IndexedStorageRecordSearch(
+            self, type_filter, tag_query, page_size, options
+        )
+
+
+class IndexedStorageRecordSearch(BaseStorageRecordSearch):
+    """Represent an active stored records search."""
+
+    SUPPORTS_AFTER_ID = True
+
+    def __init__(
+        self,
+        store: IndexedStorage,
+        type_filter: str,
+        tag_query: Mapping,
+        page_size: int = None,
+        options: Mapping = None,
+    ):
+        """
+        Initialize an `IndexedStorageRecordSearch` instance.
+
+        Args:
+            store: `BaseStorage` to search
+            type_filter: Filter string
+            tag_query: Tags to search
+            page_size: Size of page to return
+            options: Dictionary of backend-specific options
+
+        """
+        super(IndexedStorageRecordSearch, self).__init__(
+            store, type_filter, tag_query, page_size, options
+        )
+        self._results = None
+        self._pos = 0
+
+    @property
+    def opened(self) -> bool:
+        """
+        Accessor for open state.
+
+        Returns:
+            True if opened, else False
+
+        """
+        return self._results is not None
+
+    async def fetch(self, max_count: int) -> Sequence[StorageRecord]:
+        """
+        Fetch the next list of results from the store.
+
+        Args:
+            max_count: Max number of records to return
+
+        Returns:
+            A list of `StorageRecord`
+
+        Raises:
+            StorageSearchError: If the search query has not been opened
+
+        """
+        if not self.opened:
+            raise StorageSearchError("Search query has not been opened")
+        end = self._pos + max_count
+        ret = self._results[self._pos:end]
+        self._pos = end
+        return ret
+
+    async def open(self):
+        """
+        Start the search query.
+
+        Raises:
+            StorageNotFoundError: If the record given by the `afterId` option
+                does not exist
+
+        """
+        results = self._store.find_records(self.type_filter, self.tag_query)
+        pos = 0
+        after_id = self.option("afterId")
+        if after_id:
+            seq = self._store._seq
+            if after_id not in seq:
+                raise StorageNotFoundError(f"Record not found: {after_id}")
+            after_seq = seq[after_id]
+            # the results are in insertion order
+            hi = len(results)
+            while pos < hi:
+                mid = (pos + hi) // 2
+                if seq[results[mid].id] <= after_seq:
+                    pos = mid + 1
+                else:
+                    hi = mid
+        self._results = results
+        self._pos = pos
+
+    async def close(self):
+        """Dispose of the search query."""
+        self._results = None
@@ -1,5 +1,6 @@
 """Indy implementation of BaseStorage interface."""
 
+import asyncio
 import json
 from typing import Mapping, Sequence
 
@@ -209,6 +210,51 @@ class IndyStorage(BaseStorage):
                 raise StorageNotFoundError(f"Record not found: {record.id}")
             raise StorageError(str(x_indy))
 
+    async def add_records(self, records: Sequence[StorageRecord]):
+        """
+        Add several new records to the store.
+
+        The non-secrets API has no batch operations, so the records are added
+        concurrently rather than one round trip at a time.
+
+        Args:
+            records: The `StorageRecord` instances to be stored
+
+        """
+        await asyncio.gather(*(self.add_record(record) for record in records))
+
+    async def get_records(
+        self, record_type: str, record_ids: Sequence[str], options: Mapping = None
+    ) -> Sequence[StorageRecord]:
+        """
+        Fetch several records of the same type from the store by ID.
+
+        Args:
+            record_type: The record type
+            record_ids: The record ids
+            options: A dictionary of backend-specific options
+
+        Returns:
+            A list of `StorageRecord` instances, in the order of `record_ids`
+
+        """
+        return await asyncio.gather(
+            *(
+                self.get_record(record_type, record_id, options)
+                for record_id in record_ids
+            )
+        )
+
+    async def delete_records(self, records: Sequence[StorageRecord]):
+        """
+        Delete several existing records.
+
+        Args:
+            records: The `StorageRecord` instances to delete
+
+        """
+        await asyncio.gather(*(self.delete_record(record) for record in records))
+
     def search_records(
         self,
         type_filter: str,
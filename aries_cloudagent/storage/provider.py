@@ -1,5 +1,7 @@
 """Default storage provider classes."""
 
+import inspect
+import json
 import logging
 
 from ..config.base import BaseProvider, BaseInjector, BaseSettings
@@ -14,8 +16,10 @@ class StorageProvider(BaseProvider):
 
     STORAGE_TYPES = {
         "basic": "aries_cloudagent.storage.basic.BasicStorage",
+        "indexed": "aries_cloudagent.storage.indexed.IndexedStorage",
         "indy": "aries_cloudagent.storage.indy.IndyStorage",
         "postgres_storage": "aries_cloudagent.storage.indy.IndyStorage",
+        "sqlite": "aries_cloudagent.storage.sqlite.SqliteStorage",
     }
 
     async def provide(self, settings: BaseSettings, injector: BaseInjector):
@@ -27,6 +31,16 @@ class StorageProvider(BaseProvider):
         storage_type = settings.get_value(
             "storage.type", default=storage_default_type
         ).lower()
-        storage_class = self.STORAGE_TYPES.get(storage_type, storage_type)
-        storage = ClassLoader.load_class(storage_class)(wallet)
-        return storage
+        storage_class = ClassLoader.load_class(
+            self.STORAGE_TYPES.get(storage_type, storage_type)
+        )
+        storage_config = settings.get_value("storage.config")
+        if storage_config:
+            # only passed to storage classes which accept a configuration
+            if "config" in inspect.signature(storage_class).parameters:
+                return storage_class(wallet, config=json.loads(storage_config))
+            LOGGER.warning(
+                "Ignoring storage configuration, not supported by storage type: %s",
+                storage_type,
+            )
+        return storage_class(wallet)
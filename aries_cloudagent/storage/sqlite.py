@@ -0,0 +1,699 @@
+"""SQLite implementation of BaseStorage interface."""
+
+import asyncio
+import sqlite3
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Mapping, Sequence
+from uuid import uuid4
+
+from .base import BaseStorage, BaseStorageRecordSearch
+from .error import (
+    StorageError,
+    StorageDuplicateError,
+    StorageNotFoundError,
+    StorageSearchError,
+)
+from .record import StorageRecord
+from .unit_of_work import OP_ADD, OP_DELETE, StorageOperation
+from ..wallet.base import BaseWallet
+
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS records (
+        row_id INTEGER PRIMARY KEY,
+        type TEXT NOT NULL,
+        id TEXT NOT NULL UNIQUE,
+        value TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_records_type ON records (type, row_id)",
+    """CREATE TABLE IF NOT EXISTS tags (
+        row_id INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        name TEXT NOT NULL,
+        value TEXT NOT NULL,
+        PRIMARY KEY (row_id, name)
+    )""",
+    """CREATE INDEX IF NOT EXISTS ix_tags_type_name_value
+        ON tags (type, name, value, row_id)""",
+)
+
+TAG_SUBQUERY = (
+    "r.row_id IN (SELECT row_id FROM tags WHERE type = ? AND name = ? AND {})"
+)
+
+RANGE_OPERATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+# stay below the default SQLITE_MAX_VARIABLE_NUMBER of older releases
+MAX_QUERY_PARAMS = 500
+
+
+def sqlite_tag_value_clause(type_filter: str, name: str, match: dict) -> tuple:
+    """Translate a single tag subquery into an SQL clause and parameters."""
+    if len(match) != 1:
+        raise StorageSearchError("Unsupported subquery: {}".format(match))
+    op = list(match.keys())[0]
+    cmp_val = match[op]
+    if op == "$in":
+        if not isinstance(cmp_val, list):
+            raise StorageSearchError("Expected list for $in value")
+        if not cmp_val:
+            return "0", []
+        cond = "value IN ({})".format(", ".join("?" * len(cmp_val)))
+        params = list(cmp_val)
+    else:
+        if not isinstance(cmp_val, str):
+            raise StorageSearchError("Expected string for filter value")
+        if op == "$neq":
+            cond = "value != ?"
+            params = [cmp_val]
+        elif op in RANGE_OPERATORS:
+            try:
+                params = [float(cmp_val)]
+            except ValueError:
+                raise StorageSearchError(
+                    "Expected numeric value for {} filter".format(op)
+                )
+            cond = "CAST(value AS REAL) {} ?".format(RANGE_OPERATORS[op])
+        else:
+            raise StorageSearchError("Unsupported match operator: {}".format(op))
+    return TAG_SUBQUERY.format(cond), [type_filter, name] + params
+
+
+def sqlite_tag_query_clause(type_filter: str, tag_query: dict) -> tuple:
+    """
+    Translate a WQL tag query into an SQL clause and parameters.
+
+    The supported operators mirror those handled by `basic_tag_query_match`.
+    The clause refers to the records table under the alias `r`.
+    """
+    clauses = []
+    params = []
+    for k, v in (tag_query or {}).items():
+        if k == "$or":
+            if not isinstance(v, list):
+                raise StorageSearchError("Expected list for $or filter value")
+            if not v:
+                clause, sub_params = "0", []
+            else:
+                sub = [sqlite_tag_query_clause(type_filter, opt) for opt in v]
+                clause = "({})".format(" OR ".join("({})".format(s[0]) for s in sub))
+                sub_params = [p for s in sub for p in s[1]]
+        elif k == "$not":
+            if not isinstance(v, dict):
+                raise StorageSearchError("Expected dict for $not filter value")
+            clause, sub_params = sqlite_tag_query_clause(type_filter, v)
+            clause = "NOT ({})".format(clause)
+        elif k[0] == "$":
+            raise StorageSearchError("Unexpected filter operator: {}".format(k))
+        elif isinstance(v, str):
+            clause = TAG_SUBQUERY.format("value = ?")
+            sub_params = [type_filter, k, v]
+        elif isinstance(v, dict):
+            clause, sub_params = sqlite_tag_value_clause(type_filter, k, v)
+        else:
+            raise StorageSearchError(
+                "Expected string or dict for filter value, got {}".format(v)
+            )
+        clauses.append(clause)
+        params.extend(sub_params)
+    if not clauses:
+        return "1", []
+    return " AND ".join(clauses), params
+
+
+class SqliteStorage(BaseStorage):
+    """
+    SQLite storage class.
+
+    Records and tags are kept in separate tables, with tags indexed on
+    (type, name, value). File databases run in WAL mode: all writes go through
+    a single dedicated writer thread while searches and lookups are served by
+    a pool of reader threads, each holding its own connection.
+    """
+
+    DEFAULT_READER_POOL_SIZE = 4
+    DEFAULT_TIMEOUT = 30.0
+
+    def __init__(self, _wallet: BaseWallet = None, config: Mapping = None):
+        """
+        Initialize a `SqliteStorage` instance.
+
+        Args:
+            _wallet: The wallet implementation to use
+            config: {path, reader_pool_size, timeout}; an in-memory database
+                is used when no path is given
+
+        """
+        config = config or {}
+        path = config.get("path")
+        self._timeout = float(config.get("timeout", self.DEFAULT_TIMEOUT))
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        if path and path != ":memory:":
+            self._path = path
+            self._memory = False
+            self._readers = ThreadPoolExecutor(
+                max_workers=max(
+                    1,
+                    int(
+                        config.get("reader_pool_size", self.DEFAULT_READER_POOL_SIZE)
+                    ),
+                )
+            )
+        else:
+            # a shared-cache memory database must be read by its writer thread
+            self._path = "file:storage-{}?mode=memory&cache=shared".format(
+                uuid4().hex
+            )
+            self._memory = True
+            self._readers = self._writer
+        self._ready = self._writer.submit(self._init_schema)
+
+    @property
+    def path(self) -> str:
+        """Accessor for the database path."""
+        return self._path
+
+    @property
+    def in_memory(self) -> bool:
+        """Accessor for whether the database is only held in memory."""
+        return self._memory
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the SQLite connection for the current worker thread."""
+        conn = getattr(self._local, "conn", None)
+        if not conn:
+            conn = sqlite3.connect(
+                self._path,
+                timeout=self._timeout,
+                isolation_level=None,
+                check_same_thread=False,
+                uri=self._memory,
+            )
+            if not self._memory:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _init_schema(self):
+        """Create the database tables and indexes if necessary."""
+        conn = self._connection()
+        for statement in SCHEMA:
+            conn.execute(statement)
+
+    def _transaction(self, operation, *args):
+        """Run an operation on the writer connection in a single transaction."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = operation(conn, *args)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def _read(self, operation, *args):
+        """Run an operation on a reader connection."""
+        self._ready.result()
+        return operation(self._connection(), *args)
+
+    async def _run(self, executor: ThreadPoolExecutor, method, *args):
+        """Run a blocking database method on an executor."""
+        try:
+            return await asyncio.get_event_loop().run_in_executor(
+                executor, method, *args
+            )
+        except sqlite3.IntegrityError as err:
+            # unique and primary key violations are reported as UNIQUE
+            if str(err).startswith("UNIQUE constraint failed"):
+                raise StorageDuplicateError(str(err)) from err
+            raise StorageError(str(err)) from err
+        except sqlite3.Error as err:
+            raise StorageError(str(err)) from err
+
+    async def write(self, operation, *args):
+        """
+        Run an operation against the database in a write transaction.
+
+        Args:
+            operation: A callable accepting a `sqlite3.Connection` and `args`
+
+        Returns:
+            The result of the operation
+
+        """
+        return await self._run(self._writer, self._transaction, operation, *args)
+
+    async def read(self, operation, *args):
+        """
+        Run an operation against the database on a reader connection.
+
+        Args:
+            operation: A callable accepting a `sqlite3.Connection` and `args`
+
+        Returns:
+            The result of the operation
+
+        """
+        return await self._run(self._readers, self._read, operation, *args)
+
+    async def close(self):
+        """Close all database connections and stop the worker threads."""
+        self._writer.shutdown(wait=True)
+        if self._readers is not self._writer:
+            self._readers.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    @staticmethod
+    def _find_record_id(conn: sqlite3.Connection, record: StorageRecord) -> int:
+        """Find the row ID of a stored record."""
+        row = conn.execute(
+            "SELECT row_id FROM records WHERE id = ? AND type = ?",
+            (record.id, record.type),
+        ).fetchone()
+        if not row:
+            raise StorageNotFoundError("Record not found: {}".format(record.id))
+        return row[0]
+
+    @staticmethod
+    def _insert_tags(
+        conn: sqlite3.Connection, row_id: int, record_type: str, tags: Mapping
+    ):
+        """Insert the tags for a stored record."""
+        if tags:
+            conn.executemany(
+                "INSERT INTO tags (row_id, type, name, value) VALUES (?, ?, ?, ?)",
+                ((row_id, record_type, k, v) for (k, v) in tags.items()),
+            )
+
+    @classmethod
+    def _add_row(cls, conn: sqlite3.Connection, record: StorageRecord):
+        """Insert a new record and its tags."""
+        cursor = conn.execute(
+            "INSERT INTO records (type, id, value) VALUES (?, ?, ?)",
+            (record.type, record.id, record.value),
+        )
+        cls._insert_tags(conn, cursor.lastrowid, record.type, record.tags)
+
+    @classmethod
+    def _update_row(
+        cls,
+        conn: sqlite3.Connection,
+        record: StorageRecord,
+        value: str = None,
+        tags: Mapping = None,
+    ):
+        """Update the value and/or tags of a stored record."""
+        row_id = cls._find_record_id(conn, record)
+        if value is not None:
+            conn.execute(
+                "UPDATE records SET value = ? WHERE row_id = ?", (value, row_id)
+            )
+        if tags is not None:
+            conn.execute("DELETE FROM tags WHERE row_id = ?", (row_id,))
+            cls._insert_tags(conn, row_id, record.type, tags)
+
+    @classmethod
+    def _delete_row(cls, conn: sqlite3.Connection, record: StorageRecord):
+        """Delete a stored record and its tags."""
+        row_id = cls._find_record_id(conn, record)
+        conn.execute("DELETE FROM tags WHERE row_id = ?", (row_id,))
+        conn.execute("DELETE FROM records WHERE row_id = ?", (row_id,))
+
+    async def add_record(self, record: StorageRecord):
+        """
+        Add a new record to the store.
+
+        Args:
+            record: `StorageRecord` to be stored
+
+        Raises:
+            StorageError: If no record is provided
+            StorageError: If the record has no ID
+            StorageDuplicateError: If the record ID is already in use
+
+        """
+        if not record:
+            raise StorageError("No record provided")
+        if not record.id:
+            raise StorageError("Record has no ID")
+
+        try:
+            await self.write(self._add_row, record)
+        except StorageDuplicateError:
+            raise StorageDuplicateError("Duplicate record ID: {}".format(record.id))
+
+    async def get_record(
+        self, record_type: str, record_id: str, options: Mapping = None
+    ) -> StorageRecord:
+        """
+        Fetch a record from the store by type and ID.
+
+        Args:
+            record_type: The record type
+            record_id: The record id
+            options: A dictionary of backend-specific options
+
+        Returns:
+            A `StorageRecord` instance
+
+        Raises:
+            StorageNotFoundError: If the record is not found
+
+        """
+        retrieve_tags = (options or {}).get("retrieveTags", True)
+
+        def _get(conn: sqlite3.Connection):
+            row = conn.execute(
+                "SELECT row_id, value FROM records WHERE id = ? AND type = ?",
+                (record_id, record_type),
+            ).fetchone()
+            if not row:
+                return None
+            tags = {}
+            if retrieve_tags:
+                tags = dict(
+                    conn.execute(
+                        "SELECT name, value FROM tags WHERE row_id = ?", (row[0],)
+                    ).fetchall()
+                )
+            return StorageRecord(
+                type=record_type, id=record_id, value=row[1], tags=tags
+            )
+
+        result = await self.read(_get)
+        if not result:
+            raise StorageNotFoundError(
+                "{} record not found: {}".format(record_type, record_id)
+            )
+        return result
+
+    async def get_records(
+        self, record_type: str, record_ids: Sequence[str], options: Mapping = None
+    ) -> Sequence[StorageRecord]:
+        """
+        Fetch several records of the same type from the store by ID.
+
+        Args:
+            record_type: The record type
+            record_ids: The record ids
+            options: A dictionary of backend-specific options
+
+        Returns:
+            A list of `StorageRecord` instances, in the order of `record_ids`
+
+        Raises:
+            StorageNotFoundError: If a record is not found
+
+        """
+        retrieve_tags = (options or {}).get("retrieveTags", True)
+        record_ids = list(record_ids)
+
+        def _get(conn: sqlite3.Connection):
+            found = {}
+            for start in range(0, len(record_ids), MAX_QUERY_PARAMS):
+                chunk = record_ids[start:start + MAX_QUERY_PARAMS]
+                marks = ", ".join("?" * len(chunk))
+                rows = conn.execute(
+                    "SELECT row_id, id, value FROM records "
+                    f"WHERE type = ? AND id IN ({marks})",
+                    [record_type, *chunk],
+                ).fetchall()
+                tags = {}
+                if retrieve_tags and rows:
+                    marks = ", ".join("?" * len(rows))
+                    for (row_id, name, value) in conn.execute(
+                        f"SELECT row_id, name, value FROM tags WHERE row_id IN ({marks})",
+                        [row[0] for row in rows],
+                    ):
+                        tags.setdefault(row_id, {})[name] = value
+                for (row_id, record_id, value) in rows:
+                    found[record_id] = StorageRecord(
+                        type=record_type,
+                        id=record_id,
+                        value=value,
+                        tags=tags.get(row_id, {}),
+                    )
+            return found
+
+        found = await self.read(_get)
+        missing = [record_id for record_id in record_ids if record_id not in found]
+        if missing:
+            raise StorageNotFoundError(
+                "{} record not found: {}".format(record_type, missing[0])
+            )
+        return [found[record_id] for record_id in record_ids]
+
+    async def update_record_value(self, record: StorageRecord, value: str):
+        """
+        Update an existing stored record's value.
+
+        Args:
+            record: `StorageRecord` to update
+            value: The new value
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        await self.write(self._update_row, record, value)
+
+    async def update_record_tags(self, record: StorageRecord, tags: Mapping):
+        """
+        Update an existing stored record's tags.
+
+        Args:
+            record: `StorageRecord` to update
+            tags: New tags
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        await self.write(self._update_row, record, None, tags or {})
+
+    async def delete_record_tags(
+        self, record: StorageRecord, tags: (Sequence, Mapping)
+    ):
+        """
+        Update an existing stored record's tags.
+
+        Args:
+            record: `StorageRecord` to delete
+            tags: Tags
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        names = list(tags or ())
+
+        def _delete(conn: sqlite3.Connection):
+            row_id = self._find_record_id(conn, record)
+            conn.executemany(
+                "DELETE FROM tags WHERE row_id = ? AND name = ?",
+                ((row_id, name) for name in names),
+            )
+
+        await self.write(_delete)
+
+    async def delete_record(self, record: StorageRecord):
+        """
+        Delete a record.
+
+        Args:
+            record: `StorageRecord` to delete
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        await self.write(self._delete_row, record)
+
+    async def commit_operations(self, operations: Sequence[StorageOperation]):
+        """
+        Apply a batch of write operations in a single transaction.
+
+        Args:
+            operations: The `StorageOperation` instances to apply, in order
+
+        Raises:
+            StorageDuplicateError: If an added record ID is already in use
+            StorageNotFoundError: If an updated or deleted record is not found
+
+        """
+
+        def _commit(conn: sqlite3.Connection):
+            for operation in operations:
+                if operation.kind == OP_ADD:
+                    self._add_row(conn, operation.record)
+                elif operation.kind == OP_DELETE:
+                    self._delete_row(conn, operation.record)
+                else:
+                    self._update_row(
+                        conn, operation.record, operation.value, operation.tags
+                    )
+
+        await self.write(_commit)
+
+    def search_records(
+        self,
+        type_filter: str,
+        tag_query: Mapping = None,
+        page_size: int = None,
+        options: Mapping = None,
+    ) -> "SqliteStorageRecordSearch":
+        """
+        Search stored records.
+
+        Args:
+            type_filter: Filter string
+            tag_query: Tags to query
+            page_size: Page size
+            options: Dictionary of backend-specific options
+
+        Returns:
+            An instance of `SqliteStorageRecordSearch`
+
+        """
+        return SqliteStorageRecordSearch(
+            self, type_filter, tag_query, page_size, options
+        )
+
+
+class SqliteStorageRecordSearch(BaseStorageRecordSearch):
+    """Represent an active stored records search."""
+
+    SUPPORTS_AFTER_ID = True
+
+    def __init__(
+        self,
+        store: SqliteStorage,
+        type_filter: str,
+        tag_query: Mapping,
+        page_size: int = None,
+        options: Mapping = None,
+    ):
+        """
+        Initialize a `SqliteStorageRecordSearch` instance.
+
+        Args:
+            store: `BaseStorage` to search
+            type_filter: Filter string
+            tag_query: Tags to search
+            page_size: Size of page to return
+            options: Dictionary of backend-specific options
+
+        """
+        super(SqliteStorageRecordSearch, self).__init__(
+            store, type_filter, tag_query, page_size, options
+        )
+        self._clause = None
+        self._params = None
+        self._last_row_id = 0
+
+    @property
+    def opened(self) -> bool:
+        """
+        Accessor for open state.
+
+        Returns:
+            True if opened, else False
+
+        """
+        return self._clause is not None
+
+    def _fetch_page(self, conn: sqlite3.Connection, max_count: int) -> tuple:
+        """Fetch the next page of records following the last row seen."""
+        rows = conn.execute(
+            "SELECT r.row_id, r.id, r.value FROM records r "
+            "WHERE r.type = ? AND r.row_id > ? AND ({}) "
+            "ORDER BY r.row_id LIMIT ?".format(self._clause),
+            [self.type_filter, self._last_row_id] + self._params + [max_count],
+        ).fetchall()
+        if not rows:
+            return [], self._last_row_id
+        tags = {}
+        if self.option("retrieveTags", True):
+            row_ids = [row[0] for row in rows]
+            for (row_id, name, value) in conn.execute(
+                "SELECT row_id, name, value FROM tags WHERE row_id IN ({})".format(
+                    ", ".join("?" * len(row_ids))
+                ),
+                row_ids,
+            ):
+                tags.setdefault(row_id, {})[name] = value
+        # as for get_record, records without tags have empty tags
+        records = [
+            StorageRecord(
+                type=self.type_filter,
+                id=record_id,
+                value=value,
+                tags=tags.get(row_id, {}),
+            )
+            for (row_id, record_id, value) in rows
+        ]
+        return records, rows[-1][0]
+
+    async def fetch(self, max_count: int) -> Sequence[StorageRecord]:
+        """
+        Fetch the next list of results from the store.
+
+        Args:
+            max_count: Max number of records to return
+
+        Returns:
+            A list of `StorageRecord`
+
+        Raises:
+            StorageSearchError: If the search query has not been opened
+
+        """
+        if not self.opened:
+            raise StorageSearchError("Search query has not been opened")
+        try:
+            ret, self._last_row_id = await self.store.read(
+                self._fetch_page, max_count
+            )
+        except StorageSearchError:
+            raise
+        except StorageError as err:
+            raise StorageSearchError(str(err)) from err
+        return ret
+
+    async def open(self):
+        """
+        Start the search query.
+
+        Raises:
+            StorageNotFoundError: If the record given by the `afterId` option
+                does not exist
+
+        """
+        last_row_id = 0
+        after_id = self.option("afterId")
+        if after_id:
+            last_row_id = await self.store.read(
+                self.store._find_record_id,
+                StorageRecord(self.type_filter, None, id=after_id),
+            )
+        self._clause, self._params = sqlite_tag_query_clause(
+            self.type_filter, self.tag_query
+        )
+        self._last_row_id = last_row_id
+
+    async def close(self):
+        """Dispose of the search query."""
+        self._clause = None
+        self._params = None
@@ -16,6 +16,12 @@ from aries_cloudagent.storage.basic import (
     basic_tag_query_match,
 )
 from aries_cloudagent.storage.record import StorageRecord
+from aries_cloudagent.storage.unit_of_work import (
+    OP_ADD,
+    OP_DELETE,
+    OP_UPDATE,
+    StorageOperation,
+)
 
 
 @pytest.fixture()
@@ -126,6 +132,71 @@ class TestBasicStorage:
         with pytest.raises(StorageNotFoundError):
             await store.delete_record_tags(missing, {"a": "A"})
 
+    @pytest.mark.asyncio
+    async def test_commit_operations(self, store):
+        updated = test_record()
+        deleted = test_record()
+        added = test_record({"a": "1"})
+        await store.add_record(updated)
+        await store.add_record(deleted)
+        await store.commit_operations(
+            [
+                StorageOperation(OP_ADD, added),
+                StorageOperation(OP_UPDATE, updated, "NEW", {"b": "2"}),
+                StorageOperation(OP_DELETE, deleted),
+            ]
+        )
+        assert await store.get_record(added.type, added.id) == added
+        result = await store.get_record(updated.type, updated.id)
+        assert result.value == "NEW" and result.tags == {"b": "2"}
+        with pytest.raises(StorageNotFoundError):
+            await store.get_record(deleted.type, deleted.id)
+
+    @pytest.mark.asyncio
+    async def test_commit_operations_atomic(self, store):
+        record = test_record()
+        await store.add_record(record)
+        added = test_record()
+        for failing, error in (
+            (StorageOperation(OP_ADD, record), StorageDuplicateError),
+            (StorageOperation(OP_DELETE, test_missing_record()), StorageNotFoundError),
+        ):
+            with pytest.raises(error):
+                await store.commit_operations(
+                    [
+                        StorageOperation(OP_ADD, added),
+                        StorageOperation(OP_UPDATE, record, "NEW", {"b": "2"}),
+                        failing,
+                    ]
+                )
+            assert await store.get_record(record.type, record.id) == record
+            with pytest.raises(StorageNotFoundError):
+                await store.get_record(added.type, added.id)
+
+    @pytest.mark.asyncio
+    async def test_bulk(self, store):
+        records = [test_record({"n": str(i)}) for i in range(5)]
+        await store.add_records(records)
+        ids = [record.id for record in reversed(records)]
+        assert await store.get_records("TYPE", ids) == list(reversed(records))
+        with pytest.raises(StorageNotFoundError):
+            await store.get_records("TYPE", ids + ["missing"])
+        with pytest.raises(StorageDuplicateError):
+            await store.add_records([test_record(), records[0]])
+        await store.delete_records(records[:3])
+        found = await store.search_records("TYPE", None).fetch_all()
+        assert sorted(row.id for row in found) == sorted(r.id for r in records[3:])
+        with pytest.raises(StorageNotFoundError):
+            await store.delete_records(records[2:])
+
+    @pytest.mark.asyncio
+    async def test_search_untagged(self, store):
+        record = StorageRecord(type="TYPE", value="TEST")
+        await store.add_record(record)
+        found = await store.search_records(record.type, {}).fetch_single()
+        assert found.tags == {}
+        assert (await store.get_record(record.type, record.id)).tags == {}
+
     @pytest.mark.asyncio
     async def test_search(self, store):
         record = test_record()
@@ -198,6 +269,35 @@ class TestBasicStorage:
             count += 1
         assert count == 1
 
+    @pytest.mark.asyncio
+    async def test_search_after_id(self, store):
+        records = [test_record({"n": str(i % 2)}) for i in range(6)]
+        for record in records:
+            await store.add_record(record)
+        await store.add_record(test_missing_record())
+
+        search = store.search_records("TYPE", {}, None, {"afterId": records[2].id})
+        assert search.SUPPORTS_AFTER_ID
+        found = await search.fetch_all()
+        assert [r.id for r in found] == [r.id for r in records[3:]]
+
+        # the anchor need not match the tag query
+        search = store.search_records(
+            "TYPE", {"n": "1"}, None, {"afterId": records[2].id}
+        )
+        found = await search.fetch_all()
+        assert [r.id for r in found] == [records[3].id, records[5].id]
+
+        # stable when earlier records are removed
+        await store.delete_record(records[0])
+        search = store.search_records("TYPE", {}, None, {"afterId": records[2].id})
+        found = await search.fetch_all()
+        assert [r.id for r in found] == [r.id for r in records[3:]]
+
+        search = store.search_records("TYPE", {}, None, {"afterId": records[0].id})
+        with pytest.raises(StorageNotFoundError):
+            await search.open()
+
     @pytest.mark.asyncio
     async def test_closed_search(self, store):
         search = store.search_records("TYPE", {}, None)
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from aries_cloudagent.storage.basic import BasicStorage
+from aries_cloudagent.storage.error import StorageSearchError
+from aries_cloudagent.storage.indexed import IndexedStorage
+from aries_cloudagent.storage.record import StorageRecord
+
+from . import test_basic_storage
+
+
+@pytest.fixture()
+def store():
+    yield IndexedStorage()
+
+
+async def populate(store, count):
+    for i in range(count):
+        await store.add_record(
+            StorageRecord(
+                type="TYPE" if i % 2 else "OTHER",
+                value=str(i),
+                tags={"num": str(i), "mod": str(i % 10), "name": "n{}".format(i)},
+            )
+        )
+
+
+async def search_values(store, tag_query, type_filter="TYPE"):
+    search = store.search_records(type_filter, tag_query)
+    return [row.value async for row in search]
+
+
+class TestIndexedStorage(test_basic_storage.TestBasicStorage):
+    """Run the `BasicStorage` test suite against `IndexedStorage`."""
+
+    @pytest.mark.asyncio
+    async def test_query_matches_basic(self, store):
+        basic = BasicStorage()
+        await populate(store, 200)
+        await populate(basic, 200)
+
+        for tag_query in (
+            None,
+            {},
+            {"mod": "3"},
+            {"mod": "3", "name": "n13"},
+            {"mod": {"$in": ["1", "5"]}},
+            {"$or": [{"mod": "1"}, {"name": "n6"}, {"num": {"$gt": "190"}}]},
+            {"$or": [{"mod": "1"}, {"$not": {"mod": "3"}}]},
+            {"num": {"$gt": "100"}, "mod": {"$neq": "5"}},
+            {"num": {"$gte": "100"}},
+            {"num": {"$lt": "15.5"}},
+            {"num": {"$lte": "15"}},
+            {"$not": {"mod": "1"}},
+            {"mod": "missing"},
+        ):
+            assert await search_values(store, tag_query) == await search_values(
+                basic, tag_query
+            )
+
+    @pytest.mark.asyncio
+    async def test_index_maintenance(self, store):
+        record = StorageRecord(type="TYPE", value="v", tags={"a": "1", "b": "x"})
+        await store.add_record(record)
+        assert await search_values(store, {"a": {"$gt": "0"}}) == ["v"]
+
+        await store.update_record_tags(record, {"a": "5"})
+        assert await search_values(store, {"b": "x"}) == []
+        assert await search_values(store, {"a": {"$lt": "2"}}) == []
+        assert await search_values(store, {"a": {"$gte": "5"}}) == ["v"]
+
+        await store.delete_record_tags(record, ["a"])
+        assert await search_values(store, {"a": {"$gte": "5"}}) == []
+
+        await store.delete_record(record)
+        assert await search_values(store, {}) == []
+        assert not store._tag_index
+        assert not store._range_index
+        assert not store._type_index
+
+    @pytest.mark.asyncio
+    async def test_range_non_numeric(self, store):
+        await populate(store, 4)
+        with pytest.raises(StorageSearchError):
+            await search_values(store, {"num": {"$gt": "abc"}})
+
+    @pytest.mark.asyncio
+    @pytest.mark.benchmark
+    async def test_benchmark_vs_basic(self, store):
+        count = 5000
+        basic = BasicStorage()
+        await populate(store, count)
+        await populate(basic, count)
+
+        timings = {}
+        for name, target in (("basic", basic), ("indexed", store)):
+            start = time.perf_counter()
+            for i in range(1, 200, 2):
+                found = await search_values(target, {"name": "n{}".format(i)})
+                assert found == [str(i)]
+            timings[name] = time.perf_counter() - start
+        print(
+            "equality lookup x100 over {} records: basic {:.4f}s, indexed {:.4f}s".format(
+                count, timings["basic"], timings["indexed"]
+            )
+        )
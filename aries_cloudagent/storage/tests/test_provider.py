@@ -0,0 +1,32 @@
+from asynctest import TestCase as AsyncTestCase
+
+from ...config.injection_context import InjectionContext
+from ...config.settings import Settings
+from ...wallet.base import BaseWallet
+from ...wallet.basic import BasicWallet
+
+from ..basic import BasicStorage
+from ..provider import StorageProvider
+from ..sqlite import SqliteStorage
+
+
+class TestProvider(AsyncTestCase):
+    def setUp(self):
+        self.context = InjectionContext()
+        self.context.injector.bind_instance(BaseWallet, BasicWallet())
+
+    async def test_provide_config(self):
+        settings = Settings(
+            {"storage.type": "sqlite", "storage.config": '{"timeout": 7}'}
+        )
+        storage = await StorageProvider().provide(settings, self.context.injector)
+        assert isinstance(storage, SqliteStorage)
+        assert storage._timeout == 7
+        await storage.close()
+
+    async def test_provide_config_not_accepted(self):
+        settings = Settings(
+            {"storage.type": "basic", "storage.config": '{"timeout": 7}'}
+        )
+        storage = await StorageProvider().provide(settings, self.context.injector)
+        assert isinstance(storage, BasicStorage)
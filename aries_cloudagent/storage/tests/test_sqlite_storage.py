@@ -0,0 +1,144 @@
+import pytest
+
+from aries_cloudagent.storage.basic import BasicStorage
+from aries_cloudagent.storage.error import (
+    StorageDuplicateError,
+    StorageError,
+    StorageSearchError,
+)
+from aries_cloudagent.storage.record import StorageRecord
+from aries_cloudagent.storage.sqlite import (
+    SqliteStorage,
+    sqlite_tag_query_clause,
+)
+
+from . import test_basic_storage
+
+
+@pytest.fixture()
+def store(tmp_path):
+    yield SqliteStorage(None, {"path": str(tmp_path / "storage.db")})
+
+
+async def populate(store, count):
+    for i in range(count):
+        await store.add_record(
+            StorageRecord(
+                type="TYPE" if i % 2 else "OTHER",
+                value=str(i),
+                tags={"num": str(i), "mod": str(i % 10), "name": "n{}".format(i)},
+            )
+        )
+
+
+async def search_values(store, tag_query, type_filter="TYPE", page_size=None):
+    search = store.search_records(type_filter, tag_query, page_size)
+    return [row.value async for row in search]
+
+
+class TestSqliteStorage(test_basic_storage.TestBasicStorage):
+    """Run the `BasicStorage` test suite against `SqliteStorage`."""
+
+    @pytest.mark.asyncio
+    async def test_query_matches_basic(self, store):
+        basic = BasicStorage()
+        await populate(store, 100)
+        await populate(basic, 100)
+
+        for tag_query in (
+            None,
+            {},
+            {"mod": "3"},
+            {"mod": "3", "name": "n13"},
+            {"mod": {"$in": ["1", "5"]}},
+            {"mod": {"$in": []}},
+            {"mod": {"$neq": "1"}},
+            {"$or": [{"mod": "1"}, {"name": "n6"}, {"num": {"$gt": "90"}}]},
+            {"$or": [{"mod": "1"}, {"$not": {"mod": "3"}}]},
+            {"$or": []},
+            {"num": {"$gt": "50"}, "mod": {"$neq": "5"}},
+            {"num": {"$gte": "50"}},
+            {"num": {"$lt": "15.5"}},
+            {"num": {"$lte": "15"}},
+            {"$not": {"mod": "1"}},
+            {"$not": {"missing": "1"}},
+            {"mod": "missing"},
+        ):
+            assert await search_values(
+                store, tag_query, page_size=7
+            ) == await search_values(basic, tag_query)
+
+    @pytest.mark.asyncio
+    async def test_persistent(self, store):
+        record = StorageRecord(type="TYPE", value="v", tags={"a": "1"})
+        await store.add_record(record)
+        await store.close()
+
+        reopened = SqliteStorage(None, {"path": store.path})
+        result = await reopened.get_record(record.type, record.id)
+        assert result == record
+        assert await search_values(reopened, {"a": "1"}) == ["v"]
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_in_memory(self):
+        store = SqliteStorage()
+        await populate(store, 10)
+        assert await search_values(store, {"mod": {"$lt": "4"}}) == ["1", "3"]
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_retrieve_no_tags(self, store):
+        record = StorageRecord(type="TYPE", value="v", tags={"a": "1"})
+        await store.add_record(record)
+        result = await store.get_record(
+            record.type, record.id, {"retrieveTags": False}
+        )
+        assert result.tags == {}
+        search = store.search_records(
+            record.type, None, None, {"retrieveTags": False}
+        )
+        assert (await search.fetch_single()).tags == {}
+
+    @pytest.mark.asyncio
+    async def test_search_errors(self, store):
+        await populate(store, 2)
+        for tag_query, message in (
+            ({"$or": "-1"}, "Expected list"),
+            ({"$not": [{"z": "-1"}]}, "Expected dict"),
+            ({"$near": {"z": "-1"}}, "Unexpected filter operator"),
+            ({"a": -1}, "Expected string or dict"),
+            ({"a": {"$gt": "-1", "$lt": "1"}}, "Unsupported subquery"),
+            ({"a": {"$in": "aardvark"}}, "Expected list"),
+            ({"a": {"$gte": -1}}, "Expected string"),
+            ({"a": {"$gte": "abc"}}, "Expected numeric"),
+            ({"a": {"$near": "-1"}}, "Unsupported match operator"),
+        ):
+            with pytest.raises(StorageSearchError) as excinfo:
+                await search_values(store, tag_query)
+            assert message in str(excinfo.value)
+
+    @pytest.mark.asyncio
+    async def test_integrity_errors(self, store):
+        record = StorageRecord(type="TYPE", value="v")
+        await store.add_record(record)
+        with pytest.raises(StorageDuplicateError):
+            await store.add_record(record)
+
+        # other constraint violations are not reported as duplicates
+        with pytest.raises(StorageError) as excinfo:
+            await store.write(
+                lambda conn: conn.execute(
+                    "INSERT INTO records (type, id, value) VALUES (NULL, 'id', 'v')"
+                )
+            )
+        assert not isinstance(excinfo.value, StorageDuplicateError)
+        await store.close()
+
+    def test_tag_query_clause(self):
+        clause, params = sqlite_tag_query_clause(
+            "TYPE", {"a": "1", "$or": [{"b": {"$in": ["2", "3"]}}, {"c": "4"}]}
+        )
+        assert clause.count("r.row_id IN") == 3
+        assert " OR " in clause
+        assert params == ["TYPE", "a", "1", "TYPE", "b", "2", "3", "TYPE", "c", "4"]
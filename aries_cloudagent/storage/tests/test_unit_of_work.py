@@ -0,0 +1,117 @@
+import pytest
+
+from asynctest import mock as async_mock
+
+from aries_cloudagent.storage.basic import BasicStorage
+from aries_cloudagent.storage.error import (
+    StorageDuplicateError,
+    StorageError,
+    StorageNotFoundError,
+)
+from aries_cloudagent.storage.record import StorageRecord
+from aries_cloudagent.storage.unit_of_work import (
+    OP_ADD,
+    OP_DELETE,
+    OP_UPDATE,
+    StorageOperation,
+    StorageUnitOfWork,
+)
+
+
+@pytest.fixture()
+def store():
+    yield BasicStorage()
+
+
+def make_record(value="TEST", tags={"a": "1"}):
+    return StorageRecord(type="TYPE", value=value, tags=tags)
+
+
+class TestStorageUnitOfWork:
+    def test_repr(self, store):
+        assert "pending=0" in str(store.unit_of_work())
+
+    def test_invalid_record(self, store):
+        uow = store.unit_of_work()
+        with pytest.raises(StorageError):
+            uow.add_record(None)
+        with pytest.raises(StorageError):
+            uow.update_record(make_record()._replace(id=None), "v")
+
+    def test_merge_add(self, store):
+        uow = store.unit_of_work()
+        record = make_record()
+        uow.add_record(record)
+        with pytest.raises(StorageDuplicateError):
+            uow.add_record(record)
+        uow.update_record(record, "v2")
+        uow.update_record(record, None, {"b": "2"})
+        assert uow.pending == [
+            StorageOperation(OP_ADD, record._replace(value="v2", tags={"b": "2"}))
+        ]
+        assert uow.get_record(record.type, record.id).value == "v2"
+        uow.delete_record(record)
+        assert uow.pending == []
+        assert uow.get_record(record.type, record.id) is None
+
+    def test_merge_update(self, store):
+        uow = store.unit_of_work()
+        record = make_record()
+        uow.update_record(record, "v2")
+        assert uow.get_record(record.type, record.id) is None
+        uow.update_record(record, None, {"b": "2"})
+        assert uow.pending == [StorageOperation(OP_UPDATE, record, "v2", {"b": "2"})]
+        assert uow.get_record(record.type, record.id).tags == {"b": "2"}
+        uow.delete_record(record)
+        assert uow.pending == [StorageOperation(OP_DELETE, record)]
+        with pytest.raises(StorageNotFoundError):
+            uow.get_record(record.type, record.id)
+        with pytest.raises(StorageNotFoundError):
+            uow.update_record(record, "v3")
+        with pytest.raises(StorageNotFoundError):
+            uow.delete_record(record)
+        uow.add_record(record)
+        assert uow.pending == [
+            StorageOperation(OP_UPDATE, record, record.value, record.tags)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_commit(self, store):
+        existing = make_record()
+        await store.add_record(existing)
+        added = make_record("added")
+        callback = async_mock.CoroutineMock()
+
+        async with store.unit_of_work() as uow:
+            uow.add_record(added)
+            uow.update_record(existing, "updated", {})
+            uow.after_commit(callback, "arg")
+            with pytest.raises(StorageNotFoundError):
+                await store.get_record("TYPE", added.id)
+            callback.assert_not_called()
+
+        callback.assert_awaited_once_with("arg")
+        assert uow.pending == []
+        assert (await store.get_record("TYPE", added.id)).value == "added"
+        result = await store.get_record("TYPE", existing.id)
+        assert result.value == "updated" and result.tags == {}
+
+    @pytest.mark.asyncio
+    async def test_rollback(self, store):
+        callback = async_mock.CoroutineMock()
+        record = make_record()
+        with pytest.raises(ValueError):
+            async with StorageUnitOfWork(store) as uow:
+                uow.add_record(record)
+                uow.after_commit(callback)
+                raise ValueError()
+        assert uow.pending == []
+        await uow.commit()
+        callback.assert_not_called()
+        with pytest.raises(StorageNotFoundError):
+            await store.get_record(record.type, record.id)
+
+    @pytest.mark.asyncio
+    async def test_apply_unsupported(self, store):
+        with pytest.raises(StorageError):
+            await StorageOperation("bad", make_record()).apply(store)
@@ -0,0 +1,233 @@
+"""Unit of work for batching storage writes."""
+
+from collections import namedtuple, OrderedDict
+from typing import Awaitable, Callable, Mapping, Sequence
+
+from .error import StorageDuplicateError, StorageError, StorageNotFoundError
+from .record import StorageRecord
+
+
+OP_ADD = "add"
+OP_UPDATE = "update"
+OP_DELETE = "delete"
+
+
+class StorageOperation(namedtuple("StorageOperation", "kind record value tags")):
+    """A pending write to a storage record."""
+
+    __slots__ = ()
+
+    def __new__(
+        cls, kind: str, record: StorageRecord, value: str = None, tags: Mapping = None
+    ):
+        """Initialize some defaults on the operation."""
+        return super(cls, StorageOperation).__new__(cls, kind, record, value, tags)
+
+    async def apply(self, storage):
+        """
+        Apply the operation to a storage instance.
+
+        Args:
+            storage: The `BaseStorage` instance to update
+
+        """
+        if self.kind == OP_ADD:
+            await storage.add_record(self.record)
+        elif self.kind == OP_UPDATE:
+            if self.value is not None:
+                await storage.update_record_value(self.record, self.value)
+            if self.tags is not None:
+                await storage.update_record_tags(self.record, self.tags)
+        elif self.kind == OP_DELETE:
+            await storage.delete_record(self.record)
+        else:
+            raise StorageError(f"Unsupported storage operation: {self.kind}")
+
+
+class StorageUnitOfWork:
+    """
+    Collect record writes and commit them to storage as a single batch.
+
+    Writes to the same record are merged as they are collected, so a record
+    which is saved several times is only written once. Callbacks registered
+    with `after_commit` run once the batch has been committed, and are
+    discarded along with the pending writes on rollback.
+    """
+
+    def __init__(self, storage):
+        """
+        Initialize a `StorageUnitOfWork` instance.
+
+        Args:
+            storage: The `BaseStorage` instance to commit to
+
+        """
+        self._storage = storage
+        self._pending = OrderedDict()
+        self._callbacks = []
+
+    @property
+    def storage(self):
+        """Accessor for the `BaseStorage` instance."""
+        return self._storage
+
+    @property
+    def pending(self) -> Sequence[StorageOperation]:
+        """Accessor for the pending storage operations."""
+        return list(self._pending.values())
+
+    @staticmethod
+    def _key(record: StorageRecord) -> tuple:
+        if not record:
+            raise StorageError("No record provided")
+        if not record.id:
+            raise StorageError("Record has no ID")
+        return (record.type, record.id)
+
+    def add_record(self, record: StorageRecord):
+        """
+        Add a new record to the unit of work.
+
+        Args:
+            record: `StorageRecord` to be stored
+
+        Raises:
+            StorageDuplicateError: If the record is already pending
+
+        """
+        key = self._key(record)
+        prev = self._pending.get(key)
+        if prev and prev.kind != OP_DELETE:
+            raise StorageDuplicateError("Duplicate record ID: {}".format(record.id))
+        if prev:
+            # deleted and re-added: replace the stored record
+            self._pending[key] = StorageOperation(
+                OP_UPDATE, record, record.value, record.tags
+            )
+        else:
+            self._pending[key] = StorageOperation(OP_ADD, record)
+
+    def update_record(
+        self, record: StorageRecord, value: str = None, tags: Mapping = None
+    ):
+        """
+        Update the value and/or tags of a record in the unit of work.
+
+        Args:
+            record: `StorageRecord` to update
+            value: The new value, if changed
+            tags: The new tags, if changed
+
+        Raises:
+            StorageNotFoundError: If the record is pending deletion
+
+        """
+        key = self._key(record)
+        prev = self._pending.get(key)
+        if prev and prev.kind == OP_DELETE:
+            raise StorageNotFoundError("Record not found: {}".format(record.id))
+        if prev and prev.kind == OP_ADD:
+            added = prev.record
+            self._pending[key] = StorageOperation(
+                OP_ADD,
+                added._replace(
+                    value=added.value if value is None else value,
+                    tags=added.tags if tags is None else tags,
+                ),
+            )
+        else:
+            if prev:
+                value = prev.value if value is None else value
+                tags = prev.tags if tags is None else tags
+            self._pending[key] = StorageOperation(OP_UPDATE, record, value, tags)
+
+    def delete_record(self, record: StorageRecord):
+        """
+        Delete a record in the unit of work.
+
+        Args:
+            record: `StorageRecord` to delete
+
+        Raises:
+            StorageNotFoundError: If the record is already pending deletion
+
+        """
+        key = self._key(record)
+        prev = self._pending.get(key)
+        if prev and prev.kind == OP_DELETE:
+            raise StorageNotFoundError("Record not found: {}".format(record.id))
+        if prev and prev.kind == OP_ADD:
+            del self._pending[key]
+        else:
+            self._pending[key] = StorageOperation(OP_DELETE, record)
+
+    def get_record(self, record_type: str, record_id: str) -> StorageRecord:
+        """
+        Fetch the pending state of a record.
+
+        Args:
+            record_type: The record type
+            record_id: The record id
+
+        Returns:
+            The pending `StorageRecord`, or None if the record has no pending
+            value and tags
+
+        Raises:
+            StorageNotFoundError: If the record is pending deletion
+
+        """
+        op = self._pending.get((record_type, record_id))
+        if not op:
+            return None
+        if op.kind == OP_DELETE:
+            raise StorageNotFoundError(
+                "{} record not found: {}".format(record_type, record_id)
+            )
+        if op.kind == OP_ADD:
+            return op.record
+        if op.value is None or op.tags is None:
+            return None
+        return op.record._replace(value=op.value, tags=op.tags)
+
+    def after_commit(self, callback: Callable[..., Awaitable], *args):
+        """
+        Register a coroutine function to call once pending writes are committed.
+
+        Args:
+            callback: The coroutine function
+            args: Positional arguments for the callback
+
+        """
+        self._callbacks.append((callback, args))
+
+    async def commit(self):
+        """Commit the pending writes and run any after-commit callbacks."""
+        operations = self.pending
+        callbacks = self._callbacks
+        self._pending = OrderedDict()
+        self._callbacks = []
+        if operations:
+            await self._storage.commit_operations(operations)
+        for (callback, args) in callbacks:
+            await callback(*args)
+
+    def rollback(self):
+        """Discard the pending writes and after-commit callbacks."""
+        self._pending.clear()
+        self._callbacks.clear()
+
+    async def __aenter__(self) -> "StorageUnitOfWork":
+        """Context manager enter."""
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Context manager exit: commit on success, otherwise roll back."""
+        if exc_type:
+            self.rollback()
+        else:
+            await self.commit()
+
+    def __repr__(self) -> str:
+        """Human readable representation of a `StorageUnitOfWork`."""
+        return "<{}(pending={})>".format(self.__class__.__name__, len(self._pending))
@@ -19,6 +19,7 @@ class BaseInboundTransport(ABC):
         create_session: Callable,
         *,
         max_message_size: int = 0,
+        reuse_port: bool = False,
         wire_format: BaseWireFormat = None,
     ):
         """
@@ -27,11 +28,13 @@ class BaseInboundTransport(ABC):
         Args:
             scheme: The transport scheme identifier
             create_session: Method to create a new inbound session
+            reuse_port: Allow other processes to listen on the same port
         """
 
         self._create_session = create_session
         self._max_message_size = max_message_size
         self._scheme = scheme
+        self.reuse_port = reuse_port
         self.wire_format: BaseWireFormat = wire_format
 
     @property
@@ -50,6 +53,7 @@ class BaseInboundTransport(ABC):
         accept_undelivered: bool = False,
         can_respond: bool = False,
         client_info: dict = None,
+        pipeline_responses: bool = False,
         wire_format: BaseWireFormat = None,
     ) -> Awaitable[InboundSession]:
         """
@@ -59,12 +63,15 @@ class BaseInboundTransport(ABC):
             accept_undelivered: Flag for accepting undelivered messages
             can_respond: Flag indicating that the transport can send responses
             client_info: Request-specific client information
+            pipeline_responses: Flag indicating that the transport can send
+                several responses without waiting for another inbound message
             wire_format: Optionally override the session wire format
         """
         return self._create_session(
             accept_undelivered=accept_undelivered,
             can_respond=can_respond,
             client_info=client_info,
+            pipeline_responses=pipeline_responses,
             wire_format=wire_format or self.wire_format,
             transport_type=self.scheme,
         )
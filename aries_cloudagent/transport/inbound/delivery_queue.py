@@ -5,9 +5,19 @@ The delivery queue holds and manages messages that have not yet
 been delivered to their intended destination.
 
 """
+import itertools
+import logging
 import time
+import uuid
+
+from collections import OrderedDict
 
 from ..outbound.message import OutboundMessage
+from ..queue.base import BasePersistentQueue, decode_payload, encode_payload
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 604800  # one week
 
 
 class QueuedMessage:
@@ -17,14 +27,21 @@ class QueuedMessage:
     Allows tracking Metadata.
     """
 
-    def __init__(self, msg: OutboundMessage):
+    def __init__(self, msg: OutboundMessage, timestamp: float = None):
         """
         Create Wrapper for queued message.
 
         Automatically sets timestamp on create.
         """
         self.msg = msg
-        self.timestamp = time.time()
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.message_id = uuid.uuid4().hex
+        # the persistent queue keys of the message, by recipient key
+        self.persist_keys = {}
+        payload = msg.enc_payload or msg.payload or b""
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        self.size = len(payload)
 
     def older_than(self, compare_timestamp: float) -> bool:
         """
@@ -43,17 +60,68 @@ class DeliveryQueue:
     DeliveryQueue class.
 
     Manages undelivered messages.
+
+    Messages are indexed in FIFO order for each recipient key and in the order
+    they were added, so that taking a message for a key and expiring the oldest
+    messages do not depend on the number of queued messages. When a persistent
+    queue is provided, each encoded message is stored once per recipient key
+    until it has been taken or has expired, and restored by `open`. Only the
+    encoded payload is stored, so messages which have not been encoded are
+    held in memory only.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        persistent_queue: BasePersistentQueue = None,
+        *,
+        ttl_seconds: float = None,
+        max_bytes_per_key: int = None,
+    ) -> None:
         """
         Initialize an instance of DeliveryQueue.
 
-        This uses an in memory structure to queue messages.
-        """
+        Args:
+            persistent_queue: An optional persistent queue to store messages in
+            ttl_seconds: The number of seconds to keep a message, one week by
+                default
+            max_bytes_per_key: An optional limit on the total payload size of
+                the messages for a recipient key, beyond which the oldest
+                messages are dropped
 
+        """
+        self.persistent_queue = persistent_queue
         self.queue_by_key = {}
-        self.ttl_seconds = 604800  # one week
+        self.queue_by_time = OrderedDict()
+        self.bytes_by_key = {}
+        self.max_bytes_per_key = max_bytes_per_key
+        self.ttl_seconds = ttl_seconds or DEFAULT_TTL_SECONDS
+
+    async def open(self):
+        """Restore the messages held in the persistent queue, if any."""
+        if not self.persistent_queue:
+            return
+        restored = {}
+        for persist_key, entry in await self.persistent_queue.open():
+            wrapped_msg = restored.get(entry["id"])
+            if not wrapped_msg:
+                msg = OutboundMessage(
+                    payload=None,
+                    enc_payload=decode_payload(entry["enc_payload"]),
+                    reply_to_verkey=entry["key"],
+                )
+                wrapped_msg = QueuedMessage(msg, entry["timestamp"])
+                wrapped_msg.message_id = entry["id"]
+                restored[entry["id"]] = wrapped_msg
+            wrapped_msg.persist_keys[entry["key"]] = persist_key
+            self._add_for_key(entry["key"], wrapped_msg)
+        if restored:
+            LOGGER.info("Restored %d undelivered messages", len(restored))
+        self.expire_messages()
+
+    async def close(self):
+        """Write pending changes to the persistent queue and close it."""
+        if self.persistent_queue:
+            await self.persistent_queue.close()
 
     def expire_messages(self, ttl=None):
         """
@@ -65,30 +133,49 @@ class DeliveryQueue:
 
         ttl_seconds = ttl or self.ttl_seconds
         horizon = time.time() - ttl_seconds
-        for key in self.queue_by_key.keys():
-            self.queue_by_key[key] = [
-                wm for wm in self.queue_by_key[key] if not wm.older_than(horizon)
-            ]
+        while self.queue_by_time:
+            wrapped_msg = next(iter(self.queue_by_time.values()))
+            if not wrapped_msg.older_than(horizon):
+                break
+            for key in list(wrapped_msg.persist_keys):
+                self._remove_for_key(key, wrapped_msg)
 
     def add_message(self, msg: OutboundMessage):
         """
         Add an OutboundMessage to delivery queue.
 
-        The message is added once per recipient key
+        The message is added once per recipient key, and persisted if it has
+        been encoded.
 
         Args:
             msg: The OutboundMessage to add
+
         """
         keys = set()
         if msg.target:
             keys.update(msg.target.recipient_keys)
         if msg.reply_to_verkey:
             keys.add(msg.reply_to_verkey)
+        if not keys or id(msg) in self.queue_by_time:
+            return
+        self.expire_messages()
         wrapped_msg = QueuedMessage(msg)
+        persist = self.persistent_queue and msg.enc_payload
+        entry = None
         for recipient_key in keys:
-            if recipient_key not in self.queue_by_key:
-                self.queue_by_key[recipient_key] = []
-            self.queue_by_key[recipient_key].append(wrapped_msg)
+            self._add_for_key(recipient_key, wrapped_msg)
+            self._apply_quota(recipient_key)
+            if persist and recipient_key in wrapped_msg.persist_keys:
+                if not entry:
+                    # never persist the plaintext payload
+                    entry = {
+                        "id": wrapped_msg.message_id,
+                        "timestamp": wrapped_msg.timestamp,
+                        "enc_payload": encode_payload(msg.enc_payload),
+                    }
+                wrapped_msg.persist_keys[recipient_key] = self.persistent_queue.add(
+                    dict(entry, key=recipient_key)
+                )
 
     def has_message_for_key(self, key: str):
         """
@@ -97,9 +184,7 @@ class DeliveryQueue:
         Args:
             key: The key to use for lookup
         """
-        if key in self.queue_by_key and len(self.queue_by_key[key]):
-            return True
-        return False
+        return key in self.queue_by_key
 
     def message_count_for_key(self, key: str):
         """
@@ -121,18 +206,33 @@ class DeliveryQueue:
             key: The key to use for lookup
         """
         if key in self.queue_by_key:
-            return self.queue_by_key[key].pop(0).msg
+            wrapped_msg = next(iter(self.queue_by_key[key].values()))
+            self._remove_for_key(key, wrapped_msg)
+            return wrapped_msg.msg
 
     def inspect_all_messages_for_key(self, key: str):
         """
         Return all messages for key.
 
+        Messages are found in order as they are requested, rather than copying
+        the queue, so taking the first few messages does not depend on the
+        number of queued messages. Each message may be removed before the
+        next one is requested.
+
         Args:
             key: The key to use for lookup
+
         """
-        if key in self.queue_by_key:
-            for wrapped_msg in self.queue_by_key[key]:
-                yield wrapped_msg.msg
+        # the number of messages yielded and left in the queue
+        kept = 0
+        while key in self.queue_by_key:
+            queue = self.queue_by_key[key]
+            if kept >= len(queue):
+                break
+            wrapped_msg = next(itertools.islice(queue.values(), kept, None))
+            yield wrapped_msg.msg
+            if key in self.queue_by_key and id(wrapped_msg.msg) in self.queue_by_key[key]:
+                kept += 1
 
     def remove_message_for_key(self, key: str, msg: OutboundMessage):
         """
@@ -143,9 +243,39 @@ class DeliveryQueue:
             msg: The message to remove from the queue
         """
         if key in self.queue_by_key:
-            for wrapped_msg in self.queue_by_key[key]:
-                if wrapped_msg.msg == msg:
-                    self.queue_by_key[key].remove(wrapped_msg)
-                    if not self.queue_by_key[key]:
-                        del self.queue_by_key[key]
-                    break  # exit processing loop
+            wrapped_msg = self.queue_by_key[key].get(id(msg))
+            if wrapped_msg:
+                self._remove_for_key(key, wrapped_msg)
+
+    def _add_for_key(self, key: str, wrapped_msg: QueuedMessage):
+        """Index a message for a recipient key."""
+        if key not in self.queue_by_key:
+            self.queue_by_key[key] = OrderedDict()
+            self.bytes_by_key[key] = 0
+        self.queue_by_key[key][id(wrapped_msg.msg)] = wrapped_msg
+        self.bytes_by_key[key] += wrapped_msg.size
+        wrapped_msg.persist_keys.setdefault(key, None)
+        self.queue_by_time[id(wrapped_msg.msg)] = wrapped_msg
+
+    def _remove_for_key(self, key: str, wrapped_msg: QueuedMessage):
+        """Remove a message for a recipient key, and discard it if no key remains."""
+        del self.queue_by_key[key][id(wrapped_msg.msg)]
+        self.bytes_by_key[key] -= wrapped_msg.size
+        if not self.queue_by_key[key]:
+            del self.queue_by_key[key]
+            del self.bytes_by_key[key]
+        persist_key = wrapped_msg.persist_keys.pop(key)
+        if persist_key:
+            self.persistent_queue.ack(persist_key)
+        if not wrapped_msg.persist_keys:
+            del self.queue_by_time[id(wrapped_msg.msg)]
+
+    def _apply_quota(self, key: str):
+        """Drop the oldest messages for a recipient key while it is over quota."""
+        while (
+            self.max_bytes_per_key
+            and key in self.queue_by_key
+            and self.bytes_by_key[key] > self.max_bytes_per_key
+        ):
+            LOGGER.warning("Dropping undelivered message over quota for %s", key)
+            self._remove_for_key(key, next(iter(self.queue_by_key[key].values())))
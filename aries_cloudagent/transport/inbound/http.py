@@ -50,7 +50,9 @@ class HttpTransport(BaseInboundTransport):
         app = await self.make_application()
         runner = web.AppRunner(app)
         await runner.setup()
-        self.site = web.TCPSite(runner, host=self.host, port=self.port)
+        self.site = web.TCPSite(
+            runner, host=self.host, port=self.port, reuse_port=self.reuse_port or None
+        )
         try:
             await self.site.start()
         except OSError:
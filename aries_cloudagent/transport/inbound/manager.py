@@ -11,6 +11,7 @@ from ...utils.classloader import ClassLoader, ModuleLoadError, ClassNotFoundErro
 from ...utils.task_queue import CompletedTask, TaskQueue
 
 from ..outbound.message import OutboundMessage
+from ..queue.segment_log import SegmentLogQueue
 from ..wire_format import BaseWireFormat
 
 from .base import (
@@ -20,11 +21,15 @@ from .base import (
 )
 from .delivery_queue import DeliveryQueue
 from .message import InboundMessage
+from .receipt import MessageReceipt
 from .session import InboundSession
 
 LOGGER = logging.getLogger(__name__)
 MODULE_BASE_PATH = "aries_cloudagent.transport.inbound"
 
+DEFAULT_PICKUP_BATCH_SIZE = 100
+DEFAULT_PICKUP_BATCH_BYTES = 1048576
+
 
 class InboundTransportManager:
     """Inbound transport manager class."""
@@ -46,6 +51,8 @@ class InboundTransportManager:
         self.session_limit: asyncio.Semaphore = None
         self.task_queue = TaskQueue()
         self.undelivered_queue: DeliveryQueue = None
+        self.pickup_batch_size = DEFAULT_PICKUP_BATCH_SIZE
+        self.pickup_batch_bytes = DEFAULT_PICKUP_BATCH_BYTES
 
     async def setup(self):
         """Perform setup operations."""
@@ -63,8 +70,19 @@ class InboundTransportManager:
             )
 
         # Setup queue for undelivered messages
-        if self.context.settings.get("transport.enable_undelivered_queue"):
-            self.undelivered_queue = DeliveryQueue()
+        settings = self.context.settings
+        if settings.get("transport.enable_undelivered_queue"):
+            queue_dir = settings.get("transport.undelivered_queue_dir")
+            self.undelivered_queue = DeliveryQueue(
+                SegmentLogQueue(queue_dir) if queue_dir else None,
+                ttl_seconds=settings.get("transport.undelivered_queue_ttl"),
+                max_bytes_per_key=settings.get("transport.undelivered_queue_key_quota"),
+            )
+            await self.undelivered_queue.open()
+            if settings.get("transport.pickup_batch_size"):
+                self.pickup_batch_size = settings["transport.pickup_batch_size"]
+            if settings.get("transport.pickup_batch_bytes"):
+                self.pickup_batch_bytes = settings["transport.pickup_batch_bytes"]
 
         # self.session_limit = asyncio.Semaphore(50)
 
@@ -91,12 +109,12 @@ class InboundTransportManager:
                 f"Failed to load inbound transport {config.module}"
             ) from e
 
+        transport_args = {"max_message_size": self.max_message_size}
+        if self.context.settings.get("transport.inbound_reuse_port"):
+            transport_args["reuse_port"] = True
         return self.register_transport(
             imported_class(
-                config.host,
-                config.port,
-                self.create_session,
-                max_message_size=self.max_message_size,
+                config.host, config.port, self.create_session, **transport_args
             ),
             imported_class.__qualname__,
         )
@@ -140,6 +158,8 @@ class InboundTransportManager:
         await self.task_queue.complete(None if wait else 0)
         for transport in self.running_transports.values():
             await transport.stop()
+        if self.undelivered_queue:
+            await self.undelivered_queue.close()
 
     async def create_session(
         self,
@@ -148,6 +168,7 @@ class InboundTransportManager:
         accept_undelivered: bool = False,
         can_respond: bool = False,
         client_info: dict = None,
+        pipeline_responses: bool = False,
         wire_format: BaseWireFormat = None,
     ):
         """
@@ -158,6 +179,8 @@ class InboundTransportManager:
             accept_undelivered: Flag for accepting undelivered messages
             can_respond: Flag indicating that the transport can send responses
             client_info: An optional dict describing the client
+            pipeline_responses: Flag indicating that the transport can send
+                several responses without waiting for another inbound message
             wire_format: Override the wire format for this session
         """
         if self.session_limit:
@@ -171,6 +194,7 @@ class InboundTransportManager:
             client_info=client_info,
             close_handler=self.closed_session,
             inbound_handler=self.receive_inbound,
+            pipeline_responses=pipeline_responses,
             session_id=str(uuid.uuid4()),
             transport_type=transport_type,
             wire_format=wire_format,
@@ -197,6 +221,8 @@ class InboundTransportManager:
         if session.response_buffer:
             if self.return_inbound:
                 self.return_inbound(session.context, session.response_buffer)
+                for response in session.response_queue:
+                    self.return_inbound(session.context, response)
             else:
                 LOGGER.warning("Message failed return delivery, will not be delivered")
 
@@ -225,13 +251,36 @@ class InboundTransportManager:
         Add an undelivered message to the undelivered queue.
 
         At this point the message could not be associated with an inbound
-        session and could not be delivered via an outbound transport.
+        session and could not be delivered via an outbound transport. Only
+        encoded messages are persisted, so a message is encoded first when
+        the queue is persistent.
         """
         if self.undelivered_queue:
-            self.undelivered_queue.add_message(outbound)
+            if self.undelivered_queue.persistent_queue and not outbound.enc_payload:
+                self.task_queue.run(self.encode_undelivered(outbound))
+            else:
+                self.undelivered_queue.add_message(outbound)
             return True
         return False
 
+    async def encode_undelivered(self, outbound: OutboundMessage):
+        """Encode an undelivered message before adding it to the queue."""
+        if outbound.target:
+            recipient_keys = outbound.target.recipient_keys
+            sender_key = outbound.target.sender_key
+        else:
+            recipient_keys = [outbound.reply_to_verkey]
+            sender_key = outbound.reply_from_verkey
+        try:
+            wire_format: BaseWireFormat = await self.context.inject(BaseWireFormat)
+            outbound.enc_payload = await wire_format.encode_message(
+                self.context, outbound.payload, recipient_keys, None, sender_key
+            )
+        except Exception:
+            # the message is still held in memory
+            LOGGER.exception("Error encoding undelivered message")
+        self.undelivered_queue.add_message(outbound)
+
     def process_undelivered(self, session: InboundSession):
         """
         Interact with undelivered queue to find applicable messages.
@@ -240,14 +289,32 @@ class InboundTransportManager:
             session: The inbound session
         """
         if session and session.can_respond and self.undelivered_queue:
+            # sessions returning all replies may take several messages at once
+            if (
+                session.pipeline_responses
+                and session.reply_mode == MessageReceipt.REPLY_MODE_ALL
+            ):
+                max_count = self.pickup_batch_size
+            else:
+                max_count = 1
+            count = 0
+            size = 0
             for key in session.reply_verkeys:
                 for (
                     undelivered_message
                 ) in self.undelivered_queue.inspect_all_messages_for_key(key):
-                    if session.accept_response(undelivered_message):
+                    if count >= max_count or (count and size >= self.pickup_batch_bytes):
+                        return
+                    if session.queue_response(undelivered_message):
                         LOGGER.debug(
                             "Sending previously undelivered message via inbound session"
                         )
                         self.undelivered_queue.remove_message_for_key(
                             key, undelivered_message
                         )
+                        count += 1
+                        size += len(
+                            undelivered_message.enc_payload
+                            or undelivered_message.payload
+                            or ""
+                        )
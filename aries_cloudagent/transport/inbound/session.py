@@ -2,6 +2,7 @@
 
 import asyncio
 import logging
+from collections import OrderedDict, deque
 from typing import Callable, Sequence, Union
 
 from ...config.injection_context import InjectionContext
@@ -43,6 +44,7 @@ class InboundSession:
         can_respond: bool = False,
         client_info: dict = None,
         close_handler: Callable = None,
+        pipeline_responses: bool = False,
         reply_mode: str = None,
         reply_thread_ids: Sequence[str] = None,
         reply_verkeys: Sequence[str] = None,
@@ -57,8 +59,10 @@ class InboundSession:
         self.accept_undelivered = accept_undelivered
         self.client_info = client_info
         self.close_handler = close_handler
+        self.pipeline_responses = pipeline_responses
         self.response_buffer: OutboundMessage = None
         self.response_event = asyncio.Event()
+        self.response_queue = deque()
         self.transport_type = transport_type
 
         self._can_respond = can_respond
@@ -239,6 +243,22 @@ class InboundSession:
         self.set_response(message)
         return AcceptResult(True)
 
+    def queue_response(self, message: OutboundMessage) -> AcceptResult:
+        """
+        Try to queue an outbound message behind the buffered response.
+
+        Sessions which cannot pipeline responses only accept the message when
+        no response is buffered.
+
+        Returns: a tuple of (message queued, retry later)
+        """
+        if not self.pipeline_responses or not self.response_buffer:
+            return self.accept_response(message)
+        if not self.select_outbound(message):
+            return AcceptResult(False, False)
+        self.response_queue.append(message)
+        return AcceptResult(True)
+
     def set_response(self, message: OutboundMessage):
         """Set the contents of the response message buffer."""
         self.response_buffer = message
@@ -246,9 +266,18 @@ class InboundSession:
 
     def clear_response(self):
         """Handle when the buffered response message has been delivered."""
-        self.response_buffer = None
+        self.response_buffer = (
+            self.response_queue.popleft() if self.response_queue else None
+        )
         self.response_event.set()
 
+    def drop_response(self, message: OutboundMessage):
+        """Remove a buffered or queued response which cannot be delivered."""
+        if message is self.response_buffer:
+            self.clear_response()
+        else:
+            self.response_queue.remove(message)
+
     async def wait_response(self) -> Union[str, bytes]:
         """Wait for a response to be buffered and pack it."""
         while True:
@@ -267,6 +296,75 @@ class InboundSession:
             self.response_event.clear()
             await self.response_event.wait()
 
+    async def encode_outbound_batch(
+        self, messages: Sequence[OutboundMessage]
+    ) -> Sequence[Union[str, bytes]]:
+        """
+        Apply wire formatting to outbound messages.
+
+        Messages for the same reply keys are encoded together.
+
+        Returns:
+            The encoded messages in order, with None for a message which could
+            not be encoded
+
+        """
+        encoded = [message.enc_payload for message in messages]
+        batches = OrderedDict()
+        for idx, message in enumerate(messages):
+            if encoded[idx]:
+                continue
+            if not message.payload or not message.reply_to_verkey:
+                LOGGER.warning("Error encoding direct response: missing payload or key")
+                continue
+            batches.setdefault(
+                (message.reply_to_verkey, message.reply_from_verkey), []
+            ).append(idx)
+        for (reply_to_verkey, reply_from_verkey), batch in batches.items():
+            try:
+                results = await self.wire_format.encode_messages(
+                    self.context,
+                    [messages[idx].payload for idx in batch],
+                    [reply_to_verkey],
+                    None,
+                    reply_from_verkey,
+                )
+            except WireFormatError as e:
+                LOGGER.warning("Error encoding direct responses: %s", str(e))
+                continue
+            for idx, result in zip(batch, results):
+                encoded[idx] = result
+        return encoded
+
+    async def wait_response_batch(self) -> Sequence[Union[str, bytes]]:
+        """
+        Wait for responses to be buffered and pack them.
+
+        The buffered response and any responses queued behind it are packed
+        together. Each response should be cleared once it has been delivered.
+
+        Returns:
+            The packed responses in order, or an empty list if the session was
+            closed
+
+        """
+        while True:
+            if self._closed:
+                return []
+            if self.response_buffer:
+                pending = [self.response_buffer, *self.response_queue]
+                encoded = await self.encode_outbound_batch(pending)
+                responses = []
+                for message, response in zip(pending, encoded):
+                    if response:
+                        responses.append(response)
+                    else:
+                        self.drop_response(message)
+                if responses:
+                    return responses
+            self.response_event.clear()
+            await self.response_event.wait()
+
     async def __aenter__(self):
         """Async context manager entry."""
         return self
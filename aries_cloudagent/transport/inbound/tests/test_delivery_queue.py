@@ -1,4 +1,6 @@
 import asyncio
+import os
+from tempfile import TemporaryDirectory
 from unittest import mock, TestCase
 
 from asynctest import TestCase as AsyncTestCase
@@ -6,6 +8,7 @@ from asynctest import mock as async_mock
 
 from ....connections.models.connection_target import ConnectionTarget
 from ....transport.outbound.message import OutboundMessage
+from ....transport.queue.segment_log import SegmentLogQueue
 
 from ..delivery_queue import DeliveryQueue
 
@@ -64,3 +67,120 @@ class TestDeliveryQueue(AsyncTestCase):
     async def test_count_zero_with_no_items(self):
         queue = DeliveryQueue()
         assert queue.message_count_for_key("aaa") == 0
+
+    async def test_fifo_per_key(self):
+        queue = DeliveryQueue()
+
+        msgs = [
+            OutboundMessage(
+                payload=str(n), target=ConnectionTarget(recipient_keys=["aaa", "bbb"])
+            )
+            for n in range(3)
+        ]
+        for msg in msgs:
+            queue.add_message(msg)
+        assert queue.get_one_message_for_key("aaa") == msgs[0]
+        queue.remove_message_for_key("aaa", msgs[2])
+        assert list(queue.inspect_all_messages_for_key("aaa")) == [msgs[1]]
+        assert list(queue.inspect_all_messages_for_key("bbb")) == msgs
+        assert queue.bytes_by_key == {"aaa": 1, "bbb": 3}
+        assert len(queue.queue_by_time) == 3
+
+        for msg in queue.inspect_all_messages_for_key("bbb"):
+            queue.remove_message_for_key("bbb", msg)
+        assert queue.get_one_message_for_key("bbb") is None
+        assert list(queue.queue_by_time) == [id(msgs[1])]
+
+    async def test_inspect_and_remove(self):
+        queue = DeliveryQueue()
+        msgs = [
+            OutboundMessage(payload=str(n), reply_to_verkey="aaa") for n in range(6)
+        ]
+        for msg in msgs:
+            queue.add_message(msg)
+
+        inspected = []
+        for msg in queue.inspect_all_messages_for_key("aaa"):
+            inspected.append(msg)
+            # keep every third message
+            if int(msg.payload) % 3:
+                queue.remove_message_for_key("aaa", msg)
+        assert inspected == msgs
+        assert list(queue.inspect_all_messages_for_key("aaa")) == [msgs[0], msgs[3]]
+
+        pending = queue.inspect_all_messages_for_key("aaa")
+        assert next(pending) is msgs[0]
+        queue.remove_message_for_key("aaa", msgs[0])
+        queue.remove_message_for_key("aaa", msgs[3])
+        assert list(pending) == []
+
+    async def test_message_ttl_index(self):
+        queue = DeliveryQueue(ttl_seconds=60)
+
+        t = ConnectionTarget(recipient_keys=["aaa"])
+        old_msg = OutboundMessage(payload="x", target=t)
+        queue.add_message(old_msg)
+        next(iter(queue.queue_by_time.values())).timestamp -= 120
+        msg = OutboundMessage(payload="y", target=t)
+        queue.add_message(msg)
+        assert list(queue.inspect_all_messages_for_key("aaa")) == [msg]
+        queue.expire_messages()
+        assert queue.message_count_for_key("aaa") == 1
+
+    async def test_key_quota(self):
+        queue = DeliveryQueue(max_bytes_per_key=10)
+
+        msgs = [
+            OutboundMessage(
+                payload="x" * 4, target=ConnectionTarget(recipient_keys=["aaa"])
+            )
+            for n in range(3)
+        ]
+        for msg in msgs:
+            queue.add_message(msg)
+        assert list(queue.inspect_all_messages_for_key("aaa")) == msgs[1:]
+        assert queue.bytes_by_key["aaa"] == 8
+
+        queue.add_message(
+            OutboundMessage(
+                payload="x" * 11, target=ConnectionTarget(recipient_keys=["aaa"])
+            )
+        )
+        assert not queue.has_message_for_key("aaa")
+        assert not queue.queue_by_time
+
+    async def test_persistent(self):
+        with TemporaryDirectory() as queue_dir:
+            queue = DeliveryQueue(SegmentLogQueue(queue_dir))
+            await queue.open()
+            msgs = [
+                OutboundMessage(
+                    payload="secret",
+                    enc_payload=b"packed%d" % n,
+                    reply_to_verkey="bbb",
+                    target=ConnectionTarget(
+                        endpoint="http://localhost", recipient_keys=["aaa"]
+                    ),
+                )
+                for n in range(3)
+            ]
+            for msg in msgs:
+                queue.add_message(msg)
+            queue.add_message(OutboundMessage(payload="secret", reply_to_verkey="aaa"))
+            queue.get_one_message_for_key("aaa")
+            queue.remove_message_for_key("bbb", msgs[1])
+            await queue.close()
+
+            for name in os.listdir(queue_dir):
+                with open(os.path.join(queue_dir, name), "rb") as segment:
+                    assert b"secret" not in segment.read()
+
+            queue = DeliveryQueue(SegmentLogQueue(queue_dir))
+            await queue.open()
+            restored = list(queue.inspect_all_messages_for_key("aaa"))
+            assert [msg.enc_payload for msg in restored] == [b"packed1", b"packed2"]
+            assert restored[0].payload is None
+            for_bbb = list(queue.inspect_all_messages_for_key("bbb"))
+            assert [msg.enc_payload for msg in for_bbb] == [b"packed0", b"packed2"]
+            assert for_bbb[1] is restored[1]
+            await queue.close()
@@ -1,5 +1,7 @@
 import asyncio
 
+from tempfile import TemporaryDirectory
+
 from asynctest import TestCase as AsyncTestCase, mock as async_mock
 
 from ....config.injection_context import InjectionContext
@@ -9,6 +11,7 @@ from ...outbound.message import OutboundMessage
 from ...wire_format import BaseWireFormat
 from ..base import InboundTransportConfiguration, InboundTransportRegistrationError
 from ..manager import InboundTransportManager
+from ..receipt import MessageReceipt
 
 
 class TestInboundTransportManager(AsyncTestCase):
@@ -57,6 +60,61 @@ class TestInboundTransportManager(AsyncTestCase):
 
         assert mgr.undelivered_queue
 
+    async def test_persistent_undelivered(self):
+        with TemporaryDirectory() as queue_dir:
+            context = InjectionContext(enforce_typing=False)
+            context.update_settings(
+                {
+                    "transport.enable_undelivered_queue": True,
+                    "transport.undelivered_queue_dir": queue_dir,
+                }
+            )
+            wire_format = async_mock.MagicMock(
+                encode_message=async_mock.CoroutineMock(return_value=b"packed")
+            )
+            context.injector.bind_instance(BaseWireFormat, wire_format)
+            mgr = InboundTransportManager(context, None)
+            await mgr.setup()
+            test_outbound = OutboundMessage(payload="{}", reply_to_verkey="verkey")
+            assert mgr.return_undelivered(test_outbound)
+            await mgr.stop()
+            wire_format.encode_message.assert_awaited_once_with(
+                context, "{}", ["verkey"], None, None
+            )
+
+            mgr = InboundTransportManager(context, None)
+            await mgr.setup()
+            restored = mgr.undelivered_queue.get_one_message_for_key("verkey")
+            assert restored.enc_payload == b"packed"
+            assert restored.payload is None
+            await mgr.stop()
+
+    async def test_persistent_undelivered_encode_error(self):
+        with TemporaryDirectory() as queue_dir:
+            context = InjectionContext(enforce_typing=False)
+            context.update_settings(
+                {
+                    "transport.enable_undelivered_queue": True,
+                    "transport.undelivered_queue_dir": queue_dir,
+                }
+            )
+            wire_format = async_mock.MagicMock(
+                encode_message=async_mock.CoroutineMock(side_effect=ValueError())
+            )
+            context.injector.bind_instance(BaseWireFormat, wire_format)
+            mgr = InboundTransportManager(context, None)
+            await mgr.setup()
+            test_outbound = OutboundMessage(payload="{}", reply_to_verkey="verkey")
+            assert mgr.return_undelivered(test_outbound)
+            await mgr.task_queue.complete()
+            assert mgr.undelivered_queue.message_count_for_key("verkey") == 1
+            await mgr.stop()
+
+            mgr = InboundTransportManager(context, None)
+            await mgr.setup()
+            assert not mgr.undelivered_queue.has_message_for_key("verkey")
+            await mgr.stop()
+
     async def test_start_stop(self):
         transport = async_mock.MagicMock()
         transport.start = async_mock.CoroutineMock()
@@ -193,6 +251,58 @@ class TestInboundTransportManager(AsyncTestCase):
             mock_accept.assert_called_once_with(test_outbound)
         assert not mgr.undelivered_queue.has_message_for_key(test_verkey)
 
+    async def test_process_undelivered_batch(self):
+        context = InjectionContext()
+        context.update_settings(
+            {
+                "transport.enable_undelivered_queue": True,
+                "transport.pickup_batch_size": 3,
+                "transport.pickup_batch_bytes": 1024,
+            }
+        )
+        test_verkey = "test-verkey"
+        mgr = InboundTransportManager(context, None)
+        await mgr.setup()
+        test_outbound = [
+            OutboundMessage(payload=str(n), reply_to_verkey=test_verkey)
+            for n in range(4)
+        ]
+        for outbound in test_outbound:
+            mgr.return_undelivered(outbound)
+
+        session = await mgr.create_session(
+            "ws",
+            can_respond=True,
+            pipeline_responses=True,
+            wire_format=async_mock.MagicMock(),
+        )
+        session.add_reply_verkeys(test_verkey)
+        session.reply_mode = MessageReceipt.REPLY_MODE_ALL
+        mgr.process_undelivered(session)
+        assert session.response_buffer is test_outbound[0]
+        assert list(session.response_queue) == test_outbound[1:3]
+        assert mgr.undelivered_queue.message_count_for_key(test_verkey) == 1
+
+        # returned undelivered when the session closes before sending
+        mgr.return_inbound = async_mock.MagicMock()
+        session.close()
+        assert mgr.return_inbound.call_count == 3
+
+        mgr.pickup_batch_bytes = 1
+        for outbound in test_outbound[:3]:
+            mgr.return_undelivered(outbound)
+        session = await mgr.create_session(
+            "ws",
+            can_respond=True,
+            pipeline_responses=True,
+            wire_format=async_mock.MagicMock(),
+        )
+        session.add_reply_verkeys(test_verkey)
+        session.reply_mode = MessageReceipt.REPLY_MODE_ALL
+        mgr.process_undelivered(session)
+        assert session.response_buffer is test_outbound[3]
+        assert not session.response_queue
+
     async def test_return_undelivered_false(self):
         context = InjectionContext()
         context.update_settings({"transport.enable_undelivered_queue": False})
@@ -292,6 +292,78 @@ class TestInboundSession(TestCase):
             accepted = sess.accept_response(test_msg)
             assert accepted
 
+    async def test_queue_response(self):
+        test_ctx = InjectionContext()
+        sess = InboundSession(
+            context=test_ctx,
+            inbound_handler=None,
+            pipeline_responses=True,
+            session_id=None,
+            wire_format=None,
+        )
+        test_msgs = [OutboundMessage(payload=str(n)) for n in range(3)]
+
+        with async_mock.patch.object(sess, "select_outbound") as selector:
+            selector.return_value = False
+            assert not sess.queue_response(test_msgs[0])
+
+            selector.return_value = True
+            for test_msg in test_msgs:
+                assert sess.queue_response(test_msg)
+            assert sess.response_buffer is test_msgs[0]
+            assert list(sess.response_queue) == test_msgs[1:]
+
+            sess.drop_response(test_msgs[2])
+            sess.clear_response()
+            assert sess.response_buffer is test_msgs[1]
+            sess.drop_response(test_msgs[1])
+            assert not sess.response_buffered
+
+            sess.pipeline_responses = False
+            assert sess.queue_response(test_msgs[0])
+            accepted = sess.queue_response(test_msgs[1])
+            assert not accepted and accepted.retry
+
+    async def test_wait_response_batch(self):
+        test_ctx = InjectionContext()
+        test_wire_format = async_mock.MagicMock()
+        test_wire_format.encode_messages = async_mock.CoroutineMock(
+            side_effect=lambda ctx, payloads, *keys: [f"enc:{p}" for p in payloads]
+        )
+        sess = InboundSession(
+            context=test_ctx,
+            inbound_handler=None,
+            pipeline_responses=True,
+            session_id=None,
+            wire_format=test_wire_format,
+        )
+        test_msgs = [
+            OutboundMessage(payload="0", reply_to_verkey="to-verkey"),
+            OutboundMessage(payload="1", enc_payload="packed"),
+            OutboundMessage(payload=None, reply_to_verkey="to-verkey"),
+            OutboundMessage(payload="3", reply_to_verkey="to-verkey"),
+        ]
+        sess.set_response(test_msgs[0])
+        sess.response_queue.extend(test_msgs[1:])
+
+        result = await asyncio.wait_for(sess.wait_response_batch(), 0.1)
+        assert result == ["enc:0", "packed", "enc:3"]
+        test_wire_format.encode_messages.assert_awaited_once_with(
+            test_ctx, ["0", "3"], ["to-verkey"], None, None
+        )
+        for _ in result:
+            sess.clear_response()
+        assert not sess.response_buffered
+
+        test_wire_format.encode_messages.side_effect = WireFormatError()
+        sess.set_response(test_msgs[0])
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(sess.wait_response_batch(), 0.1)
+        assert not sess.response_buffered
+
+        sess.close()
+        assert await asyncio.wait_for(sess.wait_response_batch(), 0.1) == []
+
     async def test_context_mgr(self):
         test_ctx = InjectionContext()
         sess = InboundSession(
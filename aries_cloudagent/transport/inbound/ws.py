@@ -54,7 +54,9 @@ class WsTransport(BaseInboundTransport):
         app = await self.make_application()
         runner = web.AppRunner(app)
         await runner.setup()
-        self.site = web.TCPSite(runner, host=self.host, port=self.port)
+        self.site = web.TCPSite(
+            runner, host=self.host, port=self.port, reuse_port=self.reuse_port or None
+        )
         try:
             await self.site.start()
         except OSError:
@@ -88,12 +90,15 @@ class WsTransport(BaseInboundTransport):
         client_info = {"host": request.host, "remote": request.remote}
 
         session = await self.create_session(
-            accept_undelivered=True, can_respond=True, client_info=client_info
+            accept_undelivered=True,
+            can_respond=True,
+            client_info=client_info,
+            pipeline_responses=True,
         )
 
         async with session:
             inbound = loop.create_task(ws.receive())
-            outbound = loop.create_task(session.wait_response())
+            outbound = loop.create_task(session.wait_response_batch())
 
             while not ws.closed:
                 await asyncio.wait(
@@ -117,14 +122,17 @@ class WsTransport(BaseInboundTransport):
                         inbound = loop.create_task(ws.receive())
 
                 if outbound.done() and not ws.closed:
-                    # response would be None if session was closed
-                    response = outbound.result()
-                    if isinstance(response, bytes):
-                        await ws.send_bytes(response)
-                    else:
-                        await ws.send_str(response)
-                    session.clear_response()
-                    outbound = loop.create_task(session.wait_response())
+                    # responses would be empty if session was closed, queued
+                    # responses are sent back to back
+                    for response in outbound.result():
+                        if ws.closed:
+                            break
+                        if isinstance(response, bytes):
+                            await ws.send_bytes(response)
+                        else:
+                            await ws.send_str(response)
+                        session.clear_response()
+                    outbound = loop.create_task(session.wait_response_batch())
 
         if inbound and not inbound.done():
             inbound.cancel()
@@ -2,7 +2,7 @@
 
 import asyncio
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Awaitable, Callable, Mapping, Union
 
 from ...config.injection_context import InjectionContext
 from ...utils.stats import Collector
@@ -17,7 +17,10 @@ class BaseOutboundTransport(ABC):
     def __init__(self, wire_format: BaseWireFormat = None) -> None:
         """Initialize a `BaseOutboundTransport` instance."""
         self._collector = None
+        self._settings = None
         self._wire_format = wire_format
+        # creates an inbound session for messages received on a connection
+        self.create_inbound_session: Callable[..., Awaitable] = None
 
     @property
     def collector(self) -> Collector:
@@ -29,6 +32,16 @@ class BaseOutboundTransport(ABC):
         """Assign a new stats collector instance."""
         self._collector = coll
 
+    @property
+    def settings(self) -> Mapping:
+        """Accessor for the agent settings used to configure the transport."""
+        return self._settings or {}
+
+    @settings.setter
+    def settings(self, settings: Mapping):
+        """Assign the agent settings used to configure the transport."""
+        self._settings = settings
+
     async def __aenter__(self):
         """Async context manager enter."""
         await self.start()
@@ -0,0 +1,134 @@
+"""Outbound endpoint health tracking."""
+
+import random
+import time
+
+DEFAULT_RETRY_BASE_DELAY = 5.0
+DEFAULT_RETRY_MAX_DELAY = 300.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 60.0
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+    max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+) -> float:
+    """
+    Calculate the delay before retrying a failed delivery.
+
+    The delay grows exponentially with the number of attempts, up to
+    `max_delay`, and the second half of it is randomized so that messages
+    which failed together are not retried together.
+
+    Args:
+        attempt: The number of failed attempts, starting at 1
+        base_delay: The delay after the first failed attempt
+        max_delay: The maximum delay
+
+    Returns:
+        The delay in seconds
+
+    """
+    delay = min(max_delay, base_delay * (2 ** max(attempt - 1, 0)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class EndpointCircuit:
+    """
+    Circuit breaker tracking the health of an outbound endpoint.
+
+    The circuit opens after `failure_threshold` consecutive delivery failures.
+    While it is open no messages are sent to the endpoint. Once
+    `reset_timeout` seconds have passed a single probe message is allowed: the
+    circuit closes if it is delivered, and opens again if not. Results of
+    messages sent before the circuit opened do not change an open circuit.
+    """
+
+    STATE_CLOSED = "closed"
+    STATE_OPEN = "open"
+    STATE_HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ):
+        """
+        Initialize an `EndpointCircuit` instance.
+
+        Args:
+            failure_threshold: The number of consecutive failures which open
+                the circuit
+            reset_timeout: The number of seconds before an open circuit allows
+                a probe
+
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.probing = False
+        self.retry_at: float = None
+        self.state = self.STATE_CLOSED
+
+    def allow(self, now: float = None) -> bool:
+        """
+        Check whether a message may be sent to the endpoint.
+
+        An open circuit whose reset timeout has passed moves to the half-open
+        state, and allows the caller to send a probe.
+
+        Args:
+            now: The current timer value
+
+        Returns:
+            True if a message may be sent
+
+        """
+        if self.state == self.STATE_CLOSED:
+            return True
+        if self.probing:
+            return False
+        if self.state == self.STATE_OPEN:
+            if (time.perf_counter() if now is None else now) < self.retry_at:
+                return False
+            self.state = self.STATE_HALF_OPEN
+        self.probing = True
+        return True
+
+    def record_success(self, probe: bool = False):
+        """
+        Record a successful delivery, closing the circuit after a probe.
+
+        Args:
+            probe: Whether the message was the probe allowed by the circuit
+
+        """
+        if self.state != self.STATE_CLOSED and not probe:
+            return
+        self.failures = 0
+        self.probing = False
+        self.retry_at = None
+        self.state = self.STATE_CLOSED
+
+    def record_failure(self, now: float = None, probe: bool = False):
+        """
+        Record a failed delivery.
+
+        Args:
+            now: The current timer value
+            probe: Whether the message was the probe allowed by the circuit
+
+        """
+        if self.state != self.STATE_CLOSED and not probe:
+            return
+        self.failures += 1
+        self.probing = False
+        if (
+            self.state == self.STATE_HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            self.state = self.STATE_OPEN
+            self.retry_at = (
+                time.perf_counter() if now is None else now
+            ) + self.reset_timeout
@@ -1,9 +1,9 @@
 """Http outbound transport."""
 
 import logging
-from typing import Union
+from typing import Mapping, Union
 
-from aiohttp import ClientSession, DummyCookieJar, TCPConnector
+from aiohttp import ClientSession, ClientTimeout, DummyCookieJar, TCPConnector
 
 from ...config.injection_context import InjectionContext
 
@@ -11,6 +11,47 @@ from ..stats import StatsTracer
 
 from .base import BaseOutboundTransport, OutboundTransportError
 
+DEFAULT_LIMIT = 200
+DEFAULT_LIMIT_PER_HOST = 50
+DEFAULT_KEEPALIVE_TIMEOUT = 15.0
+DEFAULT_DNS_CACHE_TTL = 10
+DEFAULT_TOTAL_TIMEOUT = 300.0
+
+
+def get_client_options(settings: Mapping) -> dict:
+    """
+    Extract the outbound HTTP client options from the agent settings.
+
+    Args:
+        settings: The agent settings
+
+    Returns:
+        A dict with the connection limits, the keep-alive timeout and the DNS
+        cache TTL, in seconds, and the connect and read timeouts in seconds or
+        None for no timeout
+
+    """
+
+    def option(name, default=None):
+        value = settings.get(f"transport.http_{name}")
+        return default if value is None else value
+
+    return {
+        "limit": option("limit", DEFAULT_LIMIT),
+        "limit_per_host": option("limit_per_host", DEFAULT_LIMIT_PER_HOST),
+        "keepalive_timeout": option("keepalive_timeout", DEFAULT_KEEPALIVE_TIMEOUT),
+        "dns_cache_ttl": option("dns_cache_ttl", DEFAULT_DNS_CACHE_TTL),
+        "connect_timeout": option("connect_timeout"),
+        "read_timeout": option("read_timeout"),
+    }
+
+
+def get_content_type(payload: Union[str, bytes]) -> str:
+    """Get the content type header value for an outbound message payload."""
+    if isinstance(payload, bytes):
+        return "application/ssi-agent-wire"
+    return "application/json"
+
 
 class HttpTransport(BaseOutboundTransport):
     """Http outbound transport class."""
@@ -26,8 +67,28 @@ class HttpTransport(BaseOutboundTransport):
 
     async def start(self):
         """Start the transport."""
+        options = get_client_options(self.settings)
         session_args = {}
-        self.connector = TCPConnector(limit=200, limit_per_host=50)
+        connector_args = {
+            "limit": options["limit"],
+            "limit_per_host": options["limit_per_host"],
+        }
+        if options["keepalive_timeout"]:
+            connector_args["keepalive_timeout"] = options["keepalive_timeout"]
+        else:
+            # close each connection after its request
+            connector_args["force_close"] = True
+        if options["dns_cache_ttl"]:
+            connector_args["ttl_dns_cache"] = options["dns_cache_ttl"]
+        else:
+            connector_args["use_dns_cache"] = False
+        self.connector = TCPConnector(**connector_args)
+        if options["connect_timeout"] or options["read_timeout"]:
+            session_args["timeout"] = ClientTimeout(
+                total=DEFAULT_TOTAL_TIMEOUT,
+                sock_connect=options["connect_timeout"],
+                sock_read=options["read_timeout"],
+            )
         if self.collector:
             session_args["trace_configs"] = [
                 StatsTracer(self.collector, "outbound-http:")
@@ -55,11 +116,7 @@ class HttpTransport(BaseOutboundTransport):
         """
         if not endpoint:
             raise OutboundTransportError("No endpoint provided")
-        headers = {}
-        if isinstance(payload, bytes):
-            headers["Content-Type"] = "application/ssi-agent-wire"
-        else:
-            headers["Content-Type"] = "application/json"
+        headers = {"Content-Type": get_content_type(payload)}
         async with self.client_session.post(
             endpoint, data=payload, headers=headers
         ) as response:
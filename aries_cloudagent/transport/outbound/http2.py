@@ -0,0 +1,78 @@
+"""Http/2 outbound transport."""
+
+import logging
+from typing import Union
+
+import httpx
+
+from ...config.injection_context import InjectionContext
+
+from .base import BaseOutboundTransport, OutboundTransportError
+from .http import DEFAULT_TOTAL_TIMEOUT, get_client_options, get_content_type
+
+
+class Http2Transport(BaseOutboundTransport):
+    """
+    Http/2 outbound transport class.
+
+    Messages to an endpoint are multiplexed as concurrent streams over a
+    single connection per host, falling back to HTTP/1.1 when the server does
+    not negotiate HTTP/2. Requires the `httpx[http2]` package.
+    """
+
+    schemes = ("http", "https")
+
+    def __init__(self) -> None:
+        """Initialize an `Http2Transport` instance."""
+        super(Http2Transport, self).__init__()
+        self.client: httpx.AsyncClient = None
+        self.logger = logging.getLogger(__name__)
+
+    async def start(self):
+        """Start the transport."""
+        options = get_client_options(self.settings)
+        # the per-host limit and DNS cache do not apply: each host is served
+        # by one multiplexed connection
+        limits = httpx.Limits(
+            max_connections=options["limit"],
+            max_keepalive_connections=options["limit"],
+            keepalive_expiry=options["keepalive_timeout"],
+        )
+        timeouts = {}
+        if options["connect_timeout"]:
+            timeouts["connect"] = options["connect_timeout"]
+        if options["read_timeout"]:
+            timeouts["read"] = options["read_timeout"]
+        timeout = httpx.Timeout(DEFAULT_TOTAL_TIMEOUT, **timeouts)
+        self.client = httpx.AsyncClient(http2=True, limits=limits, timeout=timeout)
+        return self
+
+    async def stop(self):
+        """Stop the transport."""
+        await self.client.aclose()
+        self.client = None
+
+    async def handle_message(
+        self, context: InjectionContext, payload: Union[str, bytes], endpoint: str
+    ):
+        """
+        Handle message from queue.
+
+        Args:
+            context: the context that produced the message
+            payload: message payload in string or byte format
+            endpoint: URI endpoint for delivery
+
+        """
+        if not endpoint:
+            raise OutboundTransportError("No endpoint provided")
+        headers = {"Content-Type": get_content_type(payload)}
+        if self.collector:
+            with self.collector.timer("outbound-http2:POST"):
+                response = await self.client.post(
+                    endpoint, content=payload, headers=headers
+                )
+        else:
+            response = await self.client.post(endpoint, content=payload, headers=headers)
+        if response.status_code < 200 or response.status_code > 299:
+            raise OutboundTransportError("Unexpected response status")
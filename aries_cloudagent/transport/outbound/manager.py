@@ -1,21 +1,24 @@
 """Outbound transport manager."""
 
 import asyncio
+import heapq
+import itertools
 import json
 import logging
-import time
 
-from typing import Callable, Type, Union
+from collections import deque
+from typing import Callable, Sequence, Type, Union
 from urllib.parse import urlparse
 
 from ...connections.models.connection_target import ConnectionTarget
 from ...config.injection_context import InjectionContext
 from ...utils.classloader import ClassLoader, ModuleLoadError, ClassNotFoundError
-from ...utils.stats import Collector
+from ...utils.stats import Collector, Histogram
 from ...utils.task_queue import CompletedTask, TaskQueue, task_exc_info
 
 from ...utils.tracing import trace_event, get_timer
 
+from ..queue.base import BasePersistentQueue, decode_payload, encode_payload
 from ..wire_format import BaseWireFormat
 
 from .base import (
@@ -23,11 +26,25 @@ from .base import (
     OutboundDeliveryError,
     OutboundTransportRegistrationError,
 )
+from .circuit import (
+    DEFAULT_FAILURE_THRESHOLD,
+    DEFAULT_RESET_TIMEOUT,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_MAX_DELAY,
+    EndpointCircuit,
+    backoff_delay,
+)
 from .message import OutboundMessage
 
 LOGGER = logging.getLogger(__name__)
 MODULE_BASE_PATH = "aries_cloudagent.transport.outbound"
 
+DEFAULT_ENCODE_BATCH_SIZE = 100
+DEPTH_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+DEPTH_TOP_ENDPOINTS = 20
+DEFAULT_MAX_ACTIVE = 200
+DEFAULT_MAX_ENDPOINT_ACTIVE = 50
+
 
 class QueuedOutboundMessage:
     """Class representing an outbound message pending delivery."""
@@ -47,11 +64,16 @@ class QueuedOutboundMessage:
         transport_id: str,
     ):
         """Initialize the queued outbound message."""
+        self.attempts = 0
         self.context = context
+        self.deliver_time: float = None
         self.endpoint = target and target.endpoint
         self.error: Exception = None
         self.message = message
         self.payload: Union[str, bytes] = None
+        self.persist_key: str = None
+        self.probe = False
+        self.queued_time: float = None
         self.retries = None
         self.retry_at: float = None
         self.state = self.STATE_NEW
@@ -60,13 +82,32 @@ class QueuedOutboundMessage:
         self.transport_id: str = transport_id
 
 
+class EndpointQueue:
+    """Class representing the messages ready for delivery to one endpoint."""
+
+    def __init__(self, endpoint: str):
+        """Initialize the endpoint queue."""
+        self.active = 0
+        self.depth_histogram = Histogram(DEPTH_BOUNDS)
+        self.endpoint = endpoint
+        self.messages = deque()
+        self.scheduled = False
+
+    def stat_name(self, stat: str) -> str:
+        """Get the name of a collector entry for this endpoint."""
+        return f"outbound-endpoint:{self.endpoint}:{stat}"
+
+
 class OutboundTransportManager:
     """Outbound transport manager class."""
 
     MAX_RETRY_COUNT = 4
 
     def __init__(
-        self, context: InjectionContext, handle_not_delivered: Callable = None
+        self,
+        context: InjectionContext,
+        handle_not_delivered: Callable = None,
+        create_inbound_session: Callable = None,
     ):
         """
         Initialize a `OutboundTransportManager` instance.
@@ -74,21 +115,58 @@ class OutboundTransportManager:
         Args:
             context: The application context
             handle_not_delivered: An optional handler for undelivered messages
+            create_inbound_session: An optional factory for inbound sessions,
+                for transports receiving messages on outbound connections
 
         """
+        self.collector: Collector = None
         self.context = context
+        self.create_inbound_session = create_inbound_session
+        self.depth_histogram = Histogram(DEPTH_BOUNDS)
+        self.endpoint_queues = {}
         self.loop = asyncio.get_event_loop()
         self.handle_not_delivered = handle_not_delivered
-        self.outbound_buffer = []
         self.outbound_event = asyncio.Event()
+        # messages by state, from enqueued to delivered
         self.outbound_new = []
+        self.outbound_encode = set()
+        # endpoint queues with messages ready for delivery, served in turn
+        self.outbound_ready = deque()
+        self.outbound_retry = []
+        self.outbound_deliver = set()
+        self.outbound_done = deque()
+        self.persistent_queue: BasePersistentQueue = None
         self.registered_schemes = {}
         self.registered_transports = {}
         self.running_transports = {}
-        self.task_queue = TaskQueue(max_active=200)
         self._process_task: asyncio.Task = None
-        if self.context.settings.get("transport.max_outbound_retry"):
-            self.MAX_RETRY_COUNT = self.context.settings["transport.max_outbound_retry"]
+        self._retry_seq = itertools.count()
+        settings = self.context.settings
+        self.max_active = settings.get("transport.max_outbound_active") or (
+            DEFAULT_MAX_ACTIVE
+        )
+        self.max_endpoint_active = settings.get("transport.max_endpoint_active") or (
+            DEFAULT_MAX_ENDPOINT_ACTIVE
+        )
+        self.task_queue = TaskQueue(max_active=self.max_active)
+        self.encode_batch_size = settings.get("transport.encode_batch_size") or (
+            DEFAULT_ENCODE_BATCH_SIZE
+        )
+        if settings.get("transport.max_outbound_retry"):
+            self.MAX_RETRY_COUNT = settings["transport.max_outbound_retry"]
+        self.retry_base_delay = settings.get(
+            "transport.retry_base_delay", DEFAULT_RETRY_BASE_DELAY
+        )
+        self.retry_max_delay = settings.get(
+            "transport.retry_max_delay", DEFAULT_RETRY_MAX_DELAY
+        )
+        self.circuit_failure_threshold = settings.get(
+            "transport.circuit_failure_threshold", DEFAULT_FAILURE_THRESHOLD
+        )
+        self.circuit_reset_timeout = settings.get(
+            "transport.circuit_reset_timeout", DEFAULT_RESET_TIMEOUT
+        )
+        self.endpoint_circuits = {}
 
     async def setup(self):
         """Perform setup operations."""
@@ -98,6 +176,24 @@ class OutboundTransportManager:
         for outbound_transport in outbound_transports:
             self.register(outbound_transport)
 
+        self.collector = await self.context.inject(Collector, required=False)
+        self.persistent_queue = await self.context.inject(
+            BasePersistentQueue, required=False
+        )
+        if self.persistent_queue:
+            for key, entry in await self.persistent_queue.open():
+                queued = self.restore_queued(entry)
+                if queued:
+                    queued.persist_key = key
+                    self.outbound_new.append(queued)
+                else:
+                    self.persistent_queue.ack(key)
+            if self.outbound_new:
+                LOGGER.info(
+                    "Restored %d outbound messages pending delivery",
+                    len(self.outbound_new),
+                )
+
     def register(self, module: str) -> str:
         """
         Register a new outbound transport by module path.
@@ -171,13 +267,21 @@ class OutboundTransportManager:
         """Start a registered transport."""
         transport = self.registered_transports[transport_id]()
         transport.collector = await self.context.inject(Collector, required=False)
+        transport.settings = self.context.settings
+        transport.create_inbound_session = self.create_inbound_session
         await transport.start()
         self.running_transports[transport_id] = transport
 
     async def start(self):
         """Start all transports and feed messages from the queue."""
-        for transport_id in self.registered_transports:
+        started = [
             self.task_queue.run(self.start_transport(transport_id))
+            for transport_id in self.registered_transports
+        ]
+        if self.outbound_new and started:
+            # deliver restored messages once their transports are running
+            await asyncio.wait(started)
+            self.process_queued()
 
     async def stop(self, wait: bool = True):
         """Stop all running transports."""
@@ -187,6 +291,8 @@ class OutboundTransportManager:
         for transport in self.running_transports.values():
             await transport.stop()
         self.running_transports = {}
+        if self.persistent_queue:
+            await self.persistent_queue.close()
 
     def get_registered_transport_for_scheme(self, scheme: str) -> str:
         """Find the registered transport ID for a given scheme."""
@@ -227,6 +333,16 @@ class OutboundTransportManager:
             )
         return transport_id
 
+    def get_circuit(self, endpoint: str) -> EndpointCircuit:
+        """Get the circuit breaker tracking the health of an endpoint."""
+        circuit = self.endpoint_circuits.get(endpoint)
+        if not circuit:
+            circuit = EndpointCircuit(
+                self.circuit_failure_threshold, self.circuit_reset_timeout
+            )
+            self.endpoint_circuits[endpoint] = circuit
+        return circuit
+
     def get_transport_instance(self, transport_id: str) -> BaseOutboundTransport:
         """Get an instance of a running transport by ID."""
         return self.running_transports[transport_id]
@@ -279,9 +395,67 @@ class OutboundTransportManager:
         queued.payload = json.dumps(payload)
         queued.state = QueuedOutboundMessage.STATE_PENDING
         queued.retries = 4 if max_attempts is None else max_attempts - 1
+        self.persist_queued(queued)
         self.outbound_new.append(queued)
         self.process_queued()
 
+    def persist_queued(self, queued: QueuedOutboundMessage):
+        """
+        Add a queued message to the persistent queue, if configured.
+
+        Messages are persisted once they have been encoded, and only the encoded
+        payload is stored along with its delivery details. A restored message is
+        delivered like a webhook, without its context or connection target.
+
+        Args:
+            queued: The queued message, ready for delivery
+
+        """
+        if self.persistent_queue and not queued.persist_key:
+            queued.persist_key = self.persistent_queue.add(
+                {
+                    "transport_id": queued.transport_id,
+                    "endpoint": queued.endpoint,
+                    "retries": queued.retries,
+                    "enc_payload": encode_payload(queued.payload),
+                }
+            )
+
+    def restore_queued(self, entry: dict) -> QueuedOutboundMessage:
+        """
+        Recreate a queued message from a persistent queue entry.
+
+        Args:
+            entry: The persistent queue entry
+
+        Returns:
+            The queued message, or None if its transport is not registered
+
+        """
+        transport_id = entry["transport_id"]
+        if transport_id not in self.registered_transports:
+            LOGGER.warning(
+                "Discarding restored outbound message for %s, transport %s"
+                " is not registered",
+                entry["endpoint"],
+                transport_id,
+            )
+            return None
+        queued = QueuedOutboundMessage(None, None, None, transport_id)
+        queued.endpoint = entry["endpoint"]
+        queued.payload = decode_payload(entry["enc_payload"])
+        queued.state = QueuedOutboundMessage.STATE_PENDING
+        queued.retries = entry["retries"]
+        return queued
+
+    def finish_queued(self, queued: QueuedOutboundMessage):
+        """Mark a queued message as done and remove it from the persistent queue."""
+        queued.state = QueuedOutboundMessage.STATE_DONE
+        self.outbound_done.append(queued)
+        if queued.persist_key and self.persistent_queue:
+            self.persistent_queue.ack(queued.persist_key)
+            queued.persist_key = None
+
     def process_queued(self) -> asyncio.Task:
         """
         Start the process to deliver queued messages if necessary.
@@ -291,7 +465,12 @@ class OutboundTransportManager:
         """
         if self._process_task and not self._process_task.done():
             self.outbound_event.set()
-        elif self.outbound_new or self.outbound_buffer:
+        elif (
+            self.outbound_new
+            or self.outbound_ready
+            or self.outbound_done
+            or self.outbound_retry
+        ):
             self._process_task = self.loop.create_task(self._process_loop())
             self._process_task.add_done_callback(lambda task: self._process_done(task))
         return self._process_task
@@ -306,6 +485,97 @@ class OutboundTransportManager:
         if self._process_task and self._process_task.done():
             self._process_task = None
 
+    def ready_queued(self, queued: QueuedOutboundMessage):
+        """
+        Add a queued message to the queue for its endpoint.
+
+        Args:
+            queued: The queued message, ready for delivery
+
+        """
+        ep_queue = self.endpoint_queues.get(queued.endpoint)
+        if not ep_queue:
+            ep_queue = EndpointQueue(queued.endpoint)
+            self.endpoint_queues[queued.endpoint] = ep_queue
+        queued.queued_time = get_timer()
+        ep_queue.messages.append(queued)
+        self.depth_histogram.log(len(ep_queue.messages))
+        ep_queue.depth_histogram.log(len(ep_queue.messages))
+        self.schedule_endpoint(ep_queue)
+
+    def depth_stats(self, limit: int = DEPTH_TOP_ENDPOINTS) -> dict:
+        """
+        Summarize the depth of the endpoint queues.
+
+        Args:
+            limit: The number of endpoint queues to report, deepest first
+
+        Returns:
+            The depths over all endpoints as messages were added, and for the
+            deepest current endpoint queues their depth, active deliveries and
+            the depths since the queue was created
+
+        """
+        deepest = heapq.nlargest(
+            limit, self.endpoint_queues.values(), key=lambda q: len(q.messages)
+        )
+        return {
+            "all": self.depth_histogram.extract(),
+            "endpoints": {
+                ep_queue.endpoint: dict(
+                    ep_queue.depth_histogram.extract(),
+                    active=ep_queue.active,
+                    depth=len(ep_queue.messages),
+                )
+                for ep_queue in deepest
+            },
+        }
+
+    def schedule_endpoint(self, ep_queue: EndpointQueue):
+        """
+        Add an endpoint queue to the ready queues if it may deliver a message.
+
+        Args:
+            ep_queue: The endpoint queue
+
+        """
+        if (
+            ep_queue.messages
+            and not ep_queue.scheduled
+            and ep_queue.active < self.max_endpoint_active
+        ):
+            ep_queue.scheduled = True
+            self.outbound_ready.append(ep_queue)
+
+    def release_endpoint(self, ep_queue: EndpointQueue):
+        """
+        Schedule an endpoint queue, or remove it once it is idle.
+
+        Args:
+            ep_queue: The endpoint queue
+
+        """
+        if ep_queue.messages or ep_queue.active:
+            self.schedule_endpoint(ep_queue)
+        else:
+            del self.endpoint_queues[ep_queue.endpoint]
+            # the endpoint entries are only kept while the endpoint is in use
+            if self.collector:
+                self.collector.remove(
+                    ep_queue.stat_name("queued"), ep_queue.stat_name("deliver")
+                )
+
+    def schedule_retry(self, queued: QueuedOutboundMessage, retry_at: float):
+        """
+        Hold a queued message until a given time.
+
+        Args:
+            queued: The queued message
+            retry_at: The timer value after which the message is ready again
+
+        """
+        heapq.heappush(self.outbound_retry, (retry_at, next(self._retry_seq), queued))
+
     async def _process_loop(self):
         """Continually kick off encoding and delivery on outbound messages."""
         # Note: this method should not call async methods apart from
@@ -313,85 +583,142 @@ class OutboundTransportManager:
 
         while True:
             self.outbound_event.clear()
-            loop_time = get_timer()
-            upd_buffer = []
-
-            for queued in self.outbound_buffer:
-                if queued.state == QueuedOutboundMessage.STATE_DONE:
-                    if queued.error:
-                        LOGGER.exception(
-                            "Outbound message could not be delivered to %s",
-                            queued.endpoint,
-                            exc_info=queued.error,
-                        )
-                        if self.handle_not_delivered:
-                            self.handle_not_delivered(queued.context, queued.message)
-                    continue  # remove from buffer
-
-                deliver = False
-
-                if queued.state == QueuedOutboundMessage.STATE_PENDING:
-                    deliver = True
-                elif queued.state == QueuedOutboundMessage.STATE_RETRY:
-                    if queued.retry_at < loop_time:
-                        queued.retry_at = None
-                        deliver = True
-
-                if deliver:
-                    queued.state = QueuedOutboundMessage.STATE_DELIVER
-                    p_time = trace_event(
-                        self.context.settings,
-                        queued.message if queued.message else queued.payload,
-                        outcome="OutboundTransportManager.DELIVER.START."
-                        + queued.endpoint,
-                    )
-                    self.deliver_queued_message(queued)
-                    trace_event(
-                        self.context.settings,
-                        queued.message if queued.message else queued.payload,
-                        outcome="OutboundTransportManager.DELIVER.END."
-                        + queued.endpoint,
-                        perf_counter=p_time,
-                    )
 
-                upd_buffer.append(queued)
+            while self.outbound_done:
+                queued = self.outbound_done.popleft()
+                if queued.error:
+                    LOGGER.exception(
+                        "Outbound message could not be delivered to %s",
+                        queued.endpoint,
+                        exc_info=queued.error,
+                    )
+                    if self.handle_not_delivered and queued.message:
+                        self.handle_not_delivered(queued.context, queued.message)
 
-            new_pending = 0
             new_messages = self.outbound_new
             self.outbound_new = []
+            # messages to encode, by transport and keys
+            encode_batches = {}
 
             for queued in new_messages:
                 if queued.state == QueuedOutboundMessage.STATE_NEW:
                     if queued.message and queued.message.enc_payload:
                         queued.payload = queued.message.enc_payload
                         queued.state = QueuedOutboundMessage.STATE_PENDING
-                        new_pending += 1
+                        self.persist_queued(queued)
+                        self.ready_queued(queued)
                     else:
                         queued.state = QueuedOutboundMessage.STATE_ENCODE
-                        p_time = trace_event(
-                            self.context.settings,
-                            queued.message if queued.message else queued.payload,
-                            outcome="OutboundTransportManager.ENCODE.START",
-                        )
-                        self.encode_queued_message(queued)
-                        trace_event(
-                            self.context.settings,
-                            queued.message if queued.message else queued.payload,
-                            outcome="OutboundTransportManager.ENCODE.END",
-                            perf_counter=p_time,
-                        )
+                        self.outbound_encode.add(queued)
+                        target = queued.target
+                        encode_batches.setdefault(
+                            (
+                                queued.transport_id,
+                                target.sender_key,
+                                tuple(target.recipient_keys or ()),
+                                tuple(target.routing_keys or ()),
+                            ),
+                            [],
+                        ).append(queued)
                 else:
-                    new_pending += 1
+                    self.ready_queued(queued)
 
-                upd_buffer.append(queued)
+            for batch in encode_batches.values():
+                for pos in range(0, len(batch), self.encode_batch_size):
+                    self.encode_queued_batch(batch[pos:pos + self.encode_batch_size])
 
-            self.outbound_buffer = upd_buffer
-            if self.outbound_buffer:
-                if not new_pending:
-                    await self.outbound_event.wait()
-            else:
+            loop_time = get_timer()
+            retry = self.outbound_retry
+            while retry and retry[0][0] <= loop_time:
+                self.ready_queued(heapq.heappop(retry)[2])
+
+            ready = self.outbound_ready
+            while ready and len(self.outbound_deliver) < self.max_active:
+                ep_queue = ready.popleft()
+                ep_queue.scheduled = False
+                circuit = self.get_circuit(ep_queue.endpoint)
+                if not circuit.allow(loop_time):
+                    # while a probe is in progress the messages wait for its
+                    # result, otherwise they are held until the endpoint may
+                    # be probed
+                    if not circuit.probing:
+                        while ep_queue.messages:
+                            self.schedule_retry(
+                                ep_queue.messages.popleft(), circuit.retry_at
+                            )
+                        self.release_endpoint(ep_queue)
+                    continue
+
+                queued = ep_queue.messages.popleft()
+                queued.probe = circuit.probing
+                ep_queue.active += 1
+                self.schedule_endpoint(ep_queue)
+                if self.collector:
+                    queued_time = loop_time - queued.queued_time
+                    self.collector.log("outbound-endpoint:queued", queued_time)
+                    self.collector.log(ep_queue.stat_name("queued"), queued_time)
+                queued.deliver_time = loop_time
+                queued.retry_at = None
+                queued.state = QueuedOutboundMessage.STATE_DELIVER
+                self.outbound_deliver.add(queued)
+                p_time = trace_event(
+                    self.context.settings,
+                    queued.message if queued.message else queued.payload,
+                    outcome="OutboundTransportManager.DELIVER.START." + queued.endpoint,
+                )
+                self.deliver_queued_message(queued)
+                trace_event(
+                    self.context.settings,
+                    queued.message if queued.message else queued.payload,
+                    outcome="OutboundTransportManager.DELIVER.END." + queued.endpoint,
+                    perf_counter=p_time,
+                )
+
+            if (
+                self.outbound_encode
+                or self.outbound_deliver
+                or self.outbound_retry
+                or self.endpoint_queues
+            ):
+                timeout = (
+                    max(self.outbound_retry[0][0] - get_timer(), 0)
+                    if self.outbound_retry
+                    else None
+                )
+                try:
+                    await asyncio.wait_for(self.outbound_event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            elif not (self.outbound_new or self.outbound_done):
                 break
 
+    def encode_queued_batch(self, batch: Sequence[QueuedOutboundMessage]):
+        """Kick off encoding of queued messages for the same recipients."""
+        p_times = [
+            trace_event(
+                self.context.settings,
+                queued.message,
+                outcome="OutboundTransportManager.ENCODE.START",
+            )
+            for queued in batch
+        ]
+        if len(batch) == 1:
+            self.encode_queued_message(batch[0])
+        else:
+            task = self.task_queue.run(
+                self.perform_encode_batch(batch),
+                lambda completed: self.finished_encode_batch(batch, completed),
+            )
+            for queued in batch:
+                queued.task = task
+        for queued, p_time in zip(batch, p_times):
+            trace_event(
+                self.context.settings,
+                queued.message,
+                outcome="OutboundTransportManager.ENCODE.END",
+                perf_counter=p_time,
+            )
+
     def encode_queued_message(self, queued: QueuedOutboundMessage) -> asyncio.Task:
         """Kick off encoding of a queued message."""
         queued.task = self.task_queue.run(
@@ -414,13 +741,53 @@ class OutboundTransportManager:
             queued.target.sender_key,
         )
 
+    async def perform_encode_batch(self, batch: Sequence[QueuedOutboundMessage]):
+        """Perform encoding of messages for the same recipients."""
+        # the context is only used to look up the wallet, which is shared
+        first = batch[0]
+        transport = self.get_transport_instance(first.transport_id)
+        wire_format = transport.wire_format or await first.context.inject(
+            BaseWireFormat
+        )
+        payloads = await wire_format.encode_messages(
+            first.context,
+            [queued.message.payload for queued in batch],
+            first.target.recipient_keys,
+            first.target.routing_keys,
+            first.target.sender_key,
+        )
+        for queued, payload in zip(batch, payloads):
+            queued.payload = payload
+
+    def finished_encode_batch(
+        self, batch: Sequence[QueuedOutboundMessage], completed: CompletedTask
+    ):
+        """Handle completion of encoding for messages to the same recipients."""
+        if completed.exc_info:
+            LOGGER.warning(
+                "Error encoding a batch of %d outbound messages, encoding them"
+                " separately",
+                len(batch),
+                exc_info=completed.exc_info,
+            )
+            # a single bad message should not fail the others in the batch
+            for queued in batch:
+                queued.payload = None
+                self.encode_queued_message(queued)
+            return
+        for queued in batch:
+            self.finished_encode(queued, completed)
+
     def finished_encode(self, queued: QueuedOutboundMessage, completed: CompletedTask):
         """Handle completion of queued message encoding."""
+        self.outbound_encode.discard(queued)
         if completed.exc_info:
             queued.error = completed.exc_info
-            queued.state = QueuedOutboundMessage.STATE_DONE
+            self.finish_queued(queued)
         else:
             queued.state = QueuedOutboundMessage.STATE_PENDING
+            self.persist_queued(queued)
+            self.ready_queued(queued)
         queued.task = None
         self.process_queued()
 
@@ -435,8 +802,18 @@ class OutboundTransportManager:
 
     def finished_deliver(self, queued: QueuedOutboundMessage, completed: CompletedTask):
         """Handle completion of queued message delivery."""
+        self.outbound_deliver.discard(queued)
+        ep_queue = self.endpoint_queues.get(queued.endpoint)
+        if self.collector and queued.deliver_time:
+            deliver_time = get_timer() - queued.deliver_time
+            self.collector.log("outbound-endpoint:deliver", deliver_time)
+            if ep_queue:
+                self.collector.log(ep_queue.stat_name("deliver"), deliver_time)
+        circuit = self.get_circuit(queued.endpoint)
         if completed.exc_info:
             queued.error = completed.exc_info
+            queued.attempts += 1
+            circuit.record_failure(probe=queued.probe)
 
             if queued.retries:
                 LOGGER.error(
@@ -445,16 +822,27 @@ class OutboundTransportManager:
                 )
                 queued.retries -= 1
                 queued.state = QueuedOutboundMessage.STATE_RETRY
-                queued.retry_at = time.perf_counter() + 10
+                queued.retry_at = get_timer() + backoff_delay(
+                    queued.attempts, self.retry_base_delay, self.retry_max_delay
+                )
+                self.schedule_retry(queued, queued.retry_at)
             else:
                 LOGGER.exception(
                     "Outbound message could not be delivered", exc_info=queued.error,
                 )
                 LOGGER.error(">>> NOT Re-queued, state is DONE, failed to deliver msg.")
-                queued.state = QueuedOutboundMessage.STATE_DONE
+                self.finish_queued(queued)
         else:
             queued.error = None
-            queued.state = QueuedOutboundMessage.STATE_DONE
+            circuit.record_success(probe=queued.probe)
+            if circuit.state == EndpointCircuit.STATE_CLOSED:
+                # a healthy endpoint needs no tracking
+                self.endpoint_circuits.pop(queued.endpoint, None)
+            self.finish_queued(queued)
+        if ep_queue:
+            ep_queue.active -= 1
+            self.release_endpoint(ep_queue)
+        queued.probe = False
         queued.task = None
         self.process_queued()
 
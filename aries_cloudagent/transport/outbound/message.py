@@ -4,6 +4,8 @@ from typing import Sequence, Union
 
 from ...connections.models.connection_target import ConnectionTarget
 
+from ..queue.base import decode_payload, encode_payload
+
 
 class OutboundMessage:
     """Represents an outgoing message."""
@@ -36,6 +38,60 @@ class OutboundMessage:
         self.target_list = list(target_list) if target_list else []
         self.to_session_only = to_session_only
 
+    def serialize(self) -> dict:
+        """
+        Convert the message to a JSON-serializable dict.
+
+        Returns:
+            A dict which may be passed to `deserialize`
+
+        """
+        return {
+            "connection_id": self.connection_id,
+            "enc_payload": encode_payload(self.enc_payload),
+            "endpoint": self._endpoint,
+            "payload": encode_payload(self.payload),
+            "reply_session_id": self.reply_session_id,
+            "reply_thread_id": self.reply_thread_id,
+            "reply_to_verkey": self.reply_to_verkey,
+            "reply_from_verkey": self.reply_from_verkey,
+            "target": self.target.serialize() if self.target else None,
+            "target_list": [target.serialize() for target in self.target_list],
+            "to_session_only": self.to_session_only,
+        }
+
+    @classmethod
+    def deserialize(cls, value: dict) -> "OutboundMessage":
+        """
+        Recreate a message from the output of `serialize`.
+
+        Args:
+            value: The serialized message
+
+        Returns:
+            The message instance
+
+        """
+        target = value.get("target")
+        return cls(
+            connection_id=value.get("connection_id"),
+            enc_payload=decode_payload(value.get("enc_payload")),
+            endpoint=value.get("endpoint"),
+            payload=decode_payload(value.get("payload")),
+            reply_session_id=value.get("reply_session_id"),
+            reply_thread_id=value.get("reply_thread_id"),
+            reply_to_verkey=value.get("reply_to_verkey"),
+            reply_from_verkey=value.get("reply_from_verkey"),
+            target=ConnectionTarget.deserialize(target, trusted=True)
+            if target
+            else None,
+            target_list=[
+                ConnectionTarget.deserialize(target, trusted=True)
+                for target in value.get("target_list") or ()
+            ],
+            to_session_only=value.get("to_session_only", False),
+        )
+
     def __repr__(self) -> str:
         """
         Return a human readable representation of this class.
@@ -0,0 +1,50 @@
+from unittest import TestCase, mock
+
+from ..circuit import EndpointCircuit, backoff_delay
+
+
+class TestEndpointCircuit(TestCase):
+    def test_backoff_delay(self):
+        with mock.patch("random.uniform", lambda low, high: high):
+            assert [backoff_delay(n, 5, 60) for n in range(1, 7)] == [
+                5,
+                10,
+                20,
+                40,
+                60,
+                60,
+            ]
+        with mock.patch("random.uniform", lambda low, high: low):
+            assert backoff_delay(3, 5, 60) == 10
+        for _ in range(100):
+            assert 2.5 <= backoff_delay(1, 5, 60) <= 5
+
+    def test_circuit(self):
+        circuit = EndpointCircuit(failure_threshold=2, reset_timeout=10)
+        assert circuit.allow(0)
+        circuit.record_failure(0)
+        assert circuit.state == EndpointCircuit.STATE_CLOSED
+        assert circuit.allow(0)
+        circuit.record_failure(1)
+        assert circuit.state == EndpointCircuit.STATE_OPEN
+        assert circuit.retry_at == 11
+        assert not circuit.allow(5)
+
+        # a single probe is allowed after the reset timeout
+        assert circuit.allow(11)
+        assert circuit.state == EndpointCircuit.STATE_HALF_OPEN
+        assert not circuit.allow(11)
+        circuit.record_failure(12, probe=True)
+        assert circuit.state == EndpointCircuit.STATE_OPEN
+        assert not circuit.allow(15)
+
+        assert circuit.allow(22)
+        # messages sent before the circuit opened do not settle the probe
+        circuit.record_success()
+        circuit.record_failure(22)
+        assert circuit.state == EndpointCircuit.STATE_HALF_OPEN
+        assert circuit.probing and circuit.failures == 3
+        circuit.record_success(probe=True)
+        assert circuit.state == EndpointCircuit.STATE_CLOSED
+        assert circuit.failures == 0
+        assert circuit.allow(22) and circuit.allow(22)
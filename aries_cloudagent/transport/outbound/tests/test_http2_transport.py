@@ -0,0 +1,87 @@
+import pytest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from asynctest import TestCase as AsyncTestCase
+
+from ....config.injection_context import InjectionContext
+from ....utils.stats import Collector
+
+from ..base import OutboundTransportError
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("h2")
+
+from ..http2 import Http2Transport  # noqa: E402
+
+
+class TestHttp2Transport(AsyncTestCase):
+    async def test_handle_message(self):
+        requests = []
+
+        def handler(request: httpx.Request):
+            requests.append(request)
+            status = 404 if request.url.path == "/missing" else 200
+            return httpx.Response(status)
+
+        transport = Http2Transport()
+        transport.settings = {
+            "transport.http_limit": 10,
+            "transport.http_connect_timeout": 2,
+        }
+        transport.collector = Collector()
+        await transport.start()
+        assert transport.client.timeout.connect == 2
+        await transport.client.aclose()
+        transport.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        context = InjectionContext()
+        await transport.handle_message(context, "{}", "http://localhost/")
+        await transport.handle_message(context, b"{}", "http://localhost/")
+        assert [request.headers["content-type"] for request in requests] == [
+            "application/json",
+            "application/ssi-agent-wire",
+        ]
+        assert requests[1].content == b"{}"
+        assert transport.collector.extract()["count"] == {"outbound-http2:POST": 2}
+
+        with pytest.raises(OutboundTransportError):
+            await transport.handle_message(context, "{}", "http://localhost/missing")
+        with pytest.raises(OutboundTransportError):
+            await transport.handle_message(context, "{}", None)
+
+        await transport.stop()
+        assert transport.client is None
+
+    async def test_handle_message_server(self):
+        # httpx only negotiates HTTP/2 with ALPN over TLS, so against this plain
+        # HTTP server the client falls back to HTTP/1.1: the HTTP/2 framing
+        # itself is not covered by these tests
+        received = []
+
+        async def receive_message(request):
+            received.append((request.content_type, await request.read()))
+            raise web.HTTPOk()
+
+        app = web.Application()
+        app.add_routes([web.post("/", receive_message)])
+        server = TestServer(app)
+        await server.start_server()
+        transport = Http2Transport()
+        transport.settings = {}
+        await transport.start()
+        context = InjectionContext()
+        try:
+            await transport.handle_message(context, "{}", str(server.make_url("/")))
+            await transport.handle_message(context, b"{}", str(server.make_url("/")))
+            with pytest.raises(OutboundTransportError):
+                await transport.handle_message(
+                    context, "{}", str(server.make_url("/missing"))
+                )
+        finally:
+            await transport.stop()
+            await server.close()
+        assert received == [
+            ("application/json", b"{}"),
+            ("application/ssi-agent-wire", b"{}"),
+        ]
@@ -1,9 +1,10 @@
 import asyncio
 import pytest
+import time
 
 from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
-from aiohttp import web
-from asynctest import mock as async_mock
+from aiohttp import ClientTimeout, web
+from asynctest import TestCase as AsyncTestCase, mock as async_mock
 
 from ....config.injection_context import InjectionContext
 from ....utils.stats import Collector
@@ -11,8 +12,9 @@ from ....utils.stats import Collector
 from ...outbound.message import OutboundMessage
 from ...wire_format import JsonWireFormat
 
+from .. import http as test_module
 from ..base import OutboundTransportError
-from ..http import HttpTransport
+from ..http import HttpTransport, get_client_options
 
 
 class TestHttpTransport(AioHTTPTestCase):
@@ -67,6 +69,31 @@ class TestHttpTransport(AioHTTPTestCase):
             "outbound-http:POST": 1,
         }
 
+    @pytest.mark.benchmark
+    @unittest_run_loop
+    async def test_benchmark_keepalive(self):
+        server_addr = f"http://localhost:{self.server.port}"
+        count = 500
+        timings = {}
+        for name, keepalive in (("close", 0), ("keepalive", 15)):
+            transport = HttpTransport()
+            transport.settings = {"transport.http_keepalive_timeout": keepalive}
+            async with transport:
+                start = time.perf_counter()
+                await asyncio.gather(
+                    *(
+                        transport.handle_message(self.context, "{}", server_addr)
+                        for _ in range(count)
+                    )
+                )
+                timings[name] = time.perf_counter() - start
+        print(
+            "http x{}: close {:.3f}s, keepalive {:.3f}s".format(
+                count, timings["close"], timings["keepalive"]
+            )
+        )
+        assert len(self.message_results) == 2 * count
+
     @unittest_run_loop
     async def test_transport_coverage(self):
         transport = HttpTransport()
@@ -92,3 +119,53 @@ class TestHttpTransport(AioHTTPTestCase):
                 await transport.handle_message(None, "dummy", "http://localhost")
 
         await transport.__aexit__(KeyError, KeyError("just a drill"), None)
+
+
+class TestHttpClientOptions(AsyncTestCase):
+    def test_get_client_options(self):
+        assert get_client_options({}) == {
+            "limit": 200,
+            "limit_per_host": 50,
+            "keepalive_timeout": 15.0,
+            "dns_cache_ttl": 10,
+            "connect_timeout": None,
+            "read_timeout": None,
+        }
+        options = get_client_options(
+            {"transport.http_limit": 20, "transport.http_keepalive_timeout": 0}
+        )
+        assert options["limit"] == 20
+        assert options["keepalive_timeout"] == 0
+
+    async def test_start_options(self):
+        transport = HttpTransport()
+        transport.settings = {
+            "transport.http_limit": 20,
+            "transport.http_limit_per_host": 5,
+            "transport.http_keepalive_timeout": 30,
+            "transport.http_dns_cache_ttl": 0,
+            "transport.http_connect_timeout": 2,
+            "transport.http_read_timeout": 10,
+        }
+        with async_mock.patch.object(
+            test_module, "ClientSession", autospec=True
+        ) as mock_session:
+            await transport.start()
+            assert transport.connector.limit == 20
+            assert transport.connector.limit_per_host == 5
+            assert transport.connector.use_dns_cache is False
+            assert not transport.connector.force_close
+            timeout = mock_session.call_args[1]["timeout"]
+            assert isinstance(timeout, ClientTimeout)
+            assert timeout.sock_connect == 2
+            assert timeout.sock_read == 10
+            await transport.stop()
+            await transport.connector.close()
+
+            transport.settings = {"transport.http_keepalive_timeout": 0}
+            await transport.start()
+            assert transport.connector.force_close
+            assert transport.connector.use_dns_cache
+            assert "timeout" not in mock_session.call_args[1]
+            await transport.stop()
+            await transport.connector.close()
@@ -1,10 +1,19 @@
 import asyncio
 import json
+import os
+import pytest
+import time
+
+from tempfile import TemporaryDirectory
 
 from asynctest import TestCase as AsyncTestCase, mock as async_mock
 
 from ....config.injection_context import InjectionContext
 from ....connections.models.connection_target import ConnectionTarget
+from ....utils.stats import Collector
+from ....utils.task_queue import CompletedTask
+from ...queue.base import BasePersistentQueue
+from ...queue.segment_log import SegmentLogQueue
 
 from ..manager import (
     OutboundDeliveryError,
@@ -111,6 +120,84 @@ class TestOutboundTransportManager(AsyncTestCase):
         assert mgr.get_running_transport_for_scheme("http") is None
         transport.stop.assert_awaited_once_with()
 
+    async def test_encode_batch(self):
+        context = InjectionContext()
+        context.update_settings({"transport.encode_batch_size": 3})
+        mgr = OutboundTransportManager(context)
+
+        transport = async_mock.MagicMock(schemes=["http"])
+        transport.handle_message = async_mock.CoroutineMock()
+        transport.wire_format.encode_message = async_mock.CoroutineMock(
+            return_value="single"
+        )
+        transport.wire_format.encode_messages = async_mock.CoroutineMock(
+            side_effect=lambda ctx, payloads, *keys: [f"enc:{p}" for p in payloads]
+        )
+        transport.start = async_mock.CoroutineMock()
+        transport_cls = async_mock.MagicMock(schemes=["http"], return_value=transport)
+        mgr.register_class(transport_cls, "transport_cls")
+        await mgr.start()
+        await mgr.task_queue
+
+        target = ConnectionTarget(
+            endpoint="http://localhost",
+            recipient_keys=[1, 2],
+            routing_keys=[3],
+            sender_key=4,
+        )
+        for n in range(4):
+            mgr.enqueue_message(context, OutboundMessage(payload=str(n), target=target))
+        await asyncio.wait_for(mgr.flush(), 5)
+
+        transport.wire_format.encode_messages.assert_awaited_once_with(
+            context, ["0", "1", "2"], [1, 2], [3], 4
+        )
+        transport.wire_format.encode_message.assert_awaited_once_with(
+            context, "3", [1, 2], [3], 4
+        )
+        delivered = [call[0][1] for call in transport.handle_message.call_args_list]
+        assert sorted(delivered) == ["enc:0", "enc:1", "enc:2", "single"]
+
+    async def test_encode_batch_error(self):
+        context = InjectionContext()
+        mgr = OutboundTransportManager(context)
+        not_delivered = []
+        mgr.handle_not_delivered = lambda ctx, message: not_delivered.append(message)
+
+        def encode_message(ctx, payload, *keys):
+            if payload == "bad":
+                raise ValueError("bad message")
+            return f"enc:{payload}"
+
+        transport = async_mock.MagicMock(schemes=["http"])
+        transport.handle_message = async_mock.CoroutineMock()
+        transport.wire_format.encode_message = async_mock.CoroutineMock(
+            side_effect=encode_message
+        )
+        transport.wire_format.encode_messages = async_mock.CoroutineMock(
+            side_effect=ValueError("bad message")
+        )
+        transport.start = async_mock.CoroutineMock()
+        transport_cls = async_mock.MagicMock(schemes=["http"], return_value=transport)
+        mgr.register_class(transport_cls, "transport_cls")
+        await mgr.start()
+        await mgr.task_queue
+
+        target = ConnectionTarget(endpoint="http://localhost", recipient_keys=[1])
+        messages = [
+            OutboundMessage(payload=payload, target=target)
+            for payload in ("0", "bad", "2")
+        ]
+        for message in messages:
+            mgr.enqueue_message(context, message)
+        await asyncio.wait_for(mgr.flush(), 5)
+
+        transport.wire_format.encode_messages.assert_awaited_once()
+        assert transport.wire_format.encode_message.await_count == 3
+        delivered = [call[0][1] for call in transport.handle_message.call_args_list]
+        assert sorted(delivered) == ["enc:0", "enc:2"]
+        assert not_delivered == [messages[1]]
+
     async def test_stop_cancel(self):
         context = InjectionContext()
         context.update_settings({"transport.outbound_configs": ["http"]})
@@ -155,6 +242,326 @@ class TestOutboundTransportManager(AsyncTestCase):
             assert queued.retries == test_attempts - 1
             assert queued.state == QueuedOutboundMessage.STATE_PENDING
 
+    async def test_persistent_queue(self):
+        def make_manager(path):
+            context = InjectionContext()
+            context.injector.bind_instance(BasePersistentQueue, SegmentLogQueue(path))
+            mgr = OutboundTransportManager(context)
+            transport = async_mock.MagicMock(schemes=["http"])
+            transport.handle_message = async_mock.CoroutineMock()
+            transport.wire_format.encode_message = async_mock.CoroutineMock(
+                return_value=b"encoded"
+            )
+            transport.start = async_mock.CoroutineMock()
+            transport.stop = async_mock.CoroutineMock()
+            transport_cls = async_mock.MagicMock(
+                schemes=["http"], return_value=transport
+            )
+            mgr.register_class(transport_cls, "transport_cls")
+            return mgr, transport
+
+        with TemporaryDirectory() as path:
+            mgr, transport = make_manager(path)
+            await mgr.setup()
+            await mgr.start()
+            await mgr.task_queue
+            message = OutboundMessage(
+                payload='{"secret": "plaintext"}',
+                connection_id="conn-id",
+                target=ConnectionTarget(
+                    endpoint="http://localhost", recipient_keys=["1"], sender_key="2"
+                ),
+            )
+
+            async def hang(*args):
+                await asyncio.Event().wait()
+
+            # stop during delivery, as if the process was stopped
+            transport.handle_message.side_effect = hang
+            mgr.enqueue_message(InjectionContext(), message)
+            mgr.enqueue_webhook("topic", {"a": "b"}, "http://example")
+            while len(mgr.outbound_deliver) < 2:
+                await asyncio.sleep(0.01)
+            await mgr.persistent_queue.close()
+            mgr.persistent_queue = None
+            await mgr.stop(wait=False)
+            for name in os.listdir(path):
+                with open(os.path.join(path, name), "rb") as segment:
+                    data = segment.read()
+                assert b"plaintext" not in data and b"conn-id" not in data
+
+            mgr, transport = make_manager(path)
+            await mgr.setup()
+            # the webhook is persisted first, the message once it is encoded
+            assert [queued.endpoint for queued in mgr.outbound_new] == [
+                "http://example/topic/topic/",
+                "http://localhost",
+            ]
+            restored = mgr.outbound_new[1]
+            assert restored.message is None
+            assert restored.payload == b"encoded"
+            assert restored.retries == mgr.MAX_RETRY_COUNT
+
+            await mgr.start()
+            await mgr.flush()
+            transport.wire_format.encode_message.assert_not_awaited()
+            transport.handle_message.assert_any_await(
+                None, b"encoded", "http://localhost"
+            )
+            transport.handle_message.assert_any_await(
+                None, json.dumps({"a": "b"}), "http://example/topic/topic/"
+            )
+            await mgr.stop()
+
+            mgr, transport = make_manager(path)
+            await mgr.setup()
+            assert mgr.outbound_new == []
+            await mgr.stop()
+
+    async def test_circuit_breaker(self):
+        context = InjectionContext()
+        context.update_settings(
+            {
+                "transport.circuit_failure_threshold": 2,
+                "transport.circuit_reset_timeout": 0.2,
+                "transport.retry_base_delay": 0.01,
+            }
+        )
+        mgr = OutboundTransportManager(context)
+        transport = async_mock.MagicMock(schemes=["http"])
+        transport.handle_message = async_mock.CoroutineMock(
+            side_effect=OutboundDeliveryError()
+        )
+        transport.start = async_mock.CoroutineMock()
+        transport_cls = async_mock.MagicMock(schemes=["http"], return_value=transport)
+        tid = mgr.register_class(transport_cls, "transport_cls")
+        await mgr.start_transport(tid)
+
+        endpoint = "http://localhost"
+        for n in range(3):
+            mgr.enqueue_message(
+                context,
+                OutboundMessage(
+                    payload="{}",
+                    enc_payload=str(n),
+                    target=ConnectionTarget(endpoint=endpoint),
+                ),
+            )
+        await asyncio.sleep(0.1)
+        # retries are held back while the circuit is open
+        assert transport.handle_message.call_count == 3
+        assert mgr.get_circuit(endpoint).state == "open"
+        assert not mgr.task_queue.current_active
+
+        transport.handle_message.side_effect = None
+        await asyncio.wait_for(mgr.flush(), 5)
+        assert transport.handle_message.call_count == 6
+        assert endpoint not in mgr.endpoint_circuits
+
+    async def test_circuit_probe_result(self):
+        mgr = OutboundTransportManager(InjectionContext())
+        endpoint = "http://localhost"
+        circuit = mgr.get_circuit(endpoint)
+        for _ in range(circuit.failure_threshold):
+            circuit.record_failure(0)
+        assert circuit.allow(circuit.retry_at)
+
+        def delivered(probe: bool) -> QueuedOutboundMessage:
+            queued = QueuedOutboundMessage(
+                None, None, ConnectionTarget(endpoint=endpoint), None
+            )
+            queued.probe = probe
+            mgr.finished_deliver(queued, CompletedTask(None, None))
+            return queued
+
+        # sent before the circuit opened
+        delivered(False)
+        assert mgr.endpoint_circuits[endpoint] is circuit
+        assert circuit.probing
+        delivered(True)
+        assert endpoint not in mgr.endpoint_circuits
+        await mgr.stop()
+
+    async def test_retry_schedule(self):
+        context = InjectionContext()
+        context.update_settings(
+            {
+                "transport.circuit_failure_threshold": 100,
+                "transport.retry_base_delay": 0.02,
+            }
+        )
+        mgr = OutboundTransportManager(context)
+        transport = async_mock.MagicMock(schemes=["http"])
+        transport.handle_message = async_mock.CoroutineMock(
+            side_effect=[OutboundDeliveryError(), None, None]
+        )
+        transport.start = async_mock.CoroutineMock()
+        transport_cls = async_mock.MagicMock(schemes=["http"], return_value=transport)
+        tid = mgr.register_class(transport_cls, "transport_cls")
+        await mgr.start_transport(tid)
+
+        for n in range(2):
+            mgr.enqueue_message(
+                context,
+                OutboundMessage(
+                    payload="{}",
+                    enc_payload=str(n),
+                    target=ConnectionTarget(endpoint="http://localhost"),
+                ),
+            )
+        await asyncio.sleep(0.005)
+        assert transport.handle_message.call_count == 2
+        assert len(mgr.outbound_retry) == 1
+        retry_at, _, queued = mgr.outbound_retry[0]
+        assert queued.state == QueuedOutboundMessage.STATE_RETRY
+        assert retry_at == queued.retry_at
+
+        await asyncio.wait_for(mgr.flush(), 5)
+        assert transport.handle_message.call_count == 3
+        assert not mgr.outbound_retry and not mgr.outbound_deliver
+
+    async def make_endpoint_manager(self, settings: dict, handle_message):
+        context = InjectionContext()
+        context.update_settings(settings)
+        context.injector.bind_instance(Collector, Collector())
+        mgr = OutboundTransportManager(context)
+        transport = async_mock.MagicMock(schemes=["http"])
+        transport.handle_message = handle_message
+        transport.start = async_mock.CoroutineMock()
+        transport_cls = async_mock.MagicMock(schemes=["http"], return_value=transport)
+        mgr.register_class(transport_cls, "transport_cls")
+        await mgr.setup()
+        await mgr.start()
+        await mgr.task_queue
+        return mgr
+
+    def enqueue_endpoint(self, mgr: OutboundTransportManager, endpoint: str):
+        mgr.enqueue_message(
+            mgr.context,
+            OutboundMessage(
+                payload="{}", enc_payload="{}", target=ConnectionTarget(endpoint=endpoint)
+            ),
+        )
+
+    async def test_endpoint_round_robin(self):
+        delivered = []
+
+        async def handle_message(context, payload, endpoint):
+            delivered.append(endpoint)
+
+        mgr = await self.make_endpoint_manager(
+            {"transport.max_outbound_active": 1}, handle_message
+        )
+        for endpoint in ("http://a", "http://b"):
+            for _ in range(3):
+                self.enqueue_endpoint(mgr, endpoint)
+        await mgr.flush()
+        assert delivered == ["http://a", "http://b"] * 3
+        assert not mgr.endpoint_queues and not mgr.outbound_ready
+
+        depth = mgr.depth_stats()
+        assert depth["all"]["count"] == 6
+        # three messages were added to each endpoint queue in turn
+        assert depth["all"]["counts"][:3] == [2, 2, 2]
+        assert depth["endpoints"] == {}
+        results = mgr.collector.results
+        assert results["count"]["outbound-endpoint:queued"] == 6
+        assert results["count"]["outbound-endpoint:deliver"] == 6
+        # the endpoint entries are removed with the idle endpoint queues
+        assert not any("http" in name for name in results["count"])
+
+    async def test_endpoint_limits(self):
+        slow = asyncio.Event()
+        delivered = []
+
+        async def handle_message(context, payload, endpoint):
+            if endpoint.startswith("http://slow"):
+                await slow.wait()
+            delivered.append(endpoint)
+
+        mgr = await self.make_endpoint_manager(
+            {"transport.max_outbound_active": 5, "transport.max_endpoint_active": 2},
+            handle_message,
+        )
+        for _ in range(10):
+            self.enqueue_endpoint(mgr, "http://slow")
+        for _ in range(3):
+            self.enqueue_endpoint(mgr, "http://fast")
+        await asyncio.sleep(0.01)
+        # the slow endpoint does not hold up other endpoints
+        assert delivered == ["http://fast"] * 3
+        assert len(mgr.outbound_deliver) == 2
+        assert len(mgr.endpoint_queues["http://slow"].messages) == 8
+
+        depth = mgr.depth_stats(limit=1)
+        assert list(depth["endpoints"]) == ["http://slow"]
+        slow_depth = depth["endpoints"]["http://slow"]
+        assert (slow_depth["depth"], slow_depth["active"]) == (8, 2)
+        assert slow_depth["count"] == 10
+        results = mgr.collector.results
+        assert results["count"]["outbound-endpoint:http://slow:queued"] == 2
+        assert "outbound-endpoint:http://slow:deliver" not in results["count"]
+        assert "outbound-endpoint:http://fast:queued" not in results["count"]
+
+        for _ in range(4):
+            self.enqueue_endpoint(mgr, "http://slow2")
+        await asyncio.sleep(0.01)
+        # two slots for each slow endpoint, up to the global limit
+        assert len(mgr.outbound_deliver) == 4
+        for _ in range(4):
+            self.enqueue_endpoint(mgr, "http://slow3")
+        await asyncio.sleep(0.01)
+        assert len(mgr.outbound_deliver) == 5
+
+        slow.set()
+        await asyncio.wait_for(mgr.flush(), 5)
+        assert len(delivered) == 21
+        assert not mgr.endpoint_queues
+
+    @pytest.mark.benchmark
+    async def test_benchmark_scheduler(self):
+        count = 100000
+        context = InjectionContext()
+        context.update_settings(
+            {
+                "transport.circuit_failure_threshold": count,
+                "transport.retry_base_delay": 0.001,
+            }
+        )
+        mgr = OutboundTransportManager(context)
+        delivered = []
+
+        async def handle_message(context, payload, endpoint):
+            # every tenth message fails once
+            if payload % 10 == 0 and payload not in failed:
+                failed.add(payload)
+                raise OutboundDeliveryError()
+            delivered.append(payload)
+
+        failed = set()
+        transport = async_mock.MagicMock(schemes=["http"])
+        transport.handle_message = handle_message
+        transport.start = async_mock.CoroutineMock()
+        transport_cls = async_mock.MagicMock(schemes=["http"], return_value=transport)
+        tid = mgr.register_class(transport_cls, "transport_cls")
+        await mgr.start_transport(tid)
+        target = ConnectionTarget(endpoint="http://localhost")
+
+        start = time.perf_counter()
+        for n in range(count):
+            mgr.enqueue_message(
+                context, OutboundMessage(payload="{}", enc_payload=n + 1, target=target)
+            )
+        await mgr.flush()
+        elapsed = time.perf_counter() - start
+        print(
+            "outbound scheduler x{}: {:.3f}s, {:.0f} msg/s".format(
+                count, elapsed, count / elapsed
+            )
+        )
+        assert len(delivered) == count
+        assert len(failed) == count // 10
+
     async def test_process_done_x(self):
         mock_task = async_mock.MagicMock(
             done=async_mock.MagicMock(return_value=True),
@@ -170,7 +577,7 @@ class TestOutboundTransportManager(AsyncTestCase):
             mgr._process_done(mock_task)
 
     async def test_process_finished_x(self):
-        mock_queued = async_mock.MagicMock(retries=1)
+        mock_queued = async_mock.MagicMock(retries=1, attempts=0)
         mock_task = async_mock.MagicMock(exc_info=(KeyError, KeyError("nope"), None),)
         context = InjectionContext()
         mgr = OutboundTransportManager(context)
@@ -190,6 +597,10 @@ class TestOutboundTransportManager(AsyncTestCase):
         context = InjectionContext()
         mock_handle_not_delivered = async_mock.MagicMock()
         mgr = OutboundTransportManager(context, mock_handle_not_delivered)
-        mgr.outbound_buffer.append(mock_queued)
+        mgr.outbound_done.append(mock_queued)
 
         await mgr._process_loop()
+        mock_handle_not_delivered.assert_called_once_with(
+            mock_queued.context, mock_queued.message
+        )
+        assert not mgr.outbound_done
@@ -3,6 +3,7 @@ import json
 
 from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
 from aiohttp import web, WSMsgType
+from asynctest import mock as async_mock
 
 from ....config.injection_context import InjectionContext
 
@@ -12,15 +13,22 @@ from ..ws import WsTransport
 class TestWsTransport(AioHTTPTestCase):
     async def setUpAsync(self):
         self.context = InjectionContext()
+        self.connection_count = 0
         self.message_results = []
+        self.server_sockets = []
 
     async def receive_message(self, request):
         ws = web.WebSocketResponse()
         await ws.prepare(request)
+        self.connection_count += 1
+        self.server_sockets.append(ws)
 
         async for msg in ws:
             if msg.type in (WSMsgType.TEXT, WSMsgType.BINARY):
-                self.message_results.append(json.loads(msg.data))
+                result = json.loads(msg.data)
+                self.message_results.append(result)
+                if result.get("reply"):
+                    await ws.send_str(json.dumps({"reply": False}))
 
             elif msg.type == WSMsgType.ERROR:
                 raise Exception(ws.exception())
@@ -52,3 +60,60 @@ class TestWsTransport(AioHTTPTestCase):
             send_message(transport, b"{}", endpoint=server_addr), 5.0
         )
         assert self.message_results == [{}]
+
+    @unittest_run_loop
+    async def test_pooled_connection(self):
+        server_addr = f"ws://localhost:{self.server.port}"
+        transport = WsTransport()
+        async with transport:
+            for _ in range(3):
+                await asyncio.wait_for(
+                    transport.handle_message(self.context, "{}", server_addr), 5.0
+                )
+            assert server_addr in transport.connections
+            await asyncio.sleep(0.05)
+            assert self.message_results == [{}] * 3
+            assert self.connection_count == 1
+
+            # reconnect after the server closes the connection
+            await self.server_sockets[0].close()
+            await asyncio.sleep(0.05)
+            await transport.handle_message(self.context, "{}", server_addr)
+            await asyncio.sleep(0.05)
+            assert len(self.message_results) == 4
+            assert self.connection_count == 2
+        assert not transport.connections
+
+    @unittest_run_loop
+    async def test_idle_timeout(self):
+        server_addr = f"ws://localhost:{self.server.port}"
+        transport = WsTransport()
+        transport.settings = {"transport.ws_idle_timeout": 0.05}
+        async with transport:
+            await transport.handle_message(self.context, "{}", server_addr)
+            connection = transport.connections[server_addr]
+            await asyncio.sleep(0.2)
+            assert not transport.connections
+            assert connection.ws.closed
+
+    @unittest_run_loop
+    async def test_return_route(self):
+        server_addr = f"ws://localhost:{self.server.port}"
+        session = async_mock.MagicMock(
+            receive=async_mock.CoroutineMock(),
+            wait_response=async_mock.CoroutineMock(side_effect=[b'{"a": 1}', None]),
+        )
+        transport = WsTransport()
+        transport.settings = {"transport.ws_return_route": True}
+        transport.create_inbound_session = async_mock.CoroutineMock(
+            return_value=session
+        )
+        async with transport:
+            await transport.handle_message(
+                self.context, json.dumps({"reply": True}), server_addr
+            )
+            await asyncio.sleep(0.05)
+            transport.create_inbound_session.assert_awaited_once()
+            session.receive.assert_awaited_once_with(json.dumps({"reply": False}))
+            assert self.message_results == [{"a": 1}, {"reply": True}]
+        session.close.assert_called_once_with()
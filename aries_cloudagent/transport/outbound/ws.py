@@ -1,25 +1,80 @@
 """Websockets outbound transport."""
 
+import asyncio
 import logging
+import time
 from typing import Union
 
-from aiohttp import ClientSession, DummyCookieJar
+from aiohttp import (
+    ClientError,
+    ClientSession,
+    ClientWebSocketResponse,
+    DummyCookieJar,
+    WSMsgType,
+)
 
 from ...config.injection_context import InjectionContext
 
 from .base import BaseOutboundTransport
 
+DEFAULT_IDLE_TIMEOUT = 30.0
+DEFAULT_HEARTBEAT = 15.0
+
+
+class PooledWebSocket:
+    """Class representing an open websocket connection to an endpoint."""
+
+    def __init__(self, endpoint: str):
+        """Initialize the pooled websocket."""
+        self.endpoint = endpoint
+        self.last_used = time.perf_counter()
+        self.lock = asyncio.Lock()
+        self.opening: asyncio.Task = None
+        self.reader: asyncio.Task = None
+        self.ws: ClientWebSocketResponse = None
+
 
 class WsTransport(BaseOutboundTransport):
-    """Websockets outbound transport class."""
+    """
+    Websockets outbound transport class.
+
+    Connections are kept open and reused for further messages to the same
+    endpoint, until they have been idle for the configured timeout. Open
+    connections are kept alive with pings, and a connection found closed when
+    sending is reopened once. Messages received on an open connection are
+    discarded unless return routing is enabled, in which case they are passed
+    to an inbound session and responses are sent back on the same connection.
+    """
 
     schemes = ("ws", "wss")
 
     def __init__(self) -> None:
         """Initialize an `WsTransport` instance."""
         super(WsTransport, self).__init__()
+        self.client_session: ClientSession = None
+        self.connections = {}
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def idle_timeout(self) -> float:
+        """Accessor for the number of seconds to keep an idle connection open."""
+        idle_timeout = self.settings.get("transport.ws_idle_timeout")
+        return DEFAULT_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+
+    @property
+    def heartbeat(self) -> float:
+        """Accessor for the number of seconds between pings on a connection."""
+        heartbeat = self.settings.get("transport.ws_heartbeat")
+        return DEFAULT_HEARTBEAT if heartbeat is None else heartbeat
+
+    @property
+    def return_route(self) -> bool:
+        """Accessor for the flag to receive messages on pooled connections."""
+        return bool(
+            self.settings.get("transport.ws_return_route")
+            and self.create_inbound_session
+        )
+
     async def start(self):
         """Start the outbound transport."""
         self.client_session = ClientSession(cookie_jar=DummyCookieJar())
@@ -27,6 +82,8 @@ class WsTransport(BaseOutboundTransport):
 
     async def stop(self):
         """Stop the outbound transport."""
+        for connection in list(self.connections.values()):
+            await self.close_connection(connection)
         await self.client_session.close()
         self.client_session = None
 
@@ -41,9 +98,155 @@ class WsTransport(BaseOutboundTransport):
             payload: message payload in string or byte format
             endpoint: URI endpoint for delivery
         """
-        # aiohttp should automatically handle websocket sessions
-        async with self.client_session.ws_connect(endpoint) as ws:
+        connection = self.connections.get(endpoint)
+        if connection and connection.ws and connection.ws.closed:
+            connection = None
+        # a connection still being opened is shared, but not reopened on failure
+        reused = bool(connection and connection.ws)
+        if not connection:
+            connection = self.open_connection(endpoint)
+        try:
+            await self.send(connection, payload)
+        except (ClientError, ConnectionError, RuntimeError):
+            if not reused:
+                raise
+            # the connection was closed by the other side, try a new one
+            self.logger.debug("Reconnecting websocket to %s", endpoint)
+            await self.close_connection(connection)
+            await self.send(self.open_connection(endpoint), payload)
+
+    async def send(self, connection: PooledWebSocket, payload: Union[str, bytes]):
+        """
+        Send a message over a pooled connection.
+
+        Args:
+            connection: The pooled connection
+            payload: message payload in string or byte format
+
+        """
+        # do not cancel opening the connection for other senders
+        await asyncio.shield(connection.opening)
+        connection.last_used = time.perf_counter()
+        async with connection.lock:
+            if connection.ws.closed:
+                raise ConnectionResetError("Websocket connection closed")
             if isinstance(payload, bytes):
-                await ws.send_bytes(payload)
+                await connection.ws.send_bytes(payload)
             else:
-                await ws.send_str(payload)
+                await connection.ws.send_str(payload)
+
+    def open_connection(self, endpoint: str) -> PooledWebSocket:
+        """
+        Start opening a pooled connection to an endpoint.
+
+        Args:
+            endpoint: URI endpoint for delivery
+
+        Returns:
+            The pooled connection, which is ready once its `opening` task completes
+
+        """
+        connection = PooledWebSocket(endpoint)
+        connection.opening = asyncio.get_event_loop().create_task(
+            self._connect(connection)
+        )
+        self.connections[endpoint] = connection
+        return connection
+
+    async def _connect(self, connection: PooledWebSocket):
+        """Open the websocket for a pooled connection."""
+        try:
+            connection.ws = await self.client_session.ws_connect(
+                connection.endpoint, heartbeat=self.heartbeat or None
+            )
+        except Exception:
+            self._discard(connection)
+            raise
+        loop = asyncio.get_event_loop()
+        connection.reader = loop.create_task(self._read(connection))
+        if self.idle_timeout:
+            loop.call_later(self.idle_timeout, self._check_idle, connection)
+
+    def _check_idle(self, connection: PooledWebSocket):
+        """Close a pooled connection if it has not been used recently."""
+        if self.connections.get(connection.endpoint) is not connection:
+            return
+        remaining = connection.last_used + self.idle_timeout - time.perf_counter()
+        if remaining > 0 or connection.lock.locked():
+            asyncio.get_event_loop().call_later(
+                max(remaining, 0.1), self._check_idle, connection
+            )
+        else:
+            self.logger.debug("Closing idle websocket to %s", connection.endpoint)
+            asyncio.get_event_loop().create_task(self.close_connection(connection))
+
+    async def _read(self, connection: PooledWebSocket):
+        """Receive messages on a pooled connection until it is closed."""
+        session = None
+        responder = None
+        try:
+            if self.return_route:
+                session = await self.create_inbound_session(
+                    "ws",
+                    can_respond=True,
+                    client_info={"endpoint": connection.endpoint},
+                )
+                responder = asyncio.get_event_loop().create_task(
+                    self._respond(connection, session)
+                )
+            # receiving also answers pings and detects a missing pong
+            async for msg in connection.ws:
+                if msg.type in (WSMsgType.TEXT, WSMsgType.BINARY):
+                    connection.last_used = time.perf_counter()
+                    if session:
+                        await session.receive(msg.data)
+                    else:
+                        self.logger.debug(
+                            "Discarding message received from %s", connection.endpoint
+                        )
+                elif msg.type == WSMsgType.ERROR:
+                    self.logger.error(
+                        "Websocket connection closed with exception: %s",
+                        connection.ws.exception(),
+                    )
+        except Exception:
+            self.logger.exception("Error receiving on websocket connection")
+        finally:
+            if session:
+                session.close()
+            if responder:
+                await responder
+            self._discard(connection)
+
+    async def _respond(self, connection: PooledWebSocket, session):
+        """Send the responses of an inbound session over a pooled connection."""
+        while True:
+            response = await session.wait_response()
+            if response is None:
+                break
+            try:
+                await self.send(connection, response)
+            except (ClientError, ConnectionError, RuntimeError):
+                break
+            session.clear_response()
+
+    def _discard(self, connection: PooledWebSocket):
+        """Remove a connection from the pool."""
+        if self.connections.get(connection.endpoint) is connection:
+            del self.connections[connection.endpoint]
+
+    async def close_connection(self, connection: PooledWebSocket):
+        """
+        Close a pooled connection and remove it from the pool.
+
+        Args:
+            connection: The pooled connection
+
+        """
+        self._discard(connection)
+        if connection.opening and not connection.opening.done():
+            connection.opening.cancel()
+        if connection.ws:
+            await connection.ws.close()
+        if connection.reader:
+            await connection.reader
@@ -2,12 +2,13 @@
 
 import json
 import logging
+import uuid
 from typing import Sequence, Tuple, Union
 
 from ..config.base import InjectorError
 from ..config.injection_context import InjectionContext
 
-from ..protocols.routing.v1_0.messages.forward import Forward
+from ..protocols.routing.v1_0.message_types import FORWARD
 
 from ..messaging.util import time_now
 from ..utils.task_queue import TaskQueue
@@ -20,6 +21,30 @@ from .wire_format import BaseWireFormat
 
 LOGGER = logging.getLogger(__name__)
 
+FORWARD_TEMPLATE = (
+    '{"@type": %s, "@id": "%%s", "to": %%s, "msg": %%s}' % json.dumps(FORWARD)
+)
+
+
+def forward_json(to: str, message: Union[str, bytes]) -> str:
+    """
+    Build the JSON of a forward message wrapping an already packed message.
+
+    This produces the same message as serializing a `Forward` instance, without
+    parsing the packed message or a schema round trip.
+
+    Args:
+        to: The verkey of the next recipient of the packed message
+        message: The packed message JSON
+
+    Returns:
+        The forward message JSON
+
+    """
+    if isinstance(message, bytes):
+        message = message.decode("utf-8")
+    return FORWARD_TEMPLATE % (uuid.uuid4(), json.dumps(to), message)
+
 
 class PackWireFormat(BaseWireFormat):
     """Standard DIDComm message parser and serializer."""
@@ -153,6 +178,44 @@ class PackWireFormat(BaseWireFormat):
             message = message_json
         return message
 
+    async def encode_messages(
+        self,
+        context: InjectionContext,
+        messages_json: Sequence[Union[str, bytes]],
+        recipient_keys: Sequence[str],
+        routing_keys: Sequence[str],
+        sender_key: str,
+    ) -> Sequence[Union[str, bytes]]:
+        """
+        Encode outgoing messages for the same recipients for transport.
+
+        The messages are packed together in one wallet call for each layer of
+        the envelope.
+
+        Args:
+            context: The injection context for settings and services
+            messages_json: The message bodies to serialize
+            recipient_keys: A sequence of recipient verkeys
+            routing_keys: A sequence of routing verkeys
+            sender_key: The verification key of the sending agent
+
+        Returns:
+            The encoded messages, in order
+
+        Raises:
+            MessageEncodeError: If the messages could not be encoded
+
+        """
+
+        if sender_key and recipient_keys:
+            pack = self.pack_batch(
+                context, messages_json, recipient_keys, routing_keys, sender_key
+            )
+            messages = await (self.task_queue and self.task_queue.run(pack) or pack)
+        else:
+            messages = list(messages_json)
+        return messages
+
     async def pack(
         self,
         context: InjectionContext,
@@ -179,12 +242,46 @@ class PackWireFormat(BaseWireFormat):
         if routing_keys:
             recip_keys = recipient_keys
             for router_key in routing_keys:
-                message = json.loads(message.decode("utf-8"))
-                fwd_msg = Forward(to=recip_keys[0], msg=message)
+                fwd_msg = forward_json(recip_keys[0], message)
                 # Forwards are anon packed
                 recip_keys = [router_key]
                 try:
-                    message = await wallet.pack_message(fwd_msg.to_json(), recip_keys)
+                    message = await wallet.pack_message(fwd_msg, recip_keys)
                 except WalletError as e:
                     raise MessageEncodeError("Forward message pack failed") from e
         return message
+
+    async def pack_batch(
+        self,
+        context: InjectionContext,
+        messages_json: Sequence[Union[str, bytes]],
+        recipient_keys: Sequence[str],
+        routing_keys: Sequence[str],
+        sender_key: str,
+    ):
+        """Look up the wallet instance and pack messages for the same recipients."""
+        if not sender_key or not recipient_keys:
+            raise MessageEncodeError("Cannot pack message without associated keys")
+
+        wallet: BaseWallet = await context.inject(BaseWallet, required=False)
+        if not wallet:
+            raise MessageEncodeError("No wallet instance")
+
+        try:
+            messages = await wallet.pack_messages(
+                messages_json, recipient_keys, sender_key
+            )
+        except WalletError as e:
+            raise MessageEncodeError("Message pack failed") from e
+
+        if routing_keys:
+            recip_keys = recipient_keys
+            for router_key in routing_keys:
+                fwd_msgs = [forward_json(recip_keys[0], message) for message in messages]
+                # Forwards are anon packed
+                recip_keys = [router_key]
+                try:
+                    messages = await wallet.pack_messages(fwd_msgs, recip_keys)
+                except WalletError as e:
+                    raise MessageEncodeError("Forward message pack failed") from e
+        return messages
@@ -2,6 +2,8 @@
 
 from abc import ABC, abstractmethod
 import asyncio
+import base64
+from typing import Sequence, Tuple, Union
 
 
 class BaseMessageQueue(ABC):
@@ -61,3 +63,69 @@ class BaseMessageQueue(ABC):
         except asyncio.CancelledError:
             raise StopAsyncIteration
         return message
+
+
+class BasePersistentQueue(ABC):
+    """
+    Abstract persistent queue class.
+
+    Entries are added and acknowledged without waiting, and written to durable
+    storage in batches. Entries which have been written but not acknowledged
+    are returned when the queue is next opened, including after a restart.
+    """
+
+    @abstractmethod
+    async def open(self) -> Sequence[Tuple[str, dict]]:
+        """
+        Open the queue.
+
+        Returns:
+            A list of (key, entry) tuples for the unacknowledged entries, in the
+            order they were added
+
+        """
+
+    @abstractmethod
+    def add(self, entry: dict) -> str:
+        """
+        Add an entry to the queue.
+
+        Args:
+            entry: A JSON-serializable dict
+
+        Returns:
+            The key used to acknowledge the entry
+
+        """
+
+    @abstractmethod
+    def ack(self, key: str):
+        """
+        Acknowledge an entry, removing it from the queue.
+
+        Args:
+            key: The key returned when the entry was added
+
+        """
+
+    @abstractmethod
+    async def flush(self):
+        """Wait for pending additions and acknowledgements to be written."""
+
+    @abstractmethod
+    async def close(self):
+        """Flush pending writes and close the queue."""
+
+
+def encode_payload(payload: Union[str, bytes, None]):
+    """Encode a message payload for a persistent queue entry."""
+    if isinstance(payload, bytes):
+        return {"b64": base64.b64encode(payload).decode("ascii")}
+    return payload
+
+
+def decode_payload(value) -> Union[str, bytes, None]:
+    """Decode a message payload from a persistent queue entry."""
+    if isinstance(value, dict):
+        return base64.b64decode(value["b64"])
+    return value
@@ -0,0 +1,284 @@
+"""Persistent queue stored as an append-only segment log."""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+
+from collections import OrderedDict
+from typing import Sequence, Tuple
+
+from .base import BasePersistentQueue
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_DELAY = 0.005
+DEFAULT_RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 30.0
+DEFAULT_SEGMENT_SIZE = 4 * 1024 * 1024
+SEGMENT_SUFFIX = ".log"
+
+
+class SegmentLogQueue(BasePersistentQueue):
+    """
+    Persistent queue stored as a directory of append-only log segments.
+
+    Each line of a segment records either an added entry or the key of an
+    acknowledged entry. Writes are collected for `flush_delay` seconds and
+    written in a single batch followed by one fsync. An entry acknowledged
+    before its batch is written is never written at all. Once a segment grows
+    past `max_segment_size` a new segment is started. Older segments are
+    deleted when all of their entries have been acknowledged. Opening the
+    queue replays the segments and compacts the remaining entries into a new
+    segment.
+
+    The directory and segments are only accessible to the owner. A batch which
+    cannot be written is retried with increasing delays, resuming from the step
+    which failed, so acknowledged changes are never dropped. Closing the queue
+    raises the error if the pending changes still cannot be written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        flush_delay: float = DEFAULT_FLUSH_DELAY,
+        max_segment_size: int = DEFAULT_SEGMENT_SIZE,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+    ):
+        """
+        Initialize a `SegmentLogQueue` instance.
+
+        Args:
+            path: The directory containing the log segments
+            flush_delay: The number of seconds to collect writes before a flush
+            max_segment_size: The size in bytes at which a new segment is started
+            retry_delay: The number of seconds to wait before retrying a failed
+                write, doubled after each failure
+
+        """
+        self.path = path
+        self.flush_delay = flush_delay
+        self.max_segment_size = max_segment_size
+        self.retry_delay = retry_delay
+        self._added = OrderedDict()
+        self._acked = OrderedDict()
+        self._batch = None
+        self._closing = False
+        self._file = None
+        self._flush_task: asyncio.Task = None
+        self._key_segment = {}
+        self._segment = None
+        self._segment_keys = OrderedDict()
+        self._segment_size = 0
+        self._torn = False
+
+    def _segment_path(self, segment: int) -> str:
+        """Get the file path of a segment."""
+        return os.path.join(self.path, f"{segment:012d}{SEGMENT_SUFFIX}")
+
+    def _list_segments(self) -> Sequence[int]:
+        """List the numbers of the existing segments, in order."""
+        return sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.path)
+            if name.endswith(SEGMENT_SUFFIX) and name[: -len(SEGMENT_SUFFIX)].isdigit()
+        )
+
+    def _replay(self) -> Sequence[Tuple[str, dict]]:
+        """Read the existing segments and compact the remaining entries."""
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        segments = self._list_segments()
+        entries = OrderedDict()
+        for segment in segments:
+            with open(self._segment_path(segment), "rb") as segment_file:
+                for line in segment_file:
+                    if not line.strip():
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        # a torn write from an interrupted flush
+                        LOGGER.warning("Skipping invalid line in outbound queue log")
+                        continue
+                    if "a" in row:
+                        entries.pop(row["a"], None)
+                    else:
+                        entries[row["k"]] = row["e"]
+
+        self._segment = (segments[-1] + 1) if segments else 0
+        self._segment_keys[self._segment] = set()
+        self._open_segment(self._segment)
+        if entries:
+            self._write_lines(
+                json.dumps({"k": key, "e": entry}) for key, entry in entries.items()
+            )
+            for key in entries:
+                self._key_segment[key] = self._segment
+                self._segment_keys[self._segment].add(key)
+        for segment in segments:
+            os.remove(self._segment_path(segment))
+        return list(entries.items())
+
+    def _open_segment(self, segment: int):
+        """Open a segment file for appending."""
+        if self._file:
+            self._file.close()
+            self._file = None
+        self._file = open(
+            self._segment_path(segment),
+            "ab",
+            opener=lambda path, flags: os.open(path, flags, 0o600),
+        )
+        self._segment_size = self._file.tell()
+        self._torn = False
+
+    def _write_lines(self, lines):
+        """Append lines to the current segment and sync them to disk."""
+        data = "".join(line + "\n" for line in lines).encode("utf-8")
+        if self._torn:
+            # end any partial line left by a failed write
+            data = b"\n" + data
+        self._torn = True
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._torn = False
+        self._segment_size += len(data)
+
+    def _write_batch(self, batch: list):
+        """
+        Write a batch of lines, then start a new segment and remove old ones.
+
+        The batch is a list of the lines, the segment to start and the segments
+        to remove. It is updated as each step completes, so a batch which failed
+        can be written again from the failed step.
+        """
+        lines, rotate, remove = batch
+        if lines:
+            self._write_lines(lines)
+            batch[0] = None
+        if rotate is not None:
+            self._open_segment(rotate)
+            batch[1] = None
+        while remove:
+            try:
+                os.remove(self._segment_path(remove[0]))
+            except FileNotFoundError:
+                pass
+            remove.pop(0)
+
+    async def open(self) -> Sequence[Tuple[str, dict]]:
+        """
+        Open the queue.
+
+        Returns:
+            A list of (key, entry) tuples for the unacknowledged entries, in the
+            order they were added
+
+        """
+        return await asyncio.get_event_loop().run_in_executor(None, self._replay)
+
+    def add(self, entry: dict) -> str:
+        """
+        Add an entry to the queue.
+
+        Args:
+            entry: A JSON-serializable dict
+
+        Returns:
+            The key used to acknowledge the entry
+
+        """
+        key = uuid.uuid4().hex
+        self._added[key] = json.dumps({"k": key, "e": entry})
+        self._schedule_flush()
+        return key
+
+    def ack(self, key: str):
+        """
+        Acknowledge an entry, removing it from the queue.
+
+        Args:
+            key: The key returned when the entry was added
+
+        """
+        if self._added.pop(key, None) is None and key in self._key_segment:
+            self._acked[key] = None
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Start the flush task if it is not already running."""
+        if not self._flush_task or self._flush_task.done():
+            self._flush_task = asyncio.get_event_loop().create_task(self._flush_loop())
+
+    def _next_batch(self) -> list:
+        """Collect the pending changes into a batch to write."""
+        added, acked = self._added, self._acked
+        self._added, self._acked = OrderedDict(), OrderedDict()
+        lines = list(added.values())
+        lines.extend(json.dumps({"a": key}) for key in acked)
+        for key in added:
+            self._key_segment[key] = self._segment
+            self._segment_keys[self._segment].add(key)
+        for key in acked:
+            self._segment_keys[self._key_segment.pop(key)].discard(key)
+        rotate = None
+        if self._segment_size + sum(map(len, lines)) >= self.max_segment_size:
+            rotate = self._segment = self._segment + 1
+            self._segment_keys[rotate] = set()
+        # only a prefix of the segments may be removed, as an acknowledgement
+        # must be kept for as long as the segment containing its entry
+        remove = []
+        for segment, keys in self._segment_keys.items():
+            if keys or segment == self._segment:
+                break
+            remove.append(segment)
+        for segment in remove:
+            del self._segment_keys[segment]
+        return [lines, rotate, remove]
+
+    async def _flush_loop(self):
+        """Write batches of pending changes until none remain."""
+        loop = asyncio.get_event_loop()
+        failures = 0
+        while self._batch or self._added or self._acked:
+            if not self._batch:
+                if self.flush_delay:
+                    await asyncio.sleep(self.flush_delay)
+                self._batch = self._next_batch()
+            try:
+                await loop.run_in_executor(None, self._write_batch, self._batch)
+            except OSError:
+                if self._closing:
+                    raise
+                delay = min(self.retry_delay * 2 ** failures, MAX_RETRY_DELAY)
+                failures += 1
+                LOGGER.exception(
+                    "Error writing persistent queue log, retrying in %.1f seconds",
+                    delay,
+                )
+                await asyncio.sleep(delay)
+            else:
+                self._batch = None
+                failures = 0
+
+    async def flush(self):
+        """Wait for pending additions and acknowledgements to be written."""
+        if self._flush_task:
+            await self._flush_task
+
+    async def close(self):
+        """
+        Flush pending writes and close the queue.
+
+        Raises:
+            OSError: If the pending writes could not be written
+
+        """
+        self._closing = True
+        await self.flush()
+        if self._file:
+            self._file.close()
+            self._file = None
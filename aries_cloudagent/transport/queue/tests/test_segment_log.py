@@ -0,0 +1,138 @@
+import os
+import stat
+
+from tempfile import TemporaryDirectory
+
+from asynctest import TestCase as AsyncTestCase, mock as async_mock
+
+from ..segment_log import SegmentLogQueue
+
+
+class TestSegmentLogQueue(AsyncTestCase):
+    async def test_replay(self):
+        with TemporaryDirectory() as path:
+            queue = SegmentLogQueue(path)
+            assert await queue.open() == []
+            keys = [queue.add({"n": n}) for n in range(5)]
+            await queue.flush()
+            queue.ack(keys[1])
+            queue.ack(keys[3])
+            queue.ack(keys[3])
+            queue.ack("unknown")
+            await queue.close()
+
+            queue = SegmentLogQueue(path)
+            assert await queue.open() == [
+                (keys[0], {"n": 0}),
+                (keys[2], {"n": 2}),
+                (keys[4], {"n": 4}),
+            ]
+            # the remaining entries are compacted into a single segment
+            assert len(os.listdir(path)) == 1
+            queue.ack(keys[0])
+            await queue.close()
+
+            queue = SegmentLogQueue(path)
+            assert [key for key, _ in await queue.open()] == [keys[2], keys[4]]
+            await queue.close()
+
+    async def test_ack_before_flush(self):
+        with TemporaryDirectory() as path:
+            queue = SegmentLogQueue(path, flush_delay=0.05)
+            await queue.open()
+            key = queue.add({"n": 0})
+            queue.ack(key)
+            kept = queue.add({"n": 1})
+            await queue.close()
+            with open(os.path.join(path, os.listdir(path)[0])) as segment:
+                lines = segment.readlines()
+            assert len(lines) == 1 and kept in lines[0]
+
+    async def test_segments(self):
+        with TemporaryDirectory() as path:
+            queue = SegmentLogQueue(path, flush_delay=0, max_segment_size=200)
+            await queue.open()
+            first = queue.add({"n": 0})
+            await queue.flush()
+            keys = []
+            for n in range(1, 20):
+                keys.append(queue.add({"n": n}))
+                await queue.flush()
+            assert len(os.listdir(path)) > 2
+            # the first segment holds an unacknowledged entry
+            for key in keys:
+                queue.ack(key)
+                await queue.flush()
+            assert len(os.listdir(path)) > 2
+            queue.ack(first)
+            await queue.flush()
+            for n in range(3):
+                queue.add({"n": n})
+                await queue.flush()
+            assert len(os.listdir(path)) <= 2
+            await queue.close()
+
+            queue = SegmentLogQueue(path)
+            assert [entry for _, entry in await queue.open()] == [
+                {"n": n} for n in range(3)
+            ]
+            await queue.close()
+
+    async def test_torn_write(self):
+        with TemporaryDirectory() as path:
+            queue = SegmentLogQueue(path)
+            await queue.open()
+            key = queue.add({"n": 0})
+            await queue.close()
+            with open(os.path.join(path, os.listdir(path)[0]), "a") as segment:
+                segment.write('{"k": "partial", "e": {"n"')
+
+            queue = SegmentLogQueue(path)
+            assert await queue.open() == [(key, {"n": 0})]
+            await queue.close()
+
+    async def test_permissions(self):
+        with TemporaryDirectory() as parent:
+            path = os.path.join(parent, "queue")
+            queue = SegmentLogQueue(path)
+            await queue.open()
+            queue.add({"n": 0})
+            await queue.close()
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+            for name in os.listdir(path):
+                mode = os.stat(os.path.join(path, name)).st_mode
+                assert stat.S_IMODE(mode) == 0o600
+
+    async def test_write_retry(self):
+        fsync = os.fsync
+        failures = [OSError("disk full")]
+
+        def fail_fsync(fd):
+            if failures:
+                raise failures.pop()
+            fsync(fd)
+
+        with TemporaryDirectory() as path:
+            queue = SegmentLogQueue(path, flush_delay=0, retry_delay=0.01)
+            await queue.open()
+            with async_mock.patch.object(os, "fsync", fail_fsync):
+                keys = [queue.add({"n": n}) for n in range(2)]
+                await queue.flush()
+                queue.ack(keys[0])
+                await queue.close()
+            assert not failures
+
+            queue = SegmentLogQueue(path)
+            assert await queue.open() == [(keys[1], {"n": 1})]
+            await queue.close()
+
+    async def test_write_error_on_close(self):
+        with TemporaryDirectory() as path:
+            queue = SegmentLogQueue(path, flush_delay=0, retry_delay=0.01)
+            await queue.open()
+            with async_mock.patch.object(
+                os, "fsync", async_mock.MagicMock(side_effect=OSError("disk full"))
+            ):
+                queue.add({"n": 0})
+                with self.assertRaises(OSError):
+                    await queue.close()
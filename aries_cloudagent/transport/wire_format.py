@@ -67,6 +67,38 @@ class BaseWireFormat:
 
         """
 
+    async def encode_messages(
+        self,
+        context: InjectionContext,
+        messages_json: Sequence[Union[str, bytes]],
+        recipient_keys: Sequence[str],
+        routing_keys: Sequence[str],
+        sender_key: str,
+    ) -> Sequence[Union[str, bytes]]:
+        """
+        Encode outgoing messages for the same recipients for transport.
+
+        Args:
+            context: The injection context for settings and services
+            messages_json: The message bodies to serialize
+            recipient_keys: A sequence of recipient verkeys
+            routing_keys: A sequence of routing verkeys
+            sender_key: The verification key of the sending agent
+
+        Returns:
+            The encoded messages, in order
+
+        Raises:
+            MessageEncodeError: If the messages could not be encoded
+
+        """
+        return [
+            await self.encode_message(
+                context, message_json, recipient_keys, routing_keys, sender_key
+            )
+            for message_json in messages_json
+        ]
+
 
 class JsonWireFormat(BaseWireFormat):
     """Unencrypted wire format."""
@@ -0,0 +1,153 @@
+"""Pagination and streaming support for admin record list endpoints."""
+
+import json
+import logging
+
+from typing import Callable, Type
+
+from aiohttp import web
+from marshmallow import fields, Schema, validate
+
+from ..messaging.models.base import BaseModelError
+from ..messaging.models.base_record import BaseRecord, decode_query_cursor
+from ..storage.error import StorageError
+
+
+LOGGER = logging.getLogger(__name__)
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+class PaginatedQueryStringSchema(Schema):
+    """
+    Query string parameters for paginated and streamed record lists.
+
+    This is to be used as a superclass for the query string schemas of aca-py
+    admin list endpoints.
+    """
+
+    limit = fields.Int(
+        description="Maximum number of records to return in a page",
+        required=False,
+        validate=validate.Range(min=1),
+        example=100,
+    )
+    cursor = fields.Str(
+        description="Opaque cursor returned as next_cursor with the previous page",
+        required=False,
+    )
+    stream = fields.Boolean(
+        description="Stream all matching records as newline-delimited JSON",
+        required=False,
+        default=False,
+    )
+
+
+class PaginatedResultSchema(Schema):
+    """
+    Result schema including a cursor for the next page of results.
+
+    This is to be used as a superclass for the result schemas of aca-py admin
+    list endpoints.
+    """
+
+    next_cursor = fields.Str(
+        description="Cursor for the next page of results, absent on the last page",
+        required=False,
+    )
+
+
+async def record_list_response(
+    request: web.BaseRequest,
+    record_cls: Type[BaseRecord],
+    tag_filter: dict = None,
+    post_filter: dict = None,
+    sort_key: Callable = None,
+) -> web.StreamResponse:
+    """
+    Build the response for an admin record list request.
+
+    Without paging parameters all matching records are returned, sorted by
+    `sort_key` if given. When `limit` or `cursor` is present a single page of
+    results is returned in storage order, along with the cursor for the next
+    page. When `stream` is true all matching records from the cursor onwards
+    are written as they are read from storage, one JSON document per line.
+
+    Args:
+        request: aiohttp request object
+        record_cls: The `BaseRecord` subclass to query
+        tag_filter: The tag filter to apply
+        post_filter: Additional value filters to apply after retrieval
+        sort_key: The sort key for unpaginated results
+
+    Returns:
+        The list response
+
+    """
+    context = request.app["request_context"]
+    try:
+        limit = int(request.query["limit"]) if request.query.get("limit") else None
+    except ValueError as err:
+        raise web.HTTPBadRequest(reason="Invalid limit") from err
+    cursor = request.query.get("cursor") or None
+    stream = request.query.get("stream", "false").lower() == "true"
+
+    if stream:
+        return await _stream_records(
+            request, record_cls, tag_filter, post_filter, cursor
+        )
+
+    try:
+        if limit or cursor:
+            records, next_cursor = await record_cls.query_page(
+                context, tag_filter, post_filter, limit=limit, cursor=cursor
+            )
+        else:
+            records = await record_cls.query(context, tag_filter, post_filter)
+            next_cursor = None
+        results = [record.serialize(trusted=True) for record in records]
+        if sort_key and not (limit or cursor):
+            results.sort(key=sort_key)
+    except (StorageError, BaseModelError) as err:
+        raise web.HTTPBadRequest(reason=err.roll_up) from err
+
+    response = {"results": results}
+    if next_cursor:
+        response["next_cursor"] = next_cursor
+    return web.json_response(response)
+
+
+async def _stream_records(
+    request: web.BaseRequest,
+    record_cls: Type[BaseRecord],
+    tag_filter: dict,
+    post_filter: dict,
+    cursor: str,
+) -> web.StreamResponse:
+    """Write matching records to a newline-delimited JSON response."""
+    context = request.app["request_context"]
+    try:
+        offset, after_id = decode_query_cursor(cursor)
+    except StorageError as err:
+        raise web.HTTPBadRequest(reason=err.roll_up) from err
+    response = web.StreamResponse(headers={"Content-Type": NDJSON_CONTENT_TYPE})
+    records = record_cls.iter_query(
+        context, tag_filter, post_filter, offset=offset, after_id=after_id
+    )
+    try:
+        async for (_, record) in records:
+            line = json.dumps(record.serialize(trusted=True)) + "\n"
+            if not response.prepared:
+                await response.prepare(request)
+            await response.write(line.encode())
+    except (StorageError, BaseModelError) as err:
+        if not response.prepared:
+            raise web.HTTPBadRequest(reason=err.roll_up) from err
+        # headers are already sent, so the error can only end the stream
+        LOGGER.exception("Error streaming %s records", record_cls.__name__)
+    finally:
+        await records.aclose()
+    if not response.prepared:
+        await response.prepare(request)
+    await response.write_eof()
+    return response
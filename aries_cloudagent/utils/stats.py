@@ -1,5 +1,6 @@
 """Classes for tracking performance and timing."""
 
+import bisect
 import functools
 import inspect
 import time
@@ -29,6 +30,11 @@ class Stats:
             self.min_time[name] = duration
             self.total_time[name] = duration
 
+    def remove(self, name: str):
+        """Remove an entry from the stats, if present."""
+        for values in (self.counts, self.max_time, self.min_time, self.total_time):
+            values.pop(name, None)
+
     def extract(self, names: Sequence[str] = None) -> dict:
         """Summarize the stats in a dictionary."""
         counts = self.counts.copy()
@@ -58,6 +64,39 @@ class Stats:
         }
 
 
+class Histogram:
+    """A count of values, such as durations or queue depths, by upper bound."""
+
+    DEFAULT_BOUNDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+    def __init__(self, bounds: Sequence[float] = None):
+        """
+        Initialize the Histogram instance.
+
+        Args:
+            bounds: The sorted upper bounds of the buckets, beyond the last of
+                which values are counted in a final bucket
+
+        """
+        self.bounds = tuple(bounds or self.DEFAULT_BOUNDS)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total_time = 0.0
+
+    def log(self, value: float):
+        """Add a value to the histogram."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total_time += value
+
+    def extract(self) -> dict:
+        """Summarize the histogram in a dictionary."""
+        return {
+            "bounds": list(self.bounds),
+            "counts": list(self.counts),
+            "count": sum(self.counts),
+            "total": self.total_time,
+        }
+
+
 class Timer:
     """Timer instance for a running task."""
 
@@ -133,6 +172,11 @@ class Collector:
                     start = time.perf_counter() - duration
                 self._log_file.write(f"{name} {start:.5f} {duration:.5f}\n")
 
+    def remove(self, *names):
+        """Remove entries from the statistics, such as those of a released resource."""
+        for name in names:
+            self._stats.remove(name)
+
     def mark(self, *names):
         """Make a custom decorator function for adding to the set of groups."""
         return lambda fn: self(fn, names)
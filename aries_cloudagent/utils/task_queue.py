@@ -1,9 +1,14 @@
 """Classes for managing a set of asyncio tasks."""
 
 import asyncio
+import heapq
+import itertools
 import logging
 import time
-from typing import Callable, Coroutine, Tuple
+from collections import deque
+from typing import Callable, Coroutine, Dict, Hashable, Sequence, Tuple
+
+from .stats import Histogram
 
 LOGGER = logging.getLogger(__name__)
 
@@ -65,6 +70,8 @@ class PendingTask:
         ident: str = None,
         task_future: asyncio.Future = None,
         queued_time: float = None,
+        priority: int = 0,
+        key: Hashable = None,
     ):
         """
         Initialize the pending task.
@@ -75,12 +82,16 @@ class PendingTask:
             ident: A string identifier for the task
             task_future: A future to be resolved to the asyncio Task
             queued_time: When the pending task was added to the queue
+            priority: The priority of the task, higher priorities run first
+            key: A key identifying tasks which must not run concurrently
         """
         if not asyncio.iscoroutine(coro):
             raise ValueError(f"Expected coroutine, got {coro}")
         self._cancelled = False
         self.complete_hook = complete_hook
         self.coro = coro
+        self.key = key
+        self.priority = priority
         self.queued_time: float = queued_time
         self.unqueued_time: float = None
         self.ident = ident or coro_ident(coro)
@@ -122,10 +133,31 @@ class PendingTask:
 
 
 class TaskQueue:
-    """A class for managing a set of asyncio tasks."""
+    """
+    A class for managing a set of asyncio tasks.
+
+    Pending tasks are started in order of priority, then in the order they were
+    added. When an aging interval is set, a pending task gains one level of
+    priority for each interval it has waited, so that tasks of a lower priority
+    are delayed by a bounded time rather than starved.
+
+    Active tasks are held in a set and pending tasks in a heap, so that adding
+    and completing a task does not depend on the number of tasks in the queue.
+    When the queue is timed, the time tasks wait to start is also counted in a
+    histogram for each priority.
+
+    Tasks added with a key run one at a time in the order they were added, while
+    tasks with different keys run concurrently up to the active limit. A keyed
+    task only enters the pending queue once the previous task with its key has
+    completed.
+    """
 
     def __init__(
-        self, max_active: int = 0, timed: bool = False, trace_fn: Callable = None
+        self,
+        max_active: int = 0,
+        timed: bool = False,
+        trace_fn: Callable = None,
+        aging: float = None,
     ):
         """
         Initialize the task queue.
@@ -134,16 +166,25 @@ class TaskQueue:
             max_active: The maximum number of tasks to automatically run
             timed: A flag indicating that timing should be collected for tasks
             trace_fn: A callback for all completed tasks
+            aging: The number of seconds after which a pending task is treated as
+                one priority level higher
         """
         self.loop = asyncio.get_event_loop()
-        self.active_tasks = []
+        self.active_tasks = set()
+        # a heap of (rank, sequence, PendingTask) entries
         self.pending_tasks = []
+        self.aging = aging
         self.timed = timed
+        self.wait_histograms: Dict[int, Histogram] = {}
+        # the tasks waiting behind the active or pending task for each key
+        self.keyed_tasks: Dict[Hashable, deque] = {}
+        self.keyed_waiting = 0
         self.total_done = 0
         self.total_failed = 0
         self.total_started = 0
         self._trace_fn = trace_fn
         self._cancelled = False
+        self._counter = itertools.count()
         self._drain_evt = asyncio.Event()
         self._drain_task: asyncio.Task = None
         self._max_active = max_active
@@ -164,7 +205,7 @@ class TaskQueue:
         return (
             not self._cancelled
             and not self._max_active
-            or self.current_size < self._max_active
+            or len(self.active_tasks) + len(self.pending_tasks) < self._max_active
         )
 
     @property
@@ -175,12 +216,12 @@ class TaskQueue:
     @property
     def current_pending(self) -> int:
         """Accessor for the current number of pending tasks in the queue."""
-        return len(self.pending_tasks)
+        return len(self.pending_tasks) + self.keyed_waiting
 
     @property
     def current_size(self) -> int:
         """Accessor for the total number of tasks in the queue."""
-        return len(self.active_tasks) + len(self.pending_tasks)
+        return len(self.active_tasks) + self.current_pending
 
     def __bool__(self) -> bool:
         """
@@ -220,13 +261,16 @@ class TaskQueue:
             while self.pending_tasks and (
                 not self._max_active or len(self.active_tasks) < self._max_active
             ):
-                pending: PendingTask = self.pending_tasks.pop(0)
+                pending: PendingTask = heapq.heappop(self.pending_tasks)[2]
                 if pending.queued_time:
                     pending.unqueued_time = time.perf_counter()
                     timing = {
                         "queued": pending.queued_time,
                         "unqueued": pending.unqueued_time,
                     }
+                    self.log_wait(
+                        pending.priority, pending.unqueued_time - pending.queued_time
+                    )
                 else:
                     timing = None
                 task = self.run(
@@ -236,11 +280,59 @@ class TaskQueue:
                     pending.task = task
                 except ValueError:
                     LOGGER.warning("Pending task future already fulfilled")
+                self._hold_key(pending, task)
             if self.pending_tasks:
                 await self._drain_evt.wait()
             else:
                 break
 
+    def _hold_key(self, pending: PendingTask, task: asyncio.Task):
+        """Start the next task with the same key once a keyed task is done."""
+        if pending.key is not None:
+            task.add_done_callback(lambda _: self._release_key(pending.key))
+
+    def _release_key(self, key: Hashable):
+        """Queue the next task waiting for a key, or release the key."""
+        waiting = self.keyed_tasks.get(key)
+        while waiting:
+            pending: PendingTask = waiting.popleft()
+            self.keyed_waiting -= 1
+            if self._cancelled:
+                pending.cancel()
+            elif not pending.cancelled:
+                self._start(pending)
+                return
+        self.keyed_tasks.pop(key, None)
+
+    def _start(self, pending: PendingTask):
+        """Run a new task if there is room in the queue, or else add it as pending."""
+        if self.ready:
+            if self.timed:
+                queued_time = pending.queued_time
+                self.log_wait(
+                    pending.priority,
+                    time.perf_counter() - queued_time if queued_time else 0.0,
+                )
+            pending.task = self.run(
+                pending.coro, pending.complete_hook, pending.ident
+            )
+            self._hold_key(pending, pending.task)
+        else:
+            self.add_pending(pending)
+
+    def log_wait(self, priority: int, duration: float):
+        """Count the time a task waited to start."""
+        if priority not in self.wait_histograms:
+            self.wait_histograms[priority] = Histogram()
+        self.wait_histograms[priority].log(duration)
+
+    def wait_stats(self) -> dict:
+        """Summarize the time tasks waited to start, by priority."""
+        return {
+            priority: histogram.extract()
+            for priority, histogram in sorted(self.wait_histograms.items())
+        }
+
     def add_pending(self, pending: PendingTask):
         """
         Add a task to the pending queue.
@@ -248,10 +340,20 @@ class TaskQueue:
         Args:
             pending: The `PendingTask` to add to the task queue
         """
+        heapq.heappush(self.pending_tasks, self._pending_entry(pending))
+        self.drain()
+
+    def _pending_entry(self, pending: PendingTask) -> tuple:
+        """Set the queue time of a pending task and build its heap entry."""
         if self.timed and not pending.queued_time:
             pending.queued_time = time.perf_counter()
-        self.pending_tasks.append(pending)
-        self.drain()
+        if self.aging:
+            # the key does not change as the task ages, keeping the heap valid
+            queued_time = pending.queued_time or time.perf_counter()
+            rank = queued_time - pending.priority * self.aging
+        else:
+            rank = -pending.priority
+        return (rank, next(self._counter), pending)
 
     def add_active(
         self,
@@ -269,7 +371,7 @@ class TaskQueue:
             ident: A string identifer for the task
             timing: An optional dictionary of timing information
         """
-        self.active_tasks.append(task)
+        self.active_tasks.add(task)
         task.add_done_callback(
             lambda fut: self.completed_task(task, task_complete, ident, timing)
         )
@@ -309,7 +411,12 @@ class TaskQueue:
         return self.add_active(task, task_complete, ident, timing)
 
     def put(
-        self, coro: Coroutine, task_complete: Callable = None, ident: str = None
+        self,
+        coro: Coroutine,
+        task_complete: Callable = None,
+        ident: str = None,
+        priority: int = 0,
+        key: Hashable = None,
     ) -> PendingTask:
         """
         Add a new task to the queue, delaying execution if busy.
@@ -318,19 +425,72 @@ class TaskQueue:
             coro: The coroutine to run
             task_complete: A callback to run on completion
             ident: A string identifier for the task
+            priority: The priority of the task if it must wait, higher
+                priorities run first
+            key: An optional key, the tasks for which are run one at a time in
+                the order they were added
 
         Returns: a future resolving to the asyncio task instance once queued
 
         """
-        pending = PendingTask(coro, task_complete, ident)
+        pending = PendingTask(coro, task_complete, ident, priority=priority, key=key)
         if self._cancelled:
             pending.cancel()
-        elif self.ready:
-            pending.task = self.run(coro, task_complete, pending.ident)
+        elif key is not None and key in self.keyed_tasks:
+            if self.timed:
+                pending.queued_time = time.perf_counter()
+            self.keyed_tasks[key].append(pending)
+            self.keyed_waiting += 1
         else:
-            self.add_pending(pending)
+            if key is not None:
+                self.keyed_tasks[key] = deque()
+            self._start(pending)
         return pending
 
+    def put_many(
+        self,
+        coros: Sequence[Coroutine],
+        task_complete: Callable = None,
+        priority: int = 0,
+    ) -> Sequence[PendingTask]:
+        """
+        Add a batch of new tasks to the queue, delaying execution if busy.
+
+        The tasks which cannot be started are added to the pending queue at once.
+
+        Args:
+            coros: The coroutines to run
+            task_complete: A callback to run on completion of each task
+            priority: The priority of the tasks if they must wait
+
+        Returns: futures resolving to the asyncio task instances once queued
+
+        """
+        result = [
+            PendingTask(coro, task_complete, priority=priority) for coro in coros
+        ]
+        if self._cancelled:
+            for pending in result:
+                pending.cancel()
+            return result
+        deferred = []
+        for pending in result:
+            if not deferred and self.ready:
+                if self.timed:
+                    self.log_wait(priority, 0.0)
+                pending.task = self.run(pending.coro, task_complete, pending.ident)
+            else:
+                deferred.append(self._pending_entry(pending))
+        if deferred:
+            if len(deferred) > len(self.pending_tasks):
+                self.pending_tasks.extend(deferred)
+                heapq.heapify(self.pending_tasks)
+            else:
+                for entry in deferred:
+                    heapq.heappush(self.pending_tasks, entry)
+            self.drain()
+        return result
+
     def completed_task(
         self,
         task: asyncio.Task,
@@ -357,10 +517,7 @@ class TaskQueue:
                     self._trace_fn(completed)
             except Exception:
                 LOGGER.exception("Error finalizing task %s", completed)
-        try:
-            self.active_tasks.remove(task)
-        except ValueError:
-            pass
+        self.active_tasks.discard(task)
         self.drain()
 
     def cancel_pending(self):
@@ -368,8 +525,17 @@ class TaskQueue:
         if self._drain_task:
             self._drain_task.cancel()
             self._drain_task = None
-        for pending in self.pending_tasks:
+        for waiting in self.keyed_tasks.values():
+            for pending in waiting:
+                pending.cancel()
+            waiting.clear()
+        self.keyed_waiting = 0
+        for _, _, pending in self.pending_tasks:
             pending.cancel()
+            # release the key now, the keys of active tasks are released
+            # when they complete
+            if pending.key is not None:
+                del self.keyed_tasks[pending.key]
         self.pending_tasks = []
 
     def cancel(self):
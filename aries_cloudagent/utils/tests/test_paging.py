@@ -0,0 +1,109 @@
+import json
+
+from aiohttp import web
+from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
+
+from ...config.injection_context import InjectionContext
+from ...messaging.models.base_record import BaseRecord, BaseRecordSchema
+from ...messaging.request_context import RequestContext
+from ...storage.base import BaseStorage
+from ...storage.basic import BasicStorage
+
+from ..paging import NDJSON_CONTENT_TYPE, record_list_response
+
+
+class PagingRecordImpl(BaseRecord):
+    class Meta:
+        schema_class = "PagingRecordImplSchema"
+
+    RECORD_TYPE = "paging_record"
+
+
+class PagingRecordImplSchema(BaseRecordSchema):
+    class Meta:
+        model_class = PagingRecordImpl
+
+
+class TestRecordListResponse(AioHTTPTestCase):
+    async def get_application(self):
+        self.context = RequestContext(
+            base_context=InjectionContext(enforce_typing=False)
+        )
+        self.context.injector.bind_instance(BaseStorage, BasicStorage())
+        app = web.Application()
+        app["request_context"] = self.context
+        app.add_routes([web.get("/records", self.list_route)])
+        return app
+
+    async def list_route(self, request):
+        return await record_list_response(
+            request,
+            PagingRecordImpl,
+            post_filter={"state": request.query["state"]}
+            if "state" in request.query
+            else None,
+            sort_key=lambda rec: rec["state"],
+        )
+
+    async def add_records(self, count):
+        for i in range(count):
+            await PagingRecordImpl(state=str(count - i)).save(self.context)
+
+    @unittest_run_loop
+    async def test_unpaginated(self):
+        await self.add_records(3)
+        resp = await self.client.get("/records")
+        result = await resp.json()
+        assert [r["state"] for r in result["results"]] == ["1", "2", "3"]
+        assert "next_cursor" not in result
+
+    @unittest_run_loop
+    async def test_paginated(self):
+        await self.add_records(5)
+        states = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"limit": "2"}
+            if cursor:
+                params["cursor"] = cursor
+            resp = await self.client.get("/records", params=params)
+            result = await resp.json()
+            states.extend(r["state"] for r in result["results"])
+            pages += 1
+            cursor = result.get("next_cursor")
+            if not cursor:
+                break
+        assert states == ["5", "4", "3", "2", "1"]
+        assert pages == 3
+
+    @unittest_run_loop
+    async def test_paginated_x(self):
+        resp = await self.client.get("/records", params={"limit": "x"})
+        assert resp.status == 400
+        resp = await self.client.get("/records", params={"cursor": "garbage"})
+        assert resp.status == 400
+        resp = await self.client.get(
+            "/records", params={"cursor": "garbage", "stream": "true"}
+        )
+        assert resp.status == 400
+
+    @unittest_run_loop
+    async def test_stream(self):
+        await self.add_records(4)
+        resp = await self.client.get(
+            "/records", params={"stream": "true", "state": "2"}
+        )
+        assert resp.content_type == NDJSON_CONTENT_TYPE
+        lines = (await resp.text()).splitlines()
+        assert [json.loads(line)["state"] for line in lines] == ["2"]
+
+        resp = await self.client.get("/records", params={"stream": "true"})
+        lines = (await resp.text()).splitlines()
+        assert [json.loads(line)["state"] for line in lines] == ["4", "3", "2", "1"]
+
+    @unittest_run_loop
+    async def test_stream_empty(self):
+        resp = await self.client.get("/records", params={"stream": "true"})
+        assert resp.status == 200
+        assert await resp.text() == ""
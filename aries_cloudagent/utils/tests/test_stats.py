@@ -1,7 +1,7 @@
 from asynctest import TestCase as AsyncTestCase
 from asynctest import mock as async_mock
 
-from ..stats import Collector
+from ..stats import Collector, Histogram
 
 
 class TestStats(AsyncTestCase):
@@ -90,5 +90,20 @@ class TestStats(AsyncTestCase):
         results = stats.extract([])
         assert not results["avg"]
 
+        stats.remove("test", "a")
+        assert not stats.results["count"]
+
         stats.reset()
         assert not stats.results["avg"]
+
+    async def test_histogram(self):
+        histogram = Histogram((0.1, 1.0))
+        for duration in (0.0, 0.1, 0.5, 2.0, 3.0):
+            histogram.log(duration)
+        assert histogram.extract() == {
+            "bounds": [0.1, 1.0],
+            "counts": [2, 1, 2],
+            "count": 5,
+            "total": 5.6,
+        }
+        assert Histogram().bounds == Histogram.DEFAULT_BOUNDS
@@ -1,4 +1,8 @@
 import asyncio
+import time
+
+import pytest
+
 from asynctest import TestCase
 
 from ..task_queue import CompletedTask, PendingTask, TaskQueue, task_exc_info
@@ -67,6 +71,167 @@ class TestTaskQueue(TestCase):
         assert pend1.task.result() == 1
         assert pend2.task.result() == 2
 
+    async def test_put_priority(self):
+        queue = TaskQueue(1)
+        started = []
+
+        async def record(val):
+            started.append(val)
+
+        queue.put(record("active"))
+        for val, priority in (("low", -1), ("normal", 0), ("high", 5), ("next", 0)):
+            queue.put(record(val), priority=priority)
+        assert queue.current_pending == 4
+        await queue.flush()
+        assert started == ["active", "high", "normal", "next", "low"]
+
+    async def test_put_priority_aging(self):
+        queue = TaskQueue(1, aging=0.01)
+        release = asyncio.Event()
+        started = []
+
+        async def record(val):
+            started.append(val)
+
+        queue.put(release.wait())
+        queue.put(record("old"), priority=0)
+        await asyncio.sleep(0.03)
+        # a higher priority task only jumps tasks which have waited less
+        queue.put(record("young"), priority=0)
+        queue.put(record("high"), priority=2)
+        release.set()
+        await queue.flush()
+        assert started == ["old", "high", "young"]
+
+    async def test_put_many(self):
+        queue = TaskQueue(2)
+        release = asyncio.Event()
+        started = []
+        completed = []
+
+        async def record(val):
+            started.append(val)
+            await release.wait()
+            return val
+
+        queue.put(record("first"))
+        pending = queue.put_many(
+            [record(1), record(2), record(3), record(4)],
+            lambda complete: completed.append(complete.task.result()),
+        )
+        queue.put(record("high"), priority=1)
+        assert queue.current_active == 2
+        assert queue.current_pending == 4
+        await asyncio.sleep(0)
+        assert started == ["first", 1]
+        release.set()
+        await queue.flush()
+        assert started == ["first", 1, "high", 2, 3, 4]
+        assert sorted(completed) == [1, 2, 3, 4]
+        assert [p.task.result() for p in pending] == [1, 2, 3, 4]
+
+        queue.cancel()
+        coro = record(5)
+        assert queue.put_many([coro])[0].cancelled
+
+    async def test_wait_histograms(self):
+        queue = TaskQueue(1, timed=True)
+        queue.put(retval(1, delay=0.02))
+        queue.put(retval(2), priority=1)
+        queue.put_many([retval(3), retval(4)])
+        await queue.flush()
+        stats = queue.wait_stats()
+        assert list(stats) == [0, 1]
+        assert stats[0]["count"] == 3
+        assert stats[0]["counts"][0] == 1
+        assert stats[1]["count"] == 1
+        assert stats[1]["total"] >= 0.01
+
+    async def test_put_keyed(self):
+        queue = TaskQueue(3, timed=True)
+        events = []
+
+        async def record(val, steps=1):
+            events.append(("start", val))
+            for _ in range(steps):
+                await asyncio.sleep(0)
+            events.append(("end", val))
+            return val
+
+        pend_a1 = queue.put(record("a1", 3), key="a")
+        pend_a2 = queue.put(record("a2"), key="a")
+        pend_b1 = queue.put(record("b1"), key="b")
+        queue.put(record("a3"), key="a")
+        queue.put(record("none"))
+        assert queue.current_active == 3
+        assert queue.current_pending == 2
+        assert len(queue) == 5
+        await queue.flush()
+
+        # the tasks for a key do not overlap and run in order
+        a_events = [event for event in events if event[1].startswith("a")]
+        assert a_events == [
+            ("start", "a1"),
+            ("end", "a1"),
+            ("start", "a2"),
+            ("end", "a2"),
+            ("start", "a3"),
+            ("end", "a3"),
+        ]
+        # other tasks run alongside
+        assert events.index(("start", "b1")) < events.index(("end", "a1"))
+        assert events.index(("start", "none")) < events.index(("end", "a1"))
+        assert (await pend_a2).result() == "a2"
+        assert pend_a1.task.result() == "a1" and pend_b1.task.result() == "b1"
+        assert not queue.keyed_tasks
+        assert queue.wait_stats()[0]["count"] == 5
+
+    async def test_put_keyed_cancel(self):
+        queue = TaskQueue(1)
+        release = asyncio.Event()
+        queue.put(release.wait(), key="a")
+        waiting = queue.put(retval(1), key="a")
+        pending = queue.put(retval(2), key="b")
+        behind = queue.put(retval(3), key="b")
+        assert queue.current_pending == 3
+        queue.cancel_pending()
+        assert waiting.cancelled and pending.cancelled and behind.cancelled
+        assert not queue.current_pending
+        assert "b" not in queue.keyed_tasks
+
+        # the key of the active task is released on completion
+        release.set()
+        await queue.flush()
+        assert not queue.keyed_tasks
+        next_task = await queue.put(retval(4), key="a")
+        assert await next_task == 4
+
+    @pytest.mark.benchmark
+    async def test_benchmark_churn(self):
+        # a deep backlog with many active tasks, completing in any order
+        count = 20000
+
+        async def work(steps):
+            for _ in range(steps):
+                await asyncio.sleep(0)
+
+        loop = asyncio.get_event_loop()
+        debug = loop.get_debug()
+        loop.set_debug(False)
+        results = []
+        try:
+            for max_active in (10, 1000):
+                queue = TaskQueue(max_active)
+                start = time.perf_counter()
+                queue.put_many([work(i * 7919 % 10) for i in range(count)])
+                await queue.flush()
+                elapsed = time.perf_counter() - start
+                assert queue.total_done == count
+                results.append(f"{max_active} active: {count / elapsed:.0f} tasks/s")
+        finally:
+            loop.set_debug(debug)
+        print(f"{count} tasks, {', '.join(results)}")
+
     async def test_pending(self):
         coro = retval(1, delay=1)
         pend = PendingTask(coro, None)
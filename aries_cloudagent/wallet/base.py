@@ -315,6 +315,26 @@ class BaseWallet(ABC):
 
         """
 
+    async def pack_messages(
+        self, messages: Sequence[str], to_verkeys: Sequence[str], from_verkey: str = None
+    ) -> Sequence[bytes]:
+        """
+        Pack messages for the same recipients and sender.
+
+        Args:
+            messages: The messages to pack
+            to_verkeys: The verkeys to pack the messages for
+            from_verkey: The sender verkey
+
+        Returns:
+            The packed messages, in order
+
+        """
+        return [
+            await self.pack_message(message, to_verkeys, from_verkey)
+            for message in messages
+        ]
+
     @abstractmethod
     async def unpack_message(self, enc_message: bytes) -> (str, str, str):
         """
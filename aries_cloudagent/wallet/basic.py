@@ -11,8 +11,10 @@ from .crypto import (
     sign_message,
     verify_signed_message,
     encode_pack_message,
+    encode_pack_messages,
     decode_pack_message,
 )
+from .crypto_engine import CryptoEngine
 from .error import WalletError, WalletDuplicateError, WalletNotFoundError
 from .util import b58_to_bytes, bytes_to_b58
 
@@ -27,13 +29,19 @@ class BasicWallet(BaseWallet):
         Initialize a `BasicWallet` instance.
 
         Args:
-            config: {name, key, seed, did, auto-create, auto-remove}
+            config: {name, key, seed, did, auto-create, auto-remove,
+                crypto_workers, crypto_processes}
 
         """
         if not config:
             config = {}
         super(BasicWallet, self).__init__(config)
         self._name = config.get("name")
+        self._crypto_engine = None
+        if config.get("crypto_workers") or config.get("crypto_processes"):
+            self._crypto_engine = CryptoEngine(
+                config.get("crypto_workers"), bool(config.get("crypto_processes"))
+            )
         self._keys = {}
         self._local_dids = {}
         self._pair_dids = {}
@@ -69,8 +77,9 @@ class BasicWallet(BaseWallet):
         pass
 
     async def close(self):
-        """Not applicable to in-memory wallet."""
-        pass
+        """Stop the crypto engine workers, if any."""
+        if self._crypto_engine:
+            self._crypto_engine.shutdown()
 
     async def create_signing_key(
         self, seed: str = None, metadata: dict = None
@@ -399,11 +408,46 @@ class BasicWallet(BaseWallet):
 
         keys_bin = [b58_to_bytes(key) for key in to_verkeys]
         secret = self._get_private_key(from_verkey) if from_verkey else None
+        if self._crypto_engine:
+            return (
+                await self._crypto_engine.pack_messages([message], keys_bin, secret)
+            )[0]
         result = await asyncio.get_event_loop().run_in_executor(
             None, lambda: encode_pack_message(message, keys_bin, secret)
         )
         return result
 
+    async def pack_messages(
+        self, messages: Sequence[str], to_verkeys: Sequence[str], from_verkey: str = None
+    ) -> Sequence[bytes]:
+        """
+        Pack messages for the same recipients in one pass.
+
+        The messages share a recipients block, so the keys are wrapped once.
+
+        Args:
+            messages: The messages to pack
+            to_verkeys: List of verkeys to pack for
+            from_verkey: Sender verkey to pack from
+
+        Returns:
+            The resulting packed message bytes, in order
+
+        Raises:
+            WalletError: If a message is not provided
+
+        """
+        if any(message is None for message in messages):
+            raise WalletError("Message not provided")
+
+        keys_bin = [b58_to_bytes(key) for key in to_verkeys]
+        secret = self._get_private_key(from_verkey) if from_verkey else None
+        if self._crypto_engine:
+            return await self._crypto_engine.pack_messages(messages, keys_bin, secret)
+        return await asyncio.get_event_loop().run_in_executor(
+            None, lambda: encode_pack_messages(messages, keys_bin, secret)
+        )
+
     async def unpack_message(self, enc_message: bytes) -> (str, str, str):
         """
         Unpack a message.
@@ -422,13 +466,16 @@ class BasicWallet(BaseWallet):
         if not enc_message:
             raise WalletError("Message not provided")
         try:
-            (
-                message,
-                from_verkey,
-                to_verkey,
-            ) = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: decode_pack_message(enc_message, self._get_private_key)
-            )
+            if self._crypto_engine:
+                unpacked = await self._crypto_engine.unpack_message(
+                    enc_message, self._get_private_key
+                )
+            else:
+                unpacked = await asyncio.get_event_loop().run_in_executor(
+                    None,
+                    lambda: decode_pack_message(enc_message, self._get_private_key),
+                )
+            message, from_verkey, to_verkey = unpacked
         except ValueError as e:
             raise WalletError("Message could not be unpacked: {}".format(str(e)))
         return message, from_verkey, to_verkey
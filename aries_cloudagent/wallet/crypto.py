@@ -346,21 +346,46 @@ def encode_pack_message(
     Returns:
         The encoded message
 
+    """
+    return encode_pack_messages([message], to_verkeys, from_secret)[0]
+
+
+def encode_pack_messages(
+    messages: Sequence[str], to_verkeys: Sequence[bytes], from_secret: bytes = None
+) -> Sequence[bytes]:
+    """
+    Assemble packed messages for the same recipients and sender.
+
+    The recipients block and its content encryption key are derived once and
+    shared by the messages, each of which is encrypted with its own nonce.
+
+    Args:
+        messages: The messages to pack
+        to_verkeys: The verkeys to pack the messages for
+        from_secret: The sender secret
+
+    Returns:
+        The encoded messages, in order
+
     """
     recips_json, cek = prepare_pack_recipient_keys(to_verkeys, from_secret)
     recips_b64 = bytes_to_b64(recips_json.encode("ascii"), urlsafe=True)
 
-    ciphertext, nonce, tag = encrypt_plaintext(message, recips_b64.encode("ascii"), cek)
-
-    data = OrderedDict(
-        [
-            ("protected", recips_b64),
-            ("iv", bytes_to_b64(nonce, urlsafe=True)),
-            ("ciphertext", bytes_to_b64(ciphertext, urlsafe=True)),
-            ("tag", bytes_to_b64(tag, urlsafe=True)),
-        ]
-    )
-    return json.dumps(data).encode("ascii")
+    results = []
+    for message in messages:
+        ciphertext, nonce, tag = encrypt_plaintext(
+            message, recips_b64.encode("ascii"), cek
+        )
+        data = OrderedDict(
+            [
+                ("protected", recips_b64),
+                ("iv", bytes_to_b64(nonce, urlsafe=True)),
+                ("ciphertext", bytes_to_b64(ciphertext, urlsafe=True)),
+                ("tag", bytes_to_b64(tag, urlsafe=True)),
+            ]
+        )
+        results.append(json.dumps(data).encode("ascii"))
+    return results
 
 
 def decode_pack_message(
@@ -455,6 +480,27 @@ def decode_pack_message_payload(wrapper: dict, payload_key: bytes) -> str:
     return message
 
 
+def decode_pack_message_recipient_keys(enc_message: bytes) -> Sequence[str]:
+    """
+    List the recipient verkeys of a packed message without decrypting it.
+
+    The envelope is not validated beyond what is needed to find the keys.
+
+    Args:
+        enc_message: The encrypted message
+
+    Raises:
+        ValueError: If the recipient keys cannot be read
+
+    """
+    try:
+        wrapper = json.loads(enc_message)
+        recips_json = b64_to_bytes(wrapper["protected"], urlsafe=True)
+        return [recip["header"]["kid"] for recip in json.loads(recips_json)["recipients"]]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Invalid packed message")
+
+
 def extract_pack_recipients(recipients: Sequence[dict]) -> dict:
     """
     Extract the pack message recipients into a dict indexed by verkey.
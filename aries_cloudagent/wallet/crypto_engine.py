@@ -0,0 +1,119 @@
+"""Executor-backed engine for the BasicWallet pack and unpack operations."""
+
+import asyncio
+import multiprocessing
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional, Sequence, Tuple
+
+from .crypto import (
+    decode_pack_message,
+    decode_pack_message_recipient_keys,
+    encode_pack_messages,
+)
+from .error import WalletError
+
+
+class CryptoEngine:
+    """
+    Run pack and unpack operations on a dedicated pool of workers.
+
+    With a thread pool the workers share the wallet keys, and libsodium releases
+    the GIL while encrypting. With a process pool only the envelope and the
+    secrets of its recipients are sent to the worker, so the JSON and base64
+    work runs in parallel as well.
+    """
+
+    def __init__(self, max_workers: int = None, use_processes: bool = False):
+        """
+        Initialize a `CryptoEngine` instance.
+
+        Args:
+            max_workers: The number of workers, by default the executor default
+            use_processes: Whether to run the workers in separate processes
+
+        """
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self._executor: Executor = None
+
+    @property
+    def executor(self) -> Executor:
+        """Accessor for the executor, which is started on first use."""
+        if not self._executor:
+            if self.use_processes:
+                # forking a process with running threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="crypto"
+                )
+        return self._executor
+
+    async def run(self, func: Callable, *args):
+        """Run a function on the executor."""
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor, func, *args
+        )
+
+    async def pack_messages(
+        self,
+        messages: Sequence[str],
+        to_verkeys: Sequence[bytes],
+        from_secret: bytes = None,
+    ) -> Sequence[bytes]:
+        """
+        Pack messages for the same recipients.
+
+        Args:
+            messages: The messages to pack
+            to_verkeys: The verkeys to pack the messages for
+            from_secret: The sender secret
+
+        Returns:
+            The encoded messages, in order
+
+        """
+        return await self.run(encode_pack_messages, messages, to_verkeys, from_secret)
+
+    async def unpack_message(
+        self, enc_message: bytes, find_key: Callable
+    ) -> Tuple[str, Optional[str], str]:
+        """
+        Unpack a message.
+
+        Args:
+            enc_message: The encrypted message
+            find_key: Function to retrieve the secret of a recipient verkey
+
+        Returns:
+            A tuple of (message, sender_vk, recip_vk)
+
+        Raises:
+            ValueError: If the message could not be unpacked
+
+        """
+        if self.use_processes:
+            # send the secrets of the recipients rather than the key lookup,
+            # skipping recipients which are not held by this wallet
+            secrets = {}
+            for recip_vk in decode_pack_message_recipient_keys(enc_message):
+                try:
+                    secrets[recip_vk] = find_key(recip_vk)
+                except WalletError:
+                    continue
+            find_key = secrets.get
+        return await self.run(decode_pack_message, enc_message, find_key)
+
+    def shutdown(self):
+        """
+        Stop the workers, which are started again if the engine is used.
+
+        Pending operations are completed first, so that no worker is left
+        running when the interpreter exits.
+        """
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -38,6 +38,10 @@ class WalletProvider(BaseProvider):
             wallet_cfg["storage_config"] = settings["wallet.storage_config"]
         if "wallet.storage_creds" in settings:
             wallet_cfg["storage_creds"] = settings["wallet.storage_creds"]
+        if "wallet.crypto_workers" in settings:
+            wallet_cfg["crypto_workers"] = settings["wallet.crypto_workers"]
+        if "wallet.crypto_processes" in settings:
+            wallet_cfg["crypto_processes"] = settings["wallet.crypto_processes"]
         wallet = ClassLoader.load_class(wallet_class)(wallet_cfg)
         await wallet.open()
 
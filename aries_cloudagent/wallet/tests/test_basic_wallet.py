@@ -1,4 +1,5 @@
 import pytest
+import json
 import time
 
 from aries_cloudagent.wallet.basic import BasicWallet
@@ -287,6 +288,66 @@ class TestBasicWallet:
         with pytest.raises(WalletError):
             await wallet.unpack_message(None)
 
+    @pytest.mark.asyncio
+    async def test_pack_messages(self, wallet):
+        await wallet.create_local_did(self.test_seed, self.test_did)
+        await wallet.create_local_did(self.test_target_seed, self.test_target_did)
+        messages = [self.test_message, "second message"]
+
+        packed = await wallet.pack_messages(
+            messages, [self.test_target_verkey], self.test_verkey
+        )
+        assert len(packed) == 2
+        # the recipients block is shared, the message nonces are not
+        assert json.loads(packed[0])["protected"] == json.loads(packed[1])["protected"]
+        assert json.loads(packed[0])["iv"] != json.loads(packed[1])["iv"]
+        for message, packed_message in zip(messages, packed):
+            unpacked, from_verkey, to_verkey = await wallet.unpack_message(
+                packed_message
+            )
+            assert unpacked == message
+            assert from_verkey == self.test_verkey
+            assert to_verkey == self.test_target_verkey
+
+        assert await wallet.pack_messages([], [self.test_target_verkey]) == []
+        with pytest.raises(WalletError) as excinfo:
+            await wallet.pack_messages([None], [self.test_target_verkey])
+        assert "Message not provided" in str(excinfo.value)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("crypto_processes", [False, True])
+    async def test_pack_unpack_crypto_engine(self, crypto_processes):
+        wallet = BasicWallet(
+            {"crypto_workers": 2, "crypto_processes": crypto_processes}
+        )
+        await wallet.open()
+        await wallet.create_local_did(self.test_seed, self.test_did)
+        await wallet.create_local_did(self.test_target_seed, self.test_target_did)
+
+        packed = await wallet.pack_message(
+            self.test_message, [self.test_target_verkey], self.test_verkey
+        )
+        unpacked, from_verkey, to_verkey = await wallet.unpack_message(packed)
+        assert unpacked == self.test_message
+        assert from_verkey == self.test_verkey
+        assert to_verkey == self.test_target_verkey
+
+        packed = await wallet.pack_messages(
+            [self.test_message, "second message"], [self.test_verkey]
+        )
+        assert [(await wallet.unpack_message(p))[0] for p in packed] == [
+            self.test_message,
+            "second message",
+        ]
+
+        with pytest.raises(WalletError):
+            await wallet.unpack_message(b"{}")
+        with pytest.raises(WalletError):
+            await wallet.unpack_message(
+                await wallet.pack_message(self.test_message, [self.missing_verkey])
+            )
+        await wallet.close()
+
     @pytest.mark.asyncio
     async def test_signature_round_trip(self, wallet):
         key_info = await wallet.create_signing_key()
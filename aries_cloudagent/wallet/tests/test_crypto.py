@@ -139,3 +139,15 @@ class TestUtil(TestCase):
                 ]
             )
         assert "Unexpected iv" in str(excinfo.value)
+
+    def test_decode_pack_message_recipient_keys(self):
+        verkeys = [test_module.create_keypair()[0] for _ in range(2)]
+        packed = test_module.encode_pack_message("message", verkeys)
+        assert test_module.decode_pack_message_recipient_keys(packed) == [
+            test_module.bytes_to_b58(verkey) for verkey in verkeys
+        ]
+
+        for packed in (b"bad", b"[]", b"{}", json.dumps({"protected": "e30="})):
+            with pytest.raises(ValueError) as excinfo:
+                test_module.decode_pack_message_recipient_keys(packed)
+            assert "Invalid packed message" == str(excinfo.value)
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from asynctest import TestCase as AsyncTestCase
+
+from ..crypto import create_keypair
+from ..crypto_engine import CryptoEngine
+from ..error import WalletError
+from ..util import bytes_to_b58
+
+
+class TestCryptoEngine(AsyncTestCase):
+    def setUp(self):
+        self.sender_vk, self.sender_secret = create_keypair()
+        self.recip_vk, self.recip_secret = create_keypair()
+        self.secrets = {bytes_to_b58(self.recip_vk): self.recip_secret}
+
+    async def test_thread_pool(self):
+        engine = CryptoEngine(2)
+        packed = await engine.pack_messages(
+            ["one", "two"], [self.recip_vk], self.sender_secret
+        )
+        assert engine.executor._max_workers == 2
+        for message, packed_message in zip(["one", "two"], packed):
+            assert await engine.unpack_message(packed_message, self.secrets.get) == (
+                message,
+                bytes_to_b58(self.sender_vk),
+                bytes_to_b58(self.recip_vk),
+            )
+        engine.shutdown()
+        assert not engine._executor
+
+    async def test_process_pool(self):
+        engine = CryptoEngine(1, use_processes=True)
+        looked_up = []
+
+        def find_key(verkey):
+            looked_up.append(verkey)
+            return self.secrets.get(verkey)
+
+        (packed,) = await engine.pack_messages(["one"], [self.recip_vk])
+        assert await engine.unpack_message(packed, find_key) == (
+            "one",
+            None,
+            bytes_to_b58(self.recip_vk),
+        )
+        # only the recipient secrets are resolved in this process
+        assert looked_up == [bytes_to_b58(self.recip_vk)]
+        with self.assertRaises(ValueError):
+            await engine.unpack_message(b"{}", find_key)
+        engine.shutdown()
+
+    async def test_process_pool_other_recipients(self):
+        engine = CryptoEngine(1, use_processes=True)
+        other_vk, _ = create_keypair()
+
+        def find_key(verkey):
+            if verkey not in self.secrets:
+                raise WalletError("Private key not found for verkey")
+            return self.secrets[verkey]
+
+        for to_verkeys in ([self.recip_vk, other_vk], [other_vk, self.recip_vk]):
+            (packed,) = await engine.pack_messages(["one"], to_verkeys)
+            assert await engine.unpack_message(packed, find_key) == (
+                "one",
+                None,
+                bytes_to_b58(self.recip_vk),
+            )
+        engine.shutdown()
+
+    @pytest.mark.benchmark
+    async def test_benchmark_workers(self):
+        count = 400
+        packed = await CryptoEngine(1).pack_messages(
+            ["x" * 4096] * count, [self.recip_vk], self.sender_secret
+        )
+        results = []
+        for use_processes in (False, True):
+            for workers in sorted({1, 2, os.cpu_count() or 1}):
+                engine = CryptoEngine(workers, use_processes)
+                # start the workers before timing
+                await asyncio.gather(
+                    *(engine.unpack_message(p, self.secrets.get) for p in packed[:8])
+                )
+                start = time.perf_counter()
+                unpacked = await asyncio.gather(
+                    *(engine.unpack_message(p, self.secrets.get) for p in packed)
+                )
+                elapsed = time.perf_counter() - start
+                engine.shutdown()
+                assert len(unpacked) == count
+                results.append(
+                    f"{'processes' if use_processes else 'threads'} x{workers}: "
+                    f"{count / elapsed:.0f} msg/s"
+                )
+        print(f"unpack of {count} messages, {os.cpu_count()} cores: {', '.join(results)}")
@@ -17,12 +17,16 @@ class TestProvider(AsyncTestCase):
                 "wallet.storage_type": "storage_type",
                 "wallet.storage_config": "storage_config",
                 "wallet.storage_creds": "storage_creds",
+                "wallet.crypto_workers": 2,
+                "wallet.crypto_processes": True,
             }
         )
         wallet = await provider.provide(settings, None)
 
         assert wallet.opened
         assert wallet.name == "name"
+        assert wallet._crypto_engine.max_workers == 2
+        assert wallet._crypto_engine.use_processes
         await wallet.close()
 
     async def test_provide_indy(self):
@@ -7,10 +7,11 @@ import pytest
 INDY_FOUND = False
 INDY_STUB = None
 POSTGRES_URL = None
+BENCHMARK = None
 
 
 def pytest_sessionstart(session):
-    global INDY_FOUND, INDY_STUB, POSTGRES_URL
+    global BENCHMARK, INDY_FOUND, INDY_STUB, POSTGRES_URL
 
     # detect indy module
     try:
@@ -49,6 +50,8 @@ def pytest_sessionstart(session):
 
     POSTGRES_URL = os.getenv("POSTGRES_URL")
 
+    BENCHMARK = os.getenv("BENCHMARK")
+
 
 def pytest_sessionfinish(session):
     global INDY_STUB
@@ -64,3 +67,6 @@ def pytest_runtest_setup(item: pytest.Item):
 
     if tuple(item.iter_markers(name="postgres")) and not POSTGRES_URL:
         pytest.skip("test requires Postgres support")
+
+    if tuple(item.iter_markers(name="benchmark")) and not BENCHMARK:
+        pytest.skip("benchmarks only run when BENCHMARK is set")
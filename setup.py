@@ -32,6 +32,7 @@ if __name__ == "__main__":
         install_requires=parse_requirements("requirements.txt"),
         tests_require=parse_requirements("requirements.dev.txt"),
         extras_require={
+            "http2": ["httpx[http2]>=0.18"],
             "indy": parse_requirements("requirements.indy.txt"),
             "uvloop": {"uvloop": "^=0.14.0"},
         },